@@ -0,0 +1,47 @@
+"""
+Throughput of building figure frames in edges per second, for the first build of a figure, which indexes
+the edges of every timestep, and for rebuilds after filter changes, which only mask the indexed arrays.
+"""
+import argparse
+
+import numpy as np
+
+import synthetic
+from synthetic import main
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=300)
+    parser.add_argument('--timesteps', type=int, default=2000)
+    parser.add_argument('--edges-per-timestep', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    edge_table = synthetic.build_edge_table(args.nodes, args.timesteps, args.edges_per_timestep)
+    temp_graph = synthetic.build_temporal_graph(edge_table)
+    layout = synthetic.build_random_layout(temp_graph)
+
+    def build_figure() -> main.TemporalGraphFigure:
+        return main.TemporalGraphFigure(temp_graph=temp_graph, layout=layout, display_size=(800, 800),
+                                        animate_transitions=False, color_map='#d62728', edge_color='#7f7f7f',
+                                        node_size=6, edge_width=1)
+
+    figure = build_figure()
+    random = np.random.RandomState(0)
+    masks = [random.rand(len(layout.get_node_ids())) < 0.5 for _ in range(args.repeat)]
+
+    def update_filters():
+        for mask in masks:
+            figure.update_filter(mask)
+
+    edge_count = len(edge_table)
+    print(f'{args.nodes} nodes, {len(temp_graph)} timesteps, {edge_count:,} edges')
+    build_time = synthetic.measure(build_figure, args.repeat)
+    print(f'build:         {build_time:8.3f} s  {edge_count / build_time:14,.0f} edges/s')
+    filter_time = synthetic.measure(update_filters, 1) / len(masks)
+    print(f'filter change: {filter_time:8.3f} s  {edge_count / filter_time:14,.0f} edges/s')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,43 @@
+"""
+Output size and encoding time of a figure in the compact frame encoding, which the notebook displays,
+compared to plotly frames. With --static-layout, all timesteps share the positions of the first one,
+as with static layouts, so the compact encoding sends them once.
+"""
+import argparse
+import json
+import time
+
+import plotly
+
+import synthetic
+from synthetic import main
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=300)
+    parser.add_argument('--timesteps', type=int, default=2000)
+    parser.add_argument('--edges-per-timestep', type=int, default=50)
+    parser.add_argument('--static-layout', action='store_true')
+    args = parser.parse_args()
+
+    edge_table = synthetic.build_edge_table(args.nodes, args.timesteps, args.edges_per_timestep)
+    temp_graph = synthetic.build_temporal_graph(edge_table)
+    layout = synthetic.build_random_layout(temp_graph)
+    if args.static_layout:
+        layout.set_steps(1, layout.get_steps(0, 1).repeat(len(layout) - 1, axis=0))
+    figure = main.TemporalGraphFigure(temp_graph=temp_graph, layout=layout, display_size=(800, 800),
+                                      animate_transitions=False, color_map='#d62728', edge_color='#7f7f7f',
+                                      node_size=6, edge_width=1)
+
+    print(f'{args.nodes} nodes, {len(temp_graph)} timesteps, {len(edge_table):,} edges')
+    for name, encode in [('plotly frames', lambda: json.dumps(figure.get_figure(),
+                                                              cls=plotly.utils.PlotlyJSONEncoder)),
+                         ('compact', lambda: json.dumps(figure.get_compact_figure()))]:
+        start = time.perf_counter()
+        size = len(encode())
+        print(f'{name:14} {main.format_byte_size(size):>10}  {time.perf_counter() - start:8.3f} s')
+
+
+if __name__ == '__main__':
+    run()
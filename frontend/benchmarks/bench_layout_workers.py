@@ -0,0 +1,59 @@
+"""
+Speedup of computing layouts with worker processes over one worker, for numbers of workers up to the number of CPUs.
+Times include starting the workers and passing them the graph.
+"""
+import argparse
+import os
+
+import vtna.layout
+
+import synthetic
+from synthetic import main
+
+LAYOUT_FUNCTIONS = {
+    'flexible': vtna.layout.flexible_spring_layout,
+    'flexible_weighted': vtna.layout.flexible_weighted_spring_layout
+}
+
+
+def compute_layout(temp_graph, layout_function, workers: int, chunk_size: int):
+    results = list()
+    main.LayoutComputation(layout_function=layout_function, temp_graph=temp_graph, parameters={},
+                           chunk_size=chunk_size, chunk_computed=lambda computation, start, positions: None,
+                           computation_finished=lambda computation, layout: results.append(layout),
+                           computation_failed=lambda computation, error: results.append(error),
+                           workers=workers).run()
+    if not isinstance(results[0], main.LayoutArray):
+        raise results[0]
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=300)
+    parser.add_argument('--timesteps', type=int, default=500)
+    parser.add_argument('--edges-per-timestep', type=int, default=50)
+    parser.add_argument('--chunk-size', type=int, default=50)
+    parser.add_argument('--layout', choices=sorted(LAYOUT_FUNCTIONS), default='flexible')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='Numbers of workers, defaults to powers of 2 up to the number of CPUs')
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.workers or sorted(set([2 ** i for i in range(cpu_count.bit_length())] + [cpu_count]))
+    edge_table = synthetic.build_edge_table(args.nodes, args.timesteps, args.edges_per_timestep)
+    temp_graph = synthetic.build_temporal_graph(edge_table)
+    layout_function = LAYOUT_FUNCTIONS[args.layout]
+
+    print(f'{args.layout} layout, {args.nodes} nodes, {len(temp_graph)} timesteps, {len(edge_table):,} edges, '
+          f'{cpu_count} CPUs')
+    serial_time = None
+    for workers in worker_counts:
+        seconds = synthetic.measure(lambda: compute_layout(temp_graph, layout_function, workers, args.chunk_size),
+                                    args.repeat)
+        serial_time = serial_time or seconds
+        print(f'{workers:3} workers: {seconds:8.2f} s  speedup {serial_time / seconds:5.2f}')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,52 @@
+"""
+Synthetic temporal graphs for the benchmarks, so they run without a recorded dataset.
+Run the benchmarks from the frontend directory, e.g. python benchmarks/bench_frame_building.py.
+"""
+import os
+import sys
+import time
+import typing as typ
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import vtna.graph  # noqa: E402
+
+
+def build_edge_table(node_count: int, timestep_count: int, edges_per_timestep: int, granularity: int = 20,
+                     seed: int = 0) -> main.EdgeTable:
+    """
+    Returns edges between random pairs of distinct nodes, edges_per_timestep in each timestep.
+    Timestamps are multiples of granularity, like in SocioPatterns recordings.
+    """
+    random = np.random.RandomState(seed)
+    size = timestep_count * edges_per_timestep
+    timestamps = np.repeat(np.arange(timestep_count, dtype=np.int64) * granularity, edges_per_timestep)
+    nodes1 = random.randint(0, node_count, size)
+    nodes2 = (nodes1 + random.randint(1, node_count, size)) % node_count
+    return main.EdgeTable(timestamps, nodes1.astype(np.int32), nodes2.astype(np.int32))
+
+
+def build_temporal_graph(edge_table: main.EdgeTable, granularity: int = 20) -> vtna.graph.TemporalGraph:
+    return vtna.graph.TemporalGraph(edge_table.to_temporal_edges(), None, granularity)
+
+
+def build_random_layout(temp_graph: vtna.graph.TemporalGraph, seed: int = 0) -> main.LayoutArray:
+    """Returns layout with random positions in [-1, 1] of all nodes in all timesteps."""
+    layout = main.LayoutArray.empty(temp_graph)
+    random = np.random.RandomState(seed)
+    shape = (len(temp_graph), len(layout.get_node_ids()), 2)
+    layout.set_steps(0, random.uniform(-1, 1, shape).astype(np.float32))
+    return layout
+
+
+def measure(function: typ.Callable[[], typ.Any], repeat: int) -> float:
+    """Returns the best time of repeated calls in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,351 @@
+// Applies filter and style updates of FigureChannel (see main.py) to a displayed plotly figure.
+// Every frame keeps its unfiltered traces in frame.vtnaBase, so filtered nodes can be shown again.
+var vtnaFigures = {
+    states: {},
+    // Compact figures without frames, see plotCompact
+    compacts: {},
+    // Frame windows of lazily loaded figures, see loadFramesLazily
+    lazyFigures: {},
+    // Comm of FigureChannel, set when the kernel opens it
+    comm: undefined
+};
+
+vtnaFigures.update = function (divId, changes) {
+    if (!(divId in this.states)) {
+        this.states[divId] = {};
+    }
+    if (typeof changes.node_colors === 'object') {
+        var colors = this.decodeColors(changes.node_colors);
+        var colorsById = {};
+        changes.node_colors.node_ids.forEach(function (id, column) {
+            colorsById[id] = colors[column];
+        });
+        changes = $.extend({}, changes, {node_colors: colorsById});
+    }
+    $.extend(this.states[divId], changes);
+    this.apply(divId, changes);
+};
+
+vtnaFigures.apply = function (divId, changes) {
+    var gd = document.getElementById(divId);
+    if (gd === null || gd._transitionData === undefined || gd._transitionData._frames.length === 0) {
+        // Plot is not drawn or its frames are not added yet, try again later. All state is applied at once then.
+        setTimeout(function () {
+            vtnaFigures.apply(divId, vtnaFigures.states[divId]);
+        }, 100);
+        return;
+    }
+    var state = this.states[divId];
+    var frames = gd._transitionData._frames;
+    for (var i = 0; i < frames.length; i++) {
+        this.restyleFrame(frames[i], state);
+    }
+    if ('frame_length' in changes) {
+        var playArgs = gd.layout.updatemenus[0].buttons[0].args;
+        playArgs[1].frame.duration = state.frame_length;
+        Plotly.relayout(gd, {'updatemenus[0].buttons[0].args': playArgs});
+    }
+    // Frames only take effect on animation, so the traces of the current frame are restyled directly.
+    var active = gd.layout.sliders[0].active || 0;
+    var current = gd._transitionData._frameHash[String(active)];
+    if (current !== undefined) {
+        var edges = current.data[0];
+        var nodes = current.data[1];
+        Plotly.restyle(gd, {
+            'x': [edges.x, nodes.x],
+            'y': [edges.y, nodes.y],
+            'ids': [edges.ids, nodes.ids],
+            'text': [[], nodes.text],
+            'line.color': [edges.line.color, undefined],
+            'line.width': [edges.line.width, undefined],
+            'marker.color': [undefined, nodes.marker.color],
+            'marker.size': [undefined, nodes.marker.size]
+        }, [0, 1]);
+    }
+};
+
+vtnaFigures.restyleFrame = function (frame, state) {
+    var edges = frame.data[0];
+    var nodes = frame.data[1];
+    if (frame.vtnaBase === undefined) {
+        frame.vtnaBase = {
+            edges: {x: edges.x, y: edges.y, ids: edges.ids},
+            nodes: {x: nodes.x, y: nodes.y, ids: nodes.ids, text: nodes.text}
+        };
+    }
+    var base = frame.vtnaBase;
+    var hidden = {};
+    (state.hidden_nodes || []).forEach(function (id) {
+        hidden[id] = true;
+    });
+    // Edges are line segments of three points: node1, node2, null separator
+    var edgesX = [], edgesY = [], edgesIds = [];
+    var used = {};
+    for (var i = 0; i < base.edges.ids.length; i += 3) {
+        var node1 = base.edges.ids[i], node2 = base.edges.ids[i + 1];
+        if (!hidden[node1] && !hidden[node2]) {
+            Array.prototype.push.apply(edgesX, base.edges.x.slice(i, i + 3));
+            Array.prototype.push.apply(edgesY, base.edges.y.slice(i, i + 3));
+            Array.prototype.push.apply(edgesIds, base.edges.ids.slice(i, i + 3));
+            // Only nodes with VISIBLE edges are displayed.
+            used[node1] = true;
+            used[node2] = true;
+        }
+    }
+    edges.x = edgesX;
+    edges.y = edgesY;
+    edges.ids = edgesIds;
+    var nodesX = [], nodesY = [], nodesIds = [], nodesText = [];
+    for (var j = 0; j < base.nodes.ids.length; j++) {
+        if (used[base.nodes.ids[j]]) {
+            nodesX.push(base.nodes.x[j]);
+            nodesY.push(base.nodes.y[j]);
+            nodesIds.push(base.nodes.ids[j]);
+            nodesText.push(base.nodes.text[j]);
+        }
+    }
+    nodes.x = nodesX;
+    nodes.y = nodesY;
+    nodes.ids = nodesIds;
+    nodes.text = nodesText;
+    if ('node_colors' in state) {
+        // Either one color for all nodes or a mapping of node IDs to colors, decoded by update
+        if (typeof state.node_colors === 'string') {
+            nodes.marker.color = state.node_colors;
+        } else {
+            nodes.marker.color = nodesIds.map(function (id) {
+                return state.node_colors[id];
+            });
+        }
+    }
+    if ('node_size' in state) {
+        nodes.marker.size = state.node_size;
+    }
+    if ('edge_color' in state) {
+        edges.line.color = state.edge_color;
+    }
+    if ('edge_width' in state) {
+        edges.line.width = state.edge_width;
+    }
+};
+
+vtnaFigures.decodeArray = function (encoded) {
+    var types = {
+        'float32': Float32Array, 'float64': Float64Array,
+        'uint16': Uint16Array, 'int32': Int32Array
+    };
+    var binary = atob(encoded.data);
+    var bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return new types[encoded.dtype](bytes.buffer);
+};
+
+// Returns color of each node column of NodeColors.encode (see main.py), a palette and an index per node column
+vtnaFigures.decodeColors = function (encoded) {
+    return Array.prototype.map.call(this.decodeArray(encoded.indices), function (index) {
+        return encoded.palette[index];
+    });
+};
+
+// Expands a figure of TemporalGraphFigure.get_compact_figure (see main.py) into plotly frames and plots it.
+vtnaFigures.plotCompact = function (divId, compact, config) {
+    if (typeof compact.node_colors === 'object') {
+        compact = $.extend({}, compact, {node_colors: this.decodeColors(compact.node_colors)});
+    }
+    var frames = this.expandFrames(compact, compact);
+    // Keep node IDs, texts and styles for expanding lazily loaded frames
+    this.compacts[divId] = $.extend({}, compact, {frames: [], layout_steps: []});
+    // Plotly modifies the traces it plots, so the initial traces are copies of the first frame's
+    Plotly.newPlot(divId, $.extend(true, [], frames[0].data), compact.layout, config).then(function () {
+        Plotly.addFrames(divId, frames);
+    });
+};
+
+// Expands frames and their layout steps of a compact figure or frame window
+vtnaFigures.expandFrames = function (compactFrames, compact) {
+    var layoutSteps = compactFrames.layout_steps.map(this.decodeArray);
+    return compactFrames.frames.map(function (compactFrame) {
+        return vtnaFigures.expandFrame(compactFrame, compact, layoutSteps[compactFrame.layout_step]);
+    });
+};
+
+vtnaFigures.expandFrame = function (compactFrame, compact, positions) {
+    var edges = this.decodeArray(compactFrame.edges);
+    var edgeTrace = {
+        x: [], y: [], ids: [], mode: 'lines', type: 'scatter',
+        line: {width: compact.edge_width, color: compact.edge_color}
+    };
+    var used = {};
+    for (var i = 0; i < edges.length; i += 2) {
+        var column1 = edges[i], column2 = edges[i + 1];
+        // Each line segment is x1, x2, null
+        edgeTrace.x.push(positions[2 * column1], positions[2 * column2], null);
+        edgeTrace.y.push(positions[2 * column1 + 1], positions[2 * column2 + 1], null);
+        edgeTrace.ids.push(compact.node_ids[column1], compact.node_ids[column2], 0);
+        used[column1] = true;
+        used[column2] = true;
+    }
+    // Nodes are in ascending column order, like the texts of compactFrame
+    var columns = Object.keys(used).map(Number).sort(function (a, b) {
+        return a - b;
+    });
+    var nodeTrace = {
+        x: columns.map(function (column) { return positions[2 * column]; }),
+        y: columns.map(function (column) { return positions[2 * column + 1]; }),
+        ids: columns.map(function (column) { return compact.node_ids[column]; }),
+        text: compactFrame.texts || columns.map(function (column) { return compact.node_texts[column]; }),
+        mode: 'markers', type: 'scatter', hoverinfo: 'text',
+        marker: {
+            size: compact.node_size,
+            // Colors differing per timestep are part of each frame, like local hover texts
+            color: compactFrame.colors || (typeof compact.node_colors === 'string' ? compact.node_colors
+                : columns.map(function (column) { return compact.node_colors[column]; }))
+        }
+    };
+    return {name: compactFrame.name, data: [edgeTrace, nodeTrace]};
+};
+
+// Figures with frame_window (see UIGraphDisplayManager in main.py) only contain the first window of frames.
+// Windows are requested from the kernel when the slider or the animation reaches them.
+vtnaFigures.loadFramesLazily = function (divId, frameWindow, frameCount) {
+    var gd = document.getElementById(divId);
+    if (gd === null || gd._transitionData === undefined || this.comm === undefined) {
+        setTimeout(function () {
+            vtnaFigures.loadFramesLazily(divId, frameWindow, frameCount);
+        }, 100);
+        return;
+    }
+    var lazy = {frameWindow: frameWindow, frameCount: frameCount, windows: {0: true}, pending: {}, playing: false};
+    this.lazyFigures[divId] = lazy;
+    gd.on('plotly_buttonclicked', function (event) {
+        lazy.playing = event.button.label === 'Play';
+    });
+    gd.on('plotly_sliderchange', function (event) {
+        if (!event.interaction) {
+            return;
+        }
+        // Animating to a frame, which is not loaded yet, fails. It is repeated once the window is loaded.
+        var timestep = event.step.args[0][0];
+        vtnaFigures.requestWindow(divId, Math.floor(timestep / frameWindow), function () {
+            Plotly.animate(gd, [String(timestep)], event.step.args[1]);
+        });
+    });
+    gd.on('plotly_animatingframe', function (event) {
+        var timestep = Number(event.name);
+        var next = timestep + 1;
+        // Preload the following window
+        vtnaFigures.requestWindow(divId, Math.floor(timestep / frameWindow) + 1);
+        if (lazy.playing && next < frameCount && !(String(next) in gd._transitionData._frameHash)) {
+            // Playing would skip the missing frames, so it pauses until they are loaded
+            var playArgs = gd.layout.updatemenus[0].buttons[0].args;
+            Plotly.animate(gd, [null], {frame: {duration: 0, redraw: false}, mode: 'immediate'});
+            vtnaFigures.requestWindow(divId, Math.floor(next / frameWindow), function () {
+                if (lazy.playing) {
+                    Plotly.animate(gd, null, playArgs[1]);
+                }
+            });
+        }
+    });
+};
+
+vtnaFigures.requestWindow = function (divId, window, callback) {
+    var lazy = this.lazyFigures[divId];
+    if (window < 0 || window * lazy.frameWindow >= lazy.frameCount) {
+        return;
+    }
+    if (lazy.windows[window] === true) {
+        if (callback !== undefined) {
+            callback();
+        }
+        return;
+    }
+    if (!(window in lazy.pending)) {
+        lazy.pending[window] = [];
+        this.comm.send({action: 'request_frames', div_id: divId, window: window});
+    }
+    if (callback !== undefined) {
+        lazy.pending[window].push(callback);
+    }
+};
+
+vtnaFigures.addWindowFrames = function (divId, window, frames) {
+    var gd = document.getElementById(divId);
+    var lazy = this.lazyFigures[divId];
+    if (gd === null || lazy === undefined || frames.length === 0) {
+        return;
+    }
+    // Frames are kept in timestep order, which is the order they are played in
+    var first = Number(frames[0].name);
+    var index = gd._transitionData._frames.filter(function (frame) {
+        return Number(frame.name) < first;
+    }).length;
+    var indices = frames.map(function (frame, i) {
+        return index + i;
+    });
+    Plotly.addFrames(gd, frames, indices).then(function () {
+        if (divId in vtnaFigures.states) {
+            frames.forEach(function (frame) {
+                vtnaFigures.restyleFrame(gd._transitionData._frameHash[frame.name], vtnaFigures.states[divId]);
+            });
+        }
+        lazy.windows[window] = true;
+        var callbacks = lazy.pending[window] || [];
+        delete lazy.pending[window];
+        callbacks.forEach(function (callback) {
+            callback();
+        });
+    });
+};
+
+// Replaces frames, which layout has changed. Frames of windows, which are not loaded, are skipped.
+vtnaFigures.replaceFrames = function (divId, frames) {
+    var gd = document.getElementById(divId);
+    if (gd === null || gd._transitionData === undefined || gd._transitionData._frames.length === 0) {
+        // Plot is not drawn yet
+        setTimeout(function () {
+            vtnaFigures.replaceFrames(divId, frames);
+        }, 100);
+        return;
+    }
+    var frameHash = gd._transitionData._frameHash;
+    var active = String(gd.layout.sliders[0].active || 0);
+    var activeReplaced = false;
+    frames.forEach(function (frame) {
+        var replaced = frameHash[frame.name];
+        if (replaced === undefined) {
+            return;
+        }
+        replaced.data = frame.data;
+        delete replaced.vtnaBase;
+        if (divId in vtnaFigures.states) {
+            vtnaFigures.restyleFrame(replaced, vtnaFigures.states[divId]);
+        }
+        activeReplaced = activeReplaced || frame.name === active;
+    });
+    if (activeReplaced) {
+        Plotly.animate(gd, [active], {frame: {duration: 0, redraw: false}, transition: {duration: 0}, mode: 'immediate'});
+    }
+};
+
+// Receives updates and frames from FigureChannel
+IPython.notebook.kernel.comm_manager.register_target('vtna_figure', function (comm, msg) {
+    vtnaFigures.comm = comm;
+    comm.on_msg(function (msg) {
+        var data = msg.content.data;
+        if (data.action === 'update') {
+            vtnaFigures.update(data.div_id, data.state);
+        } else if (data.action === 'add_frames' || data.action === 'replace_frames') {
+            var frames = data.frames;
+            if (data.compact !== undefined) {
+                frames = vtnaFigures.expandFrames(data.compact, vtnaFigures.compacts[data.div_id]);
+            }
+            if (data.action === 'add_frames') {
+                vtnaFigures.addWindowFrames(data.div_id, data.window, frames);
+            } else {
+                vtnaFigures.replaceFrames(data.div_id, frames);
+            }
+        }
+    });
+});
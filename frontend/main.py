@@ -1,8 +1,23 @@
 import base64
+import bz2
 import collections
+import concurrent.futures
+import contextlib
 import datetime
 import enum
+import functools
+import gzip
+import hashlib
+import html
+import http.client
+import io
+import itertools
+import json
+import lzma
+import multiprocessing
+import multiprocessing.pool
 import os
+import pickle
 import re
 import sys
 import threading
@@ -10,17 +25,26 @@ import time
 import typing as typ
 import urllib
 import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+import zipfile
 
 import IPython.display as ipydisplay
 import fileupload
 import imageio
+import ipykernel.comm
+import matplotlib.backends.backend_agg
+import matplotlib.collections
+import matplotlib.figure
 import matplotlib.pyplot as plt
+import networkx
+import numpy as np
 import plotly
 import plotly.graph_objs
 import pystache
 import seaborn as sns
 import vtna.data_import
-import vtna.filter
 import vtna.graph
 import vtna.layout
 import vtna.node_measure
@@ -104,6 +128,12 @@ class UIDataUploadManager(object):
     NETWORK_UPLOAD_PLACEHOLDER = 'Enter URL -> Click Upload'  # type: str
     LOCAL_UPLOAD_PLACEHOLDER = 'Click on Upload -> Select file'  # type: str
     UPLOAD_DIR = 'upload/'  # type: str
+    # Parsed tables of uploaded files, see ImportCache
+    IMPORT_CACHE_DIR = 'upload/cache/'  # type: str
+    # Files of uploaded URLs, see DownloadManager
+    DOWNLOAD_DIR = 'upload/downloads/'  # type: str
+    # Histograms of more intervals are downsampled for plotting
+    MAX_HISTOGRAM_BARS = 1000  # type: int
 
     class UploadOrigin(enum.Enum):
         LOCAL = enum.auto()
@@ -157,7 +187,7 @@ class UIDataUploadManager(object):
 
         self.__graph_data__configuration_vbox = graph_data_configuration_vbox
 
-        self.__edge_list = None  # type: typ.List[vtna.data_import.TemporalEdge]
+        self.__edge_table = None  # type: EdgeTable
         self.__metadata = None  # type: vtna.data_import.MetadataTable
 
         self.__granularity = None
@@ -173,11 +203,13 @@ class UIDataUploadManager(object):
         # Make sure the upload directory exists, create it if necessary
         if not os.path.isdir(UIDataUploadManager.UPLOAD_DIR):
             os.mkdir(UIDataUploadManager.UPLOAD_DIR)
+        self.__import_cache = ImportCache(UIDataUploadManager.IMPORT_CACHE_DIR)
+        self.__download_manager = DownloadManager(UIDataUploadManager.DOWNLOAD_DIR)
 
         self.__display_measure_selection(measures_select_box)
 
-    def get_edge_list(self) -> typ.List[vtna.data_import.TemporalEdge]:
-        return self.__edge_list
+    def get_edge_table(self) -> 'EdgeTable':
+        return self.__edge_table
 
     def get_metadata(self) -> vtna.data_import.MetadataTable:
         return self.__metadata
@@ -256,12 +288,13 @@ class UIDataUploadManager(object):
                     with open(UIDataUploadManager.UPLOAD_DIR + w.filename, 'wb') as f:
                         f.write(w.data)
                         self.__graph_data_text.value = w.filename
-                    # Import graph as edge list via vtna
-                    self.__edge_list = vtna.data_import.read_edge_table(
-                        UIDataUploadManager.UPLOAD_DIR + w.filename)
+                    # Import graph as edge table, streamed in chunks
+                    self.__edge_table = self.__read_edge_table(UIDataUploadManager.UPLOAD_DIR + w.filename)
                 elif upload_origin is self.UploadOrigin.NETWORK:
                     file = self.__graph_data_text.value
-                    self.__edge_list = vtna.data_import.read_edge_table(file)
+                    # Metadata is likely uploaded next, so download it concurrently
+                    self.__prefetch(self.__metadata_data_text.value)
+                    self.__edge_table = self.__read_edge_table(file)
                 # Display UI for graph config
                 self.__open_graph_config()
                 self.__display_graph_upload_summary()
@@ -276,6 +309,9 @@ class UIDataUploadManager(object):
                 if upload_origin is self.UploadOrigin.NETWORK:
                     error_msg += " Check your internet access or try again later."
                 self.display_graph_upload_error(error_msg)
+            except (EOFError, zipfile.BadZipFile, lzma.LZMAError):
+                error_msg = f'Invalid format: {file} is not a readable archive'
+                self.display_graph_upload_error(error_msg)
             except ValueError:
                 error_msg = f'Invalid format: Columns 1-3 in {file} must be integers'
                 self.display_graph_upload_error(error_msg)
@@ -284,6 +320,49 @@ class UIDataUploadManager(object):
 
         return handle_local_upload_graph_data
 
+    def __read_edge_table(self, source: str) -> 'EdgeTable':
+        """Returns edge table of a file or URL, which is downloaded first. Tables are taken from the import cache."""
+        if is_url(source):
+            source = self.__download_manager.download(source, progress=self.__build_show_download_progress(
+                self.__graph_data_loading))
+        edge_table = self.__import_cache.get_edge_table(source)
+        if edge_table is None:
+            edge_table = EdgeTable.read(source, progress=self.__show_read_progress)
+            self.__import_cache.put_edge_table(source, edge_table)
+        return edge_table
+
+    def __read_metadata(self, source: str) -> vtna.data_import.MetadataTable:
+        """Returns metadata table of a file or URL, which is downloaded first. Tables are taken from the import cache."""
+        if is_url(source):
+            source = self.__download_manager.download(source, progress=self.__build_show_download_progress(
+                self.__metadata_loading))
+        metadata = self.__import_cache.get_metadata(source)
+        if metadata is None:
+            metadata = vtna.data_import.MetadataTable(source)
+            self.__import_cache.put_metadata(source, metadata)
+        return metadata
+
+    def __prefetch(self, source: str):
+        """Starts download of source in the background, if it is a URL."""
+        if is_url(source):
+            self.__download_manager.prefetch(source)
+
+    @staticmethod
+    def __build_show_download_progress(loading: 'LoadingIndicator') -> typ.Callable[[int, typ.Optional[int]], None]:
+        def show_download_progress(bytes_downloaded: int, total_bytes: typ.Optional[int]):
+            message = f'Downloaded {format_byte_size(bytes_downloaded)}'
+            if total_bytes is not None:
+                message += f' of {format_byte_size(total_bytes)}'
+            loading.set_message(message)
+
+        return show_download_progress
+
+    def __show_read_progress(self, rows: int, bytes_read: int, total_bytes: typ.Optional[int]):
+        message = f'Read {rows:,} interactions, {format_byte_size(bytes_read)}'
+        if total_bytes is not None:
+            message += f' of {format_byte_size(total_bytes)}'
+        self.__graph_data_loading.set_message(message)
+
     def build_handle_upload_metadata(self, upload_origin: UploadOrigin) -> typ.Callable:
         def handle_local_upload_metadata(change):
             # Hide widgets and output in case this is a reupload
@@ -300,10 +379,12 @@ class UIDataUploadManager(object):
                         f.write(w.data)
                         self.__metadata_data_text.value = w.filename
                     # Load metadata
-                    self.__metadata = vtna.data_import.MetadataTable(UIDataUploadManager.UPLOAD_DIR + w.filename)
+                    self.__metadata = self.__read_metadata(UIDataUploadManager.UPLOAD_DIR + w.filename)
                 elif upload_origin is self.UploadOrigin.NETWORK:
                     file = self.__metadata_data_text.value
-                    self.__metadata = vtna.data_import.MetadataTable(file)
+                    # Graph data is likely uploaded next, so download it concurrently
+                    self.__prefetch(self.__graph_data_text.value)
+                    self.__metadata = self.__read_metadata(file)
                 # Initialize orders as disabled
                 self.__order_enabled = dict([(i, False) for i in range(len(self.__metadata.get_attribute_names()))])
                 self.__metadata_loading.stop()
@@ -345,22 +426,29 @@ class UIDataUploadManager(object):
             if prepend_msgs is not None:
                 for msg in prepend_msgs:
                     print(msg)
-            print_edge_stats(self.__edge_list)
+            print_edge_stats(self.__edge_table)
         # Collect/Generate data for edge histogram plot
-        earliest, _ = vtna.data_import.get_time_interval_of_edges(self.__edge_list)
         granularity = self.__granularity
         title = f'Interactions in interval bins of length {granularity} seconds'
-        histogram = vtna.statistics.histogram_edges(self.__edge_list, granularity)
-        x = list(range(len(histogram)))
+        histogram = self.__edge_table.histogram(granularity)
         with self.__graph_hist_output:
             ipydisplay.clear_output()
             # Plot edge histogram
             plt.figure(figsize=(14, 4))
-            _ = plt.bar(list(range(len(histogram))), histogram)
+            if len(histogram) <= UIDataUploadManager.MAX_HISTOGRAM_BARS:
+                _ = plt.bar(np.arange(len(histogram)), histogram)
+            else:
+                # Bars would be narrower than pixels, plot maximum of groups of adjacent intervals as area instead
+                group_starts = np.linspace(0, len(histogram), UIDataUploadManager.MAX_HISTOGRAM_BARS,
+                                           endpoint=False).astype(np.int64)
+                peaks = np.maximum.reduceat(histogram, group_starts)
+                _ = plt.fill_between(np.append(group_starts, len(histogram)), np.append(peaks, peaks[-1]),
+                                     step='post')
+                plt.xlim(0, len(histogram))
             plt.title(title)
             plt.xlabel(f'Time intervals of length {granularity} seconds')
             plt.ylabel('Number of interactions')
-            plt.xticks(x, [''] * len(x))
+            plt.xticks([])
             plt.show()
         self.__graph_data_output.layout.display = 'block'
         self.__graph_hist_output.layout.display = 'block'
@@ -435,8 +523,8 @@ class UIDataUploadManager(object):
         rename_button.on_click(apply_rename)
 
     def __open_graph_config(self):
-        earliest, latest = vtna.data_import.get_time_interval_of_edges(self.__edge_list)
-        update_delta = vtna.data_import.infer_update_delta(self.__edge_list)
+        earliest, latest = self.__edge_table.get_time_interval()
+        update_delta = self.__edge_table.infer_update_delta()
         self.__granularity = update_delta * 100
 
         # Maps time unit strings to corresponding length in seconds
@@ -547,10 +635,600 @@ class UIDataUploadManager(object):
         ]
 
 
-def print_edge_stats(edges: typ.List[vtna.data_import.TemporalEdge]):
-    print('Total Edges:', len(edges))
-    print('Inferred Update Interval:', vtna.data_import.infer_update_delta(edges), 'seconds')
-    interval = vtna.data_import.get_time_interval_of_edges(edges)
+def format_byte_size(size: int) -> str:
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+class EdgeTable(object):
+    # Number of bytes parsed at once while reading
+    READ_CHUNK_SIZE = 1 << 20
+    # Maximum number of bins of the base histogram, see histogram()
+    BASE_HISTOGRAM_MAX_BINS = 1 << 22
+
+    def __init__(self, timestamps: np.ndarray, nodes1: np.ndarray, nodes2: np.ndarray):
+        """
+        Temporal edges as columns of int64 timestamps and int32 node IDs, which take a fraction of the memory
+        of TemporalEdge objects. Node IDs are int64, if they exceed int32. Use read() to read tables.
+        """
+        self.__timestamps = timestamps
+        self.__nodes1 = nodes1
+        self.__nodes2 = nodes2
+        # Computed on first use, edge tables are not changed
+        self.__sorted_timestamps = None  # type: np.ndarray
+        self.__update_delta = None  # type: int
+        self.__base_histogram = None  # type: typ.Tuple[int, np.ndarray]
+
+    @staticmethod
+    def read(source: str, progress: typ.Callable[[int, int, typ.Optional[int]], None] = None) -> 'EdgeTable':
+        """
+        Reads a whitespace separated table of edges with the columns timestamp, node 1 and node 2 in chunks,
+        so the table is never held in memory as a whole. Further columns are ignored. Tables compressed with
+        gzip, bzip2, xz or zip are decompressed while reading, zip archives only from files.
+
+        Args:
+            source: Path or URL of the table.
+            progress: Called after each chunk with the number of rows read, the number of bytes read
+                from the source and its size in bytes, which is None if unknown.
+
+        Raises:
+            ValueError: If the first three columns are not integers.
+        """
+        if is_url(source):
+            raw = urllib.request.urlopen(source)
+            content_length = raw.headers.get('Content-Length')
+            total_size = int(content_length) if content_length is not None else None
+        else:
+            raw = open(source, 'rb', buffering=0)
+            total_size = os.path.getsize(source)
+        counter = ByteCountingReader(raw)
+        with raw, open_decompressed(io.BufferedReader(counter)) as stream:
+            columns = list()  # type: typ.List[typ.Tuple[np.ndarray, np.ndarray, np.ndarray]]
+            rows = 0
+            remainder = b''
+            while True:
+                data = stream.read(EdgeTable.READ_CHUNK_SIZE)
+                # Only complete lines are parsed, the rest is prepended to the next chunk
+                chunk = remainder + data
+                end = len(chunk) if len(data) == 0 else chunk.rfind(b'\n') + 1
+                chunk, remainder = chunk[:end], chunk[end:]
+                edges = parse_edge_rows(chunk)
+                # Columns are copied, so the rows of the chunk are freed
+                columns.append((edges[:, 0].copy(), edges[:, 1].copy(), edges[:, 2].copy()))
+                rows += len(edges)
+                if progress is not None:
+                    # Zip archives are read partly twice
+                    bytes_read = counter.get_count() if total_size is None else min(counter.get_count(), total_size)
+                    progress(rows, bytes_read, total_size)
+                if len(data) == 0:
+                    break
+        timestamps, nodes1, nodes2 = [np.concatenate(column) for column in zip(*columns)]
+        return EdgeTable(timestamps, narrow_node_ids(nodes1), narrow_node_ids(nodes2))
+
+    def __len__(self):
+        return len(self.__timestamps)
+
+    def get_timestamps(self) -> np.ndarray:
+        return self.__timestamps
+
+    def get_nodes1(self) -> np.ndarray:
+        return self.__nodes1
+
+    def get_nodes2(self) -> np.ndarray:
+        return self.__nodes2
+
+    def get_sorted_timestamps(self) -> np.ndarray:
+        """Returns timestamps in ascending order."""
+        if self.__sorted_timestamps is None:
+            self.__sorted_timestamps = np.sort(self.__timestamps)
+        return self.__sorted_timestamps
+
+    def get_time_interval(self) -> typ.Tuple[int, int]:
+        """Returns earliest and latest timestamp."""
+        sorted_timestamps = self.get_sorted_timestamps()
+        return int(sorted_timestamps[0]), int(sorted_timestamps[-1])
+
+    def infer_update_delta(self) -> int:
+        """
+        Returns the update interval of the measurement in seconds, as inferred by vtna. Only one edge of each
+        timestamp is passed to vtna, which infers the interval from the timestamps.
+        """
+        if self.__update_delta is None:
+            _, rows = np.unique(self.__timestamps, return_index=True)
+            edges = list(map(vtna.data_import.TemporalEdge, self.__timestamps[rows].tolist(),
+                             self.__nodes1[rows].tolist(), self.__nodes2[rows].tolist()))
+            self.__update_delta = vtna.data_import.infer_update_delta(edges)
+        return self.__update_delta
+
+    def histogram(self, granularity: int) -> np.ndarray:
+        """
+        Returns number of edges in each interval of length granularity, beginning at the earliest timestamp.
+        Histograms of multiples of the update interval are re-binned from a cached histogram of the update interval,
+        so changing the granularity does not process the edges again.
+        """
+        bin_width, base_histogram = self.__get_base_histogram()
+        if granularity % bin_width == 0:
+            factor = granularity // bin_width
+            return np.add.reduceat(base_histogram, np.arange(0, len(base_histogram), factor))
+        # Count timestamps before each interval boundary
+        earliest, latest = self.get_time_interval()
+        boundaries = earliest + granularity * np.arange(1, (latest - earliest) // granularity + 1, dtype=np.int64)
+        counts = np.searchsorted(self.get_sorted_timestamps(), boundaries)
+        return np.diff(np.concatenate([[0], counts, [len(self)]]))
+
+    def __get_base_histogram(self) -> typ.Tuple[int, np.ndarray]:
+        """
+        Returns bin width and histogram of the finest granularity, the update interval. Its multiple is used,
+        if the histogram would exceed BASE_HISTOGRAM_MAX_BINS.
+        """
+        if self.__base_histogram is None:
+            earliest, latest = self.get_time_interval()
+            update_delta = self.infer_update_delta()
+            bins = (latest - earliest) // update_delta + 1
+            bin_width = update_delta * -(-bins // EdgeTable.BASE_HISTOGRAM_MAX_BINS)
+            self.__base_histogram = bin_width, np.bincount((self.__timestamps - earliest) // bin_width)
+        return self.__base_histogram
+
+    def fingerprint(self) -> str:
+        """Returns hash of the edges, independent of their order."""
+        rows = np.column_stack([self.__timestamps, self.__nodes1, self.__nodes2]).astype(np.int64)
+        rows = rows[np.lexsort(rows.T[::-1])]
+        return hashlib.sha1(rows.tobytes()).hexdigest()
+
+    def to_temporal_edges(self) -> typ.List[vtna.data_import.TemporalEdge]:
+        """Returns edges as TemporalEdge objects, as required by vtna."""
+        return list(map(vtna.data_import.TemporalEdge,
+                        self.__timestamps.tolist(), self.__nodes1.tolist(), self.__nodes2.tolist()))
+
+
+class ImportCache(object):
+    # Version of the format of cached tables, cached tables of other versions are parsed again
+    VERSION = 1
+    # Number of bytes hashed at once
+    HASH_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir: str, max_disk_bytes: int = 1 << 30):
+        """
+        Cache of edge tables and metadata tables parsed from files, so known files are loaded without parsing.
+        Files are identified by the hash of their content, which is only computed again, if the size or
+        modification time of the file changed since it was hashed.
+
+        Args:
+            cache_dir: Directory of the cached tables, which is created if necessary.
+            max_disk_bytes: Maximal number of bytes of the cached tables. Least recently used tables
+                are removed first.
+        """
+        self.__cache_dir = cache_dir
+        self.__max_disk_bytes = max_disk_bytes
+        if not os.path.isdir(self.__cache_dir):
+            os.makedirs(self.__cache_dir)
+        self.__index_path = os.path.join(self.__cache_dir, 'index.json')
+        # Absolute paths of hashed files to their size, modification time and hash
+        self.__index = self.__load_index()  # type: typ.Dict[str, typ.Dict[str, typ.Any]]
+
+    def get_edge_table(self, path: str) -> typ.Optional[EdgeTable]:
+        """Returns cached edge table of the file or None."""
+        cache_path = self.__get_cache_path(path, 'edges.npz')
+        if not os.path.isfile(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as arrays:
+                if int(arrays['version']) != ImportCache.VERSION:
+                    return None
+                columns = arrays['timestamps'], arrays['nodes1'], arrays['nodes2']
+        except (OSError, ValueError, KeyError):
+            # Unreadable files are parsed and cached again
+            return None
+        if len(set(map(len, columns))) != 1:
+            return None
+        touch_files([cache_path])
+        return EdgeTable(*columns)
+
+    def put_edge_table(self, path: str, edge_table: EdgeTable):
+        with open_temp_file(self.__get_cache_path(path, 'edges.npz')) as f:
+            np.savez(f, version=ImportCache.VERSION, timestamps=edge_table.get_timestamps(),
+                     nodes1=edge_table.get_nodes1(), nodes2=edge_table.get_nodes2())
+        self.__prune(path)
+
+    def get_metadata(self, path: str) -> typ.Optional[vtna.data_import.MetadataTable]:
+        """Returns cached metadata table of the file or None."""
+        cache_path = self.__get_cache_path(path, 'metadata.pickle')
+        if not os.path.isfile(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                version, metadata = pickle.load(f)
+        except (OSError, ValueError, TypeError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Unreadable files, e.g. of metadata tables of another vtna version, are parsed and cached again
+            return None
+        if version != ImportCache.VERSION or not isinstance(metadata, vtna.data_import.MetadataTable):
+            return None
+        touch_files([cache_path])
+        return metadata
+
+    def put_metadata(self, path: str, metadata: vtna.data_import.MetadataTable):
+        """Caches a metadata table, which must not be changed yet, e.g. by renaming attributes."""
+        with open_temp_file(self.__get_cache_path(path, 'metadata.pickle')) as f:
+            pickle.dump((ImportCache.VERSION, metadata), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__prune(path)
+
+    def __prune(self, path: str):
+        """Removes least recently used tables, except the ones of the file at path, which were just cached."""
+        prune_cache_dir(self.__cache_dir, self.__max_disk_bytes, keep={'index', self.__hash_file(path)})
+
+    def __get_cache_path(self, path: str, name: str) -> str:
+        return os.path.join(self.__cache_dir, f'{self.__hash_file(path)}.{name}')
+
+    def __hash_file(self, path: str) -> str:
+        """Returns SHA-1 hash of the file's content, hashed again only if the file changed since it was hashed."""
+        stat = os.stat(path)
+        entry = self.__index.get(os.path.abspath(path))
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['hash']
+        content_hash = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(ImportCache.HASH_CHUNK_SIZE), b''):
+                content_hash.update(block)
+        self.__index[os.path.abspath(path)] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'hash': content_hash.hexdigest()
+        }
+        with open_temp_file(self.__index_path, mode='w') as f:
+            json.dump(self.__index, f)
+        return content_hash.hexdigest()
+
+    def __load_index(self) -> typ.Dict[str, typ.Dict[str, typ.Any]]:
+        try:
+            with open(self.__index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return dict()
+
+
+class DownloadManager(object):
+    # Number of bytes written at once while downloading
+    CHUNK_SIZE = 1 << 16
+    # Number of attempts of a download, failed attempts are resumed by the next one
+    ATTEMPTS = 3
+    # Seconds to wait after a failed attempt, doubled after each further one
+    RETRY_DELAY = 0.5
+    # Seconds to wait for a connection or data, before the attempt fails
+    TIMEOUT = 30
+
+    def __init__(self, download_dir: str, workers: int = 2, max_disk_bytes: int = 1 << 30):
+        """
+        Downloads files of URLs into a directory, which caches them. Downloaded files are revalidated with their
+        ETag or Last-Modified header and only downloaded again, if they changed. Interrupted downloads are resumed
+        with range requests. Downloads run in a thread pool, so several files are downloaded concurrently.
+
+        Args:
+            download_dir: Directory of the downloaded files, which is created if necessary.
+            workers: Maximum number of concurrent downloads.
+            max_disk_bytes: Maximal number of bytes of the downloaded files. Least recently used files
+                are removed first, partial files of running downloads are kept.
+        """
+        self.__download_dir = download_dir
+        self.__max_disk_bytes = max_disk_bytes
+        if not os.path.isdir(self.__download_dir):
+            os.makedirs(self.__download_dir)
+        self.__index_path = os.path.join(self.__download_dir, 'index.json')
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        # Guards index, running downloads and progress listeners
+        self.__lock = threading.Lock()
+        # URLs to their file name, validators and whether the file is complete
+        self.__index = self.__load_index()  # type: typ.Dict[str, typ.Dict[str, typ.Any]]
+        self.__downloads = dict()  # type: typ.Dict[str, concurrent.futures.Future]
+        self.__progress_listeners = collections.defaultdict(list)  # type: typ.Dict[str, typ.List[typ.Callable]]
+
+    def download(self, url: str, progress: typ.Callable[[int, typ.Optional[int]], None] = None) -> str:
+        """
+        Returns path of the downloaded file of url. Waits for a running download of url instead of starting another.
+
+        Args:
+            url: URL of the file.
+            progress: Called with the number of bytes downloaded and the size of the file, which is None if unknown.
+
+        Raises:
+            urllib.error.URLError: If the URL is not accessible.
+            OSError: If the download failed in all attempts.
+        """
+        if progress is not None:
+            with self.__lock:
+                self.__progress_listeners[url].append(progress)
+        try:
+            return self.prefetch(url).result()
+        finally:
+            if progress is not None:
+                with self.__lock:
+                    self.__progress_listeners[url].remove(progress)
+                    if len(self.__progress_listeners[url]) == 0:
+                        del self.__progress_listeners[url]
+
+    def prefetch(self, url: str) -> concurrent.futures.Future:
+        """Starts download of url in the background, unless it is running already. Returns future of its path."""
+        with self.__lock:
+            if url not in self.__downloads:
+                self.__downloads[url] = self.__executor.submit(self.__download, url)
+            return self.__downloads[url]
+
+    def __download(self, url: str) -> str:
+        try:
+            delay = DownloadManager.RETRY_DELAY
+            for attempt in range(1, DownloadManager.ATTEMPTS + 1):
+                try:
+                    return self.__fetch(url)
+                except urllib.error.HTTPError as error:
+                    # Only server errors may be temporary
+                    if error.code < 500 or attempt == DownloadManager.ATTEMPTS:
+                        raise
+                except OSError:
+                    # Includes connection errors and timeouts
+                    if attempt == DownloadManager.ATTEMPTS:
+                        raise
+                time.sleep(delay)
+                delay *= 2
+        finally:
+            # Later calls download again, e.g. after an error or to revalidate the file
+            with self.__lock:
+                del self.__downloads[url]
+
+    def __fetch(self, url: str) -> str:
+        """Downloads url in a single request, which revalidates the complete or resumes the partial file."""
+        with self.__lock:
+            entry = dict(self.__index.get(url, {'file': self.__get_file_name(url), 'complete': False}))
+        path = os.path.join(self.__download_dir, entry['file'])
+        part_path = f'{path}.part'
+        validator = entry.get('etag') or entry.get('last_modified')
+        request = urllib.request.Request(url)
+        offset = 0
+        if entry['complete'] and os.path.isfile(path):
+            if entry.get('etag') is not None:
+                request.add_header('If-None-Match', entry['etag'])
+            if entry.get('last_modified') is not None:
+                request.add_header('If-Modified-Since', entry['last_modified'])
+        elif os.path.isfile(part_path) and validator is not None:
+            # If-Range makes the server send the whole file instead, if it changed in the meantime
+            offset = os.path.getsize(part_path)
+            request.add_header('Range', f'bytes={offset}-')
+            request.add_header('If-Range', validator)
+        try:
+            response = urllib.request.urlopen(request, timeout=DownloadManager.TIMEOUT)
+        except urllib.error.HTTPError as error:
+            if error.code == 304 and entry['complete']:
+                touch_files([path])
+                size = os.path.getsize(path)
+                self.__report_progress(url, size, size)
+                return path
+            elif error.code == 416:
+                # The partial file is not a prefix of the file anymore
+                os.remove(part_path)
+                return self.__fetch(url)
+            raise
+        with response:
+            # Servers without support of range requests send the whole file
+            if response.getcode() != 206:
+                offset = 0
+            entry.update(etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'),
+                         complete=False)
+            self.__put_entry(url, entry)
+            content_length = response.headers.get('Content-Length')
+            total_size = offset + int(content_length) if content_length is not None else None
+            received = offset
+            self.__report_progress(url, received, total_size)
+            with open(part_path, 'ab' if offset > 0 else 'wb') as f:
+                try:
+                    for block in iter(lambda: response.read(DownloadManager.CHUNK_SIZE), b''):
+                        f.write(block)
+                        received += len(block)
+                        self.__report_progress(url, received, total_size)
+                except http.client.IncompleteRead as error:
+                    raise ConnectionError(f'Connection to {url} closed during download') from error
+            if total_size is not None and received < total_size:
+                raise ConnectionError(f'Download of {url} ended after {received} of {total_size} bytes')
+        os.replace(part_path, path)
+        entry['complete'] = True
+        self.__put_entry(url, entry)
+        self.__prune()
+        return path
+
+    def __prune(self):
+        """Removes least recently used downloads, except files of running downloads, see prune_cache_dir()."""
+        with self.__lock:
+            running_files = [self.__index.get(url, {}).get('file') or self.__get_file_name(url)
+                             for url in self.__downloads]
+            # Names of cache entries end at the first dot
+            keep = {'index'} | set(file_name.split('.', 1)[0] for file_name in running_files)
+        prune_cache_dir(self.__download_dir, self.__max_disk_bytes, keep=keep)
+
+    def __report_progress(self, url: str, received: int, total_size: typ.Optional[int]):
+        with self.__lock:
+            listeners = list(self.__progress_listeners.get(url, []))
+        for listener in listeners:
+            listener(received, total_size)
+
+    def __put_entry(self, url: str, entry: typ.Dict[str, typ.Any]):
+        with self.__lock:
+            self.__index[url] = entry
+            with open_temp_file(self.__index_path, mode='w') as f:
+                json.dump(self.__index, f)
+
+    def __load_index(self) -> typ.Dict[str, typ.Dict[str, typ.Any]]:
+        try:
+            with open(self.__index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return dict()
+
+    @staticmethod
+    def __get_file_name(url: str) -> str:
+        """Returns unique file name of url, which ends with the file name in url for readability."""
+        name = re.sub(r'[^\w.-]', '_', os.path.basename(urllib.parse.urlparse(url).path)) or 'download'
+        return f'{hashlib.sha1(url.encode()).hexdigest()[:16]}-{name}'
+
+
+@contextlib.contextmanager
+def open_temp_file(path: str, mode: str = 'wb') -> typ.Iterator[typ.IO]:
+    """Opens temporary file, which replaces the file at path when closed, so it is never read partially written."""
+    temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def prune_cache_dir(cache_dir: str, max_bytes: int, keep: typ.Container[str] = ()) -> typ.List[str]:
+    """
+    Removes the least recently modified entries of a cache directory, until all entries take at most max_bytes.
+    Files of an entry share their name up to the first dot, e.g. key.ids.npy and key.positions.npy.
+    Entries in keep, e.g. indexes or entries in use, are never removed, but count towards max_bytes.
+    Temporary files of open_temp_file() are ignored.
+    Returns names of the removed entries.
+    """
+    # Entry names to their size, latest modification time and files
+    entries = dict()  # type: typ.Dict[str, typ.Tuple[int, int, typ.List[str]]]
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.tmp'):
+            continue
+        name = file_name.split('.', 1)[0]
+        path = os.path.join(cache_dir, file_name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Removed in the meantime, e.g. by another session
+            continue
+        size, mtime, paths = entries.get(name, (0, 0, []))
+        entries[name] = size + stat.st_size, max(mtime, stat.st_mtime_ns), paths + [path]
+    total_size = sum(size for size, _, _ in entries.values())
+    removed = list()
+    for name, (size, _, paths) in sorted(entries.items(), key=lambda item: item[1][1]):
+        if total_size <= max_bytes:
+            break
+        if name in keep:
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total_size -= size
+        removed.append(name)
+    return removed
+
+
+def touch_files(paths: typ.Iterable[str]):
+    """Sets modification time of files to now, so prune_cache_dir() keeps them as recently used."""
+    for path in paths:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+def is_url(source: str) -> bool:
+    """Returns whether source is a URL, which is downloaded, or a path of a file."""
+    return urllib.parse.urlparse(source).scheme in ['http', 'https', 'ftp']
+
+
+def narrow_node_ids(node_ids: np.ndarray) -> np.ndarray:
+    """Returns int64 node IDs as int32 array, if they fit."""
+    int32_info = np.iinfo(np.int32)
+    if len(node_ids) == 0 or (node_ids.min() >= int32_info.min and node_ids.max() <= int32_info.max):
+        return node_ids.astype(np.int32)
+    return node_ids
+
+
+class ByteCountingReader(io.RawIOBase):
+    def __init__(self, raw: typ.BinaryIO):
+        """Unbuffered binary stream counting the bytes read from another one."""
+        super().__init__()
+        self.__raw = raw
+        self.__count = 0
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self.__raw.readinto(buffer)
+        self.__count += count or 0
+        return count
+
+    def seekable(self) -> bool:
+        return self.__raw.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.__raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.__raw.tell()
+
+
+def open_decompressed(stream: io.BufferedReader) -> typ.BinaryIO:
+    """Returns stream of the decompressed content, if stream is compressed, which is recognized by its first bytes."""
+    magic = stream.peek(6)[:6]
+    if magic.startswith(b'\x1f\x8b'):
+        return gzip.GzipFile(fileobj=stream)
+    elif magic.startswith(b'BZh'):
+        return bz2.BZ2File(stream)
+    elif magic.startswith(b'\xfd7zXZ\x00'):
+        return lzma.LZMAFile(stream)
+    elif magic.startswith(b'PK\x03\x04'):
+        if not stream.seekable():
+            raise OSError('Zip archives can only be read from files')
+        archive = zipfile.ZipFile(stream)
+        return archive.open(archive.namelist()[0])
+    return stream
+
+
+# Lookup table of bytes, True for ASCII whitespace
+WHITESPACE_BYTES = np.zeros(256, dtype=bool)
+WHITESPACE_BYTES[list(b' \t\r\n\x0b\x0c')] = True
+
+
+def parse_edge_rows(chunk: bytes) -> np.ndarray:
+    """
+    Returns (rows, 3) int64 array of the first three columns of the whitespace separated lines in chunk.
+    Empty lines are skipped.
+
+    Raises:
+        ValueError: If a line has less than three columns or these are not integers.
+    """
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    whitespace = WHITESPACE_BYTES[data]
+    token_starts = ~whitespace
+    token_starts[1:] &= whitespace[:-1]
+    # Number of values in each line, which must be equal to read all values at once
+    line_values = np.bincount(np.cumsum(data == ord('\n'))[token_starts])
+    line_values = line_values[line_values > 0]
+    if len(line_values) == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    if line_values.min() >= 3 and line_values.min() == line_values.max():
+        try:
+            values = np.array(chunk.split(), dtype=np.int64)
+        except ValueError:
+            values = None
+        if values is not None:
+            return values.reshape(len(line_values), -1)[:, :3]
+    # Lines with differing numbers of columns, or invalid values, which raise the error
+    rows = [[int(value) for value in line.split()[:3]] for line in chunk.splitlines() if len(line.split()) > 0]
+    if any(len(row) < 3 for row in rows):
+        raise ValueError('Edge tables must have at least three columns')
+    return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+
+def print_edge_stats(edge_table: EdgeTable):
+    print('Total Edges:', len(edge_table))
+    print('Inferred Update Interval:', edge_table.infer_update_delta(), 'seconds')
+    interval = edge_table.get_time_interval()
     print('Total Dataset Time:', str(datetime.timedelta(seconds=(interval[1]-interval[0]))), 'hours')
 
 
@@ -599,6 +1277,8 @@ def create_html_metadata_summary(metadata: vtna.data_import.MetadataTable, order
 class UIGraphDisplayManager(object):
     DEFAULT_UPDATE_DELTA = 20
     DEFAULT_LAYOUT_IDX = 0
+    # Timesteps per chunk of layouts computed in the background, if frames are not windowed
+    DEFAULT_LAYOUT_CHUNK_SIZE = 50
     LAYOUT_FUNCTIONS = [
         vtna.layout.static_spring_layout,
         vtna.layout.flexible_spring_layout,
@@ -615,10 +1295,31 @@ class UIGraphDisplayManager(object):
                  export_vbox: widgets.VBox,
                  cumulative_hbox: widgets.HBox,
                  loading_indicator: 'LoadingIndicator',
-                 style_manager: 'UIDefaultStyleOptionsManager'
+                 style_manager: 'UIDefaultStyleOptionsManager',
+                 # Send filter and style changes to the displayed plot instead of displaying it again
+                 client_side_updates: bool = False,
+                 # Send frames in compact encoding, which is expanded into plotly frames in the browser
+                 compact_frames: bool = False,
+                 # Build and send frames in windows of this many timesteps, following windows are loaded while
+                 # the slider moves. None sends all frames at once.
+                 frame_window: int = None,
+                 # Directory, where computed layouts are stored to be reused across sessions
+                 layout_cache_dir: str = None,
+                 # Directory, where layouts and edges of frames are memory-mapped instead of kept in memory
+                 frame_store_dir: str = None,
+                 # Number of processes rendering videos and computing layouts, None uses all CPUs.
+                 # Limit it on shared hosts.
+                 workers: int = None
                  ):
         self.__display_output = display_output
         self.__display_size = display_size
+        self.__workers = workers
+
+        self.__client_side_updates = client_side_updates
+        self.__compact_frames = compact_frames
+        self.__frame_window = frame_window
+        self.__figure_channel = FigureChannel()
+        self.__figure_channel.on_request(self.__build_handle_frames_request())
 
         self.__style_manager = style_manager
         self.__style_manager.register_graph_display_manager(self)
@@ -632,18 +1333,35 @@ class UIGraphDisplayManager(object):
         self.__loading_indicator = loading_indicator
 
         self.__cumulative_checkbox = None
+        # Whether the temporal graph is set to cumulative graphs
+        self.__cumulative = False
 
         self.__temp_graph = None  # type: vtna.graph.TemporalGraph
         self.__update_delta = UIGraphDisplayManager.DEFAULT_UPDATE_DELTA  # type: int
         self.__granularity = None  # type: int
 
         self.__layout_function = UIGraphDisplayManager.LAYOUT_FUNCTIONS[UIGraphDisplayManager.DEFAULT_LAYOUT_IDX]
+        self.__layout_cache = LayoutCache(cache_dir=layout_cache_dir)
+        self.__timestep_memo = TimestepLayoutMemo()
+        self.__frame_store = FrameStore(frame_store_dir) if frame_store_dir is not None else None
+        # Edge indexes of the temporal graph by cumulative flag, built on demand if there is a frame store
+        self.__edge_indexes = dict()  # type: typ.Dict[bool, EdgeIndex]
+        # Fingerprint of the edges of the temporal graph, which identifies its layouts in the cache
+        self.__graph_fingerprint = None  # type: str
 
         self.__node_measure_manager = None  # type: NodeMeasuresManager
 
         self.__figure = None  # type: TemporalGraphFigure
+        # The figure is changed by layout computations in the background, see __apply_layout
+        self.__figure_lock = threading.RLock()
+        # Frame windows of the displayed plot, which have been sent
+        self.__sent_windows = set()  # type: typ.Set[int]
         self.__video_export_manager = None  # type: VideoExport
 
+        self.__layout_computation = None  # type: LayoutComputation
+        # Layout function, cumulative flag and layout before the running layout computation, restored on cancel
+        self.__layout_before_computation = None  # type: typ.Tuple[typ.Callable, bool, LayoutArray]
+
         self.__init_layout_selection_widgets()
         self.__init_export_widgets()
 
@@ -706,6 +1424,13 @@ class UIGraphDisplayManager(object):
             tooltip='Apply Layout',
         )
         self.__apply_layout_button.on_click(self.__build_apply_layout())
+        self.__cancel_layout_button = widgets.Button(
+            description='Cancel',
+            tooltip='Stop computing the layout and restore the previous one',
+            layout=widgets.Layout(display='none')
+        )
+        self.__cancel_layout_button.on_click(self.__build_cancel_layout())
+        self.__layout_progress_label = widgets.Label()
         self.__set_current_layout_widgets()
 
     def __init_export_widgets(self):
@@ -758,27 +1483,63 @@ class UIGraphDisplayManager(object):
             orientation='horizontal',
             layout=widgets.Layout(display='none')
         )
+        self.__cancel_export_button = widgets.Button(
+            description='Cancel',
+            tooltip='Stop the running export, it can be resumed later',
+            layout=widgets.Layout(display='none')
+        )
+        self.__resume_export_button = widgets.Button(
+            description='Resume',
+            button_style='primary',
+            tooltip='Continue the stopped export',
+            layout=widgets.Layout(display='none')
+        )
+        # Link to finished export or error of stopped export
+        self.__export_status_html = widgets.HTML()
         self.__export_format_dropdown.observe(self.__build_configure_export())
         self.__export_frame_length_text.observe(self.__build_configure_export())
         self.__export_speedup_empty_frames_checkbox.observe(self.__build_configure_export())
         self.__download_button.on_click(self.__build_export_video())
+        self.__cancel_export_button.on_click(self.__build_cancel_export())
+        self.__resume_export_button.on_click(self.__build_resume_export())
         self.__export_vbox.children = [
             self.__export_format_dropdown,
             widgets.HBox([self.__export_resolution, widgets.Label("pixels")]),
             widgets.HBox([self.__export_frame_length_text, widgets.Label(value="ms")]),
             self.__export_range_slider,
             widgets.HBox([self.__export_speedup_empty_frames_checkbox, self.__export_speedup_warning]),
-            widgets.HBox([self.__download_button, self.__export_progressbar])
+            widgets.HBox([self.__download_button, self.__export_progressbar,
+                          self.__cancel_export_button, self.__resume_export_button]),
+            self.__export_status_html
         ]
 
     def init_temporal_graph(self,
-                            edge_list: typ.List[vtna.data_import.TemporalEdge],
+                            edge_table: 'EdgeTable',
                             metadata: vtna.data_import.MetadataTable,
                             granularity: int,
                             selected_measures: typ.Dict[str, bool],
                             ):
-        self.__temp_graph = vtna.graph.TemporalGraph(edge_list, metadata, granularity)
-        layout = self.__compute_layout()
+        graph_fingerprint = edge_table.fingerprint()
+        with self.__figure_lock:
+            # Layout computed for the previous graph is not needed anymore
+            self.__stop_layout_computation()
+            self.__layout_before_computation = None
+            self.__show_layout_progress(None)
+            # After changing the granularity, the layout starts from the positions of the previous one
+            seed_layout = self.__figure.get_layout().snapshot() \
+                if self.__figure is not None and graph_fingerprint == self.__graph_fingerprint else None
+            previous_granularity = self.__temp_graph.get_granularity() if seed_layout is not None else None
+        # vtna builds graphs of TemporalEdge objects, which are only created for this
+        self.__temp_graph = vtna.graph.TemporalGraph(edge_table.to_temporal_edges(), metadata, granularity)
+        self.__cumulative = False
+        self.__edge_indexes = dict()
+        self.__graph_fingerprint = graph_fingerprint
+        seed_timesteps = None
+        if seed_layout is not None:
+            # Previous timestep containing the middle of each timestep
+            seed_timesteps = np.minimum((np.arange(len(self.__temp_graph)) * granularity + granularity // 2)
+                                        // previous_granularity, len(seed_layout) - 1)
+        layout = self.__compute_layout(seed_layout, seed_timesteps)
 
         self.__node_measure_manager = NodeMeasuresManager(self.__temp_graph,
                                                           [m for m, selected in selected_measures.items() if selected])
@@ -791,9 +1552,11 @@ class UIGraphDisplayManager(object):
                                             color_map=self.__style_manager.get_node_color(),
                                             edge_color=self.__style_manager.get_edge_color(),
                                             node_size=self.__style_manager.get_node_size(),
-                                            edge_width=self.__style_manager.get_edge_width()
+                                            edge_width=self.__style_manager.get_edge_width(),
+                                            frame_window=self.__frame_window,
+                                            edge_index=self.__get_edge_index()
                                             )
-        self.__update_delta = vtna.data_import.infer_update_delta(edge_list)
+        self.__update_delta = edge_table.infer_update_delta()
 
         # Set options for time range slider of export and make it visible
         options = [' ' + str(datetime.timedelta(seconds=timestep * self.__temp_graph.get_granularity())) + ' hours ' for timestep in range(len(self.__temp_graph))]
@@ -818,33 +1581,122 @@ class UIGraphDisplayManager(object):
         self.__queries_manager.register_graph_display_manager(self)
 
     def display_graph(self):
-        plot_div_html = plotly.offline.plot(self.__figure.get_figure(), include_plotlyjs=False,
-                                            config={'scrollZoom': True, 'modeBarButtonsToRemove': ['sendDataToCloud'],},
-                                            show_link=False, output_type='div')
-        # Remove js code that would cause autoplay
-        plot_div_html = re.sub("\\.then\\(function\\(\\)\\{Plotly\\.animate\\(\\'[0-9a-zA-Z-]*\\'\\)\\;\\}\\)", "",
-                               plot_div_html)
+        with self.__figure_lock:
+            self.__display_graph()
+
+    def __display_graph(self):
+        # With client side updates, filtered nodes are hidden in the browser, so they can be shown again later
+        visible_only = not self.__uses_client_state()
+        config = {'scrollZoom': True, 'modeBarButtonsToRemove': ['sendDataToCloud'],}
+        if self.__compact_frames:
+            div_id = str(uuid.uuid4())
+            # Escape closing tags in hover texts, so they do not end the script
+            compact_json = json.dumps(self.__figure.get_compact_figure(visible_only)).replace('</', '<\\/')
+            plot_div_html = f'<div id="{div_id}" class="plotly-graph-div"></div>' \
+                            f'<script>vtnaFigures.plotCompact("{div_id}", {compact_json}, ' \
+                            f'{json.dumps(dict(config, showLink=False))});</script>'
+        else:
+            figure = self.__figure.get_figure(visible_only)
+            plot_div_html = plotly.offline.plot(figure, include_plotlyjs=False, config=config,
+                                                show_link=False, output_type='div')
+            # Remove js code that would cause autoplay
+            plot_div_html = re.sub("\\.then\\(function\\(\\)\\{Plotly\\.animate\\(\\'[0-9a-zA-Z-]*\\'\\)\\;\\}\\)", "",
+                                   plot_div_html)
+            div_id = re.search('<div id="([0-9a-zA-Z-]+)"', plot_div_html).group(1)
+        if self.__uses_client_state():
+            plot_div_html += self.__figure_channel.attach(div_id, self.__figure.get_client_state())
+        else:
+            plot_div_html += self.__figure_channel.attach(div_id)
+        self.__sent_windows = {0}
+        if self.__frame_window is not None:
+            # Following frame windows are requested through the channel
+            self.__figure_channel.open()
+            plot_div_html += f'<script>vtnaFigures.loadFramesLazily("{div_id}", {self.__frame_window}, ' \
+                             f'{self.__figure.get_frame_count()});</script>'
         with self.__display_output:
             ipydisplay.clear_output()
             ipydisplay.display(ipydisplay.HTML(plot_div_html))
 
+    def __build_handle_frames_request(self) -> typ.Callable:
+        def handle_frames_request(request: typ.Dict[str, typ.Any]) -> typ.Optional[typ.Dict]:
+            if request['action'] != 'request_frames' or self.__figure is None:
+                return None
+            window = int(request['window'])
+            with self.__figure_lock:
+                self.__sent_windows.add(window)
+                response = self.__build_frames_message(*self.__figure.get_window_range(window))
+            response.update({'action': 'add_frames', 'window': window})
+            return response
+
+        return handle_frames_request
+
+    def __build_frames_message(self, start: int, stop: int) -> typ.Dict[str, typ.Any]:
+        """Returns frames of timesteps in [start, stop) for the plot div, in plotly or compact encoding."""
+        visible_only = not self.__uses_client_state()
+        if self.__compact_frames:
+            return {'compact': self.__figure.get_compact_frames(start, stop, visible_only)}
+        frames = self.__figure.get_frames(start, stop, visible_only)
+        # Comm messages must consist of plain JSON types
+        return {'frames': json.loads(json.dumps(frames, cls=plotly.utils.PlotlyJSONEncoder))}
+
+    def __send_replaced_frames(self, start: int, stop: int):
+        """Sends frames of timesteps in [start, stop) to the plot div, which has sent them before."""
+        for window in sorted(self.__sent_windows):
+            window_start, window_stop = self.__figure.get_window_range(window)
+            if max(start, window_start) < min(stop, window_stop):
+                message = self.__build_frames_message(max(start, window_start), min(stop, window_stop))
+                message['action'] = 'replace_frames'
+                self.__figure_channel.send(message)
+
+    def __refresh_graph(self, loading_shown: bool):
+        """
+        Shows changed filter and style of figure, without displaying the whole graph again if possible.
+        Otherwise the loading indicator is shown meanwhile, unless loading_shown.
+        """
+        if self.__can_update_in_browser():
+            self.__figure_channel.update(self.__figure.get_client_state())
+        elif loading_shown:
+            self.display_graph()
+        else:
+            # The changes made the figure time dependent, so it cannot be updated in the browser after all
+            self.__start_graph_loading()
+            self.display_graph()
+            self.__stop_graph_loading()
+
+    def __can_update_in_browser(self) -> bool:
+        return self.__uses_client_state() and self.__figure_channel.is_attached()
+
+    def __uses_client_state(self) -> bool:
+        """Returns whether filter and style are applied in the browser, see TemporalGraphFigure.get_client_state()."""
+        # Filters and colors differing per timestep are applied to the frames in the kernel
+        return self.__client_side_updates and not self.__figure.is_time_dependent()
+
     def get_temporal_graph(self) -> vtna.graph.TemporalGraph:
         return self.__temp_graph
 
     def notify(self, observable) -> None:
+        with self.__figure_lock:
+            self.__notify(observable)
+
+    def __notify(self, observable) -> None:
+        # Browser updates are quick, so the displayed graph is not replaced by the loading indicator
+        show_loading = not self.__can_update_in_browser()
         if isinstance(observable, UIAttributeQueriesManager):
             # => Call from QueryManager class
-            self.__start_graph_loading()
+            if show_loading:
+                self.__start_graph_loading()
 
-            node_filter = observable.get_node_filter()
-            self.__figure.update_filter(node_filter)
-            node_colors = observable.get_node_colors(self.__temp_graph, self.__style_manager.get_node_color())
+            node_mask = observable.get_node_mask()
+            self.__figure.update_filter(node_mask)
+            node_colors = observable.get_node_colors(self.__style_manager.get_node_color())
             self.__figure.update_colors(node_colors)
-            self.display_graph()
-            self.__stop_graph_loading()
+            self.__refresh_graph(loading_shown=show_loading)
+            if show_loading:
+                self.__stop_graph_loading()
         elif isinstance(observable, UIDefaultStyleOptionsManager):
-            self.__start_graph_loading()
-            node_colors = self.__queries_manager.get_node_colors(self.__temp_graph, observable.get_node_color())
+            if show_loading:
+                self.__start_graph_loading()
+            node_colors = self.__queries_manager.get_node_colors(observable.get_node_color())
             edge_color = self.__style_manager.get_edge_color()
             node_size = self.__style_manager.get_node_size()
             edge_width = self.__style_manager.get_edge_width()
@@ -854,11 +1706,15 @@ class UIGraphDisplayManager(object):
             self.__figure.update_node_size(node_size)
             self.__figure.update_edge_width(edge_width)
             self.__figure.update_animation_frame_length(frame_length)
-            self.display_graph()
-            self.__stop_graph_loading()
+            self.__refresh_graph(loading_shown=show_loading)
+            if show_loading:
+                self.__stop_graph_loading()
 
     def __display_layout_description(self):
         description_html = '<p style="color: blue;">{}</p>'.format(self.__layout_select.value.description)
+        if self.__layout_select.value not in LayoutComputation.CHUNKED_LAYOUT_FUNCTIONS:
+            description_html += '<p style="color: gray;">This layout is computed as a whole on one CPU, so the ' \
+                                'graph is shown once all timesteps are computed.</p>'
 
         with self.__layout_description_output:
             ipydisplay.clear_output()
@@ -866,25 +1722,132 @@ class UIGraphDisplayManager(object):
 
     def __build_apply_layout(self):
         def apply_layout(_):
-            # Disable button and change name to Loading...
-            self.__apply_layout_button.disabled = True
-            old_button_name = self.__apply_layout_button.description
-            self.__apply_layout_button.description = 'Loading...'
-            self.__start_graph_loading()
-            # Compute layout...
+            self.__remember_layout()
             self.__layout_function = self.__layout_select.value
-            layout = self.__compute_layout()
-            # ... and update figure
+            self.__apply_layout()
+
+        return apply_layout
+
+    def __build_cancel_layout(self):
+        def cancel_layout(_):
+            with self.__figure_lock:
+                if self.__layout_computation is None:
+                    return
+                self.__stop_layout_computation()
+                layout_function, cumulative, layout = self.__layout_before_computation
+                self.__layout_before_computation = None
+                self.__layout_function = layout_function
+                if cumulative != self.__cumulative:
+                    self.__cumulative = cumulative
+                    self.__temp_graph.set_cumulative(cumulative)
+                    # Observer ignores the change, since it equals the graph's state
+                    self.__cumulative_checkbox.value = cumulative
+                self.__show_layout_progress(None)
+                self.__start_graph_loading()
+                self.__figure.toggle_animate_transitions(not self.__layout_function.is_static)
+                self.__figure.update_layout(layout, edge_index=self.__get_edge_index())
+                self.display_graph()
+                self.__stop_graph_loading()
+
+        return cancel_layout
+
+    def __stop_layout_computation(self):
+        """Cancels running layout computation, its results are ignored."""
+        if self.__layout_computation is not None:
+            self.__layout_computation.cancel()
+            self.__layout_computation = None
+
+    def __remember_layout(self):
+        """Remembers the current layout, which is restored if the next layout computation is cancelled."""
+        with self.__figure_lock:
+            # While a computation runs, the layout before it is the last complete one
+            if self.__layout_computation is None:
+                self.__layout_before_computation = \
+                    (self.__layout_function, self.__cumulative, self.__figure.get_layout())
+
+    def __apply_layout(self, seed_layout: 'LayoutArray' = None, seed_timesteps: np.ndarray = None):
+        """
+        Displays graph with layout of applied layout function. Layouts not in the cache are computed in
+        the background and displayed as their timesteps are computed, starting from the positions of
+        seed_layout if set, see LayoutComputation.
+        """
+        parameters = self.__get_layout_parameters()
+        key = self.__build_layout_key(parameters)
+        layout = self.__layout_cache.get(key)
+        with self.__figure_lock:
+            self.__stop_layout_computation()
+            self.__start_graph_loading()
             self.__figure.toggle_animate_transitions(not self.__layout_function.is_static)
-            self.__figure.update_layout(layout)
-            # Enable button, restore old name
-            self.__apply_layout_button.description = old_button_name
-            self.__apply_layout_button.disabled = False
-            # Update graph display
+            if layout is not None:
+                self.__layout_before_computation = None
+                self.__show_layout_progress(None)
+                self.__figure.update_layout(layout, edge_index=self.__get_edge_index())
+            else:
+                # Timesteps are displayed without nodes until their layout is computed
+                self.__figure.update_layout(self.__create_empty_layout(), edge_index=self.__get_edge_index())
+                self.__layout_computation = LayoutComputation(
+                    layout_function=self.__layout_function,
+                    temp_graph=self.__temp_graph,
+                    parameters=parameters,
+                    chunk_size=self.__frame_window or UIGraphDisplayManager.DEFAULT_LAYOUT_CHUNK_SIZE,
+                    chunk_computed=self.__build_layout_chunk_computed(),
+                    computation_finished=self.__build_layout_computation_finished(key),
+                    computation_failed=self.__build_layout_computation_failed(),
+                    timestep_memo=self.__timestep_memo,
+                    workers=self.__workers,
+                    frame_store=self.__frame_store,
+                    seed_layout=seed_layout,
+                    seed_timesteps=seed_timesteps
+                )
+                self.__show_layout_progress(0)
             self.display_graph()
             self.__stop_graph_loading()
+            if self.__layout_computation is not None:
+                self.__layout_computation.start()
+
+    # Layout computation callbacks are called from its background thread
+    def __build_layout_chunk_computed(self) -> typ.Callable:
+        def chunk_computed(computation: LayoutComputation, start: int, positions: np.ndarray):
+            with self.__figure_lock:
+                if computation is not self.__layout_computation:
+                    return
+                self.__figure.update_layout_steps(start, positions)
+                self.__send_replaced_frames(start, start + len(positions))
+                self.__show_layout_progress(computation.get_computed_timesteps())
 
-        return apply_layout
+        return chunk_computed
+
+    def __build_layout_computation_finished(self, key: str) -> typ.Callable:
+        def computation_finished(computation: LayoutComputation, layout: LayoutArray):
+            with self.__figure_lock:
+                if computation is not self.__layout_computation:
+                    return
+                self.__layout_cache.put(key, layout)
+                self.__layout_computation = None
+                self.__layout_before_computation = None
+                self.__show_layout_progress(None)
+
+        return computation_finished
+
+    def __build_layout_computation_failed(self) -> typ.Callable:
+        def computation_failed(computation: LayoutComputation, error: Exception):
+            with self.__figure_lock:
+                if computation is not self.__layout_computation:
+                    return
+                # Cancel button stays, so the previous layout can be restored
+                self.__layout_progress_label.value = f'Computing layout failed: {error}'
+
+        return computation_failed
+
+    def __show_layout_progress(self, computed_timesteps: typ.Optional[int]):
+        """Shows number of computed timesteps and the cancel button, or hides them if None."""
+        if computed_timesteps is None:
+            self.__layout_progress_label.value = ''
+            self.__cancel_layout_button.layout.display = 'none'
+        else:
+            self.__layout_progress_label.value = \
+                f'Computing layout: {computed_timesteps}/{len(self.__temp_graph)} timesteps'
+            self.__cancel_layout_button.layout.display = 'inline-flex'
 
     def __build_select_layout(self) -> typ.Callable:
         def select_layout(change):
@@ -918,29 +1881,79 @@ class UIGraphDisplayManager(object):
 
         return on_configure_export
 
-    def __compute_layout(self):
-        """Returns layout dependent on selected layout and hyperparameters"""
-        # Read out parameters of widgets, dependent on selected layout
-        if self.__layout_select.value in [
+    def __compute_layout(self, seed_layout: 'LayoutArray' = None, seed_timesteps: np.ndarray = None):
+        """
+        Returns layout dependent on applied layout and hyperparameters, computed or from the layout cache.
+        Computed layouts start from the positions of seed_layout if set, see LayoutComputation.
+        """
+        parameters = self.__get_layout_parameters()
+        key = self.__build_layout_key(parameters)
+        layout = self.__layout_cache.get(key)
+        if layout is None:
+            result = dict()
+
+            def computation_finished(_: LayoutComputation, computed_layout: LayoutArray):
+                result['layout'] = computed_layout
+
+            def computation_failed(_: LayoutComputation, error: Exception):
+                raise error
+
+            LayoutComputation(
+                layout_function=self.__layout_function,
+                temp_graph=self.__temp_graph,
+                parameters=parameters,
+                chunk_size=self.__frame_window or UIGraphDisplayManager.DEFAULT_LAYOUT_CHUNK_SIZE,
+                chunk_computed=lambda *_: None,
+                computation_finished=computation_finished,
+                computation_failed=computation_failed,
+                timestep_memo=self.__timestep_memo,
+                workers=self.__workers,
+                frame_store=self.__frame_store,
+                seed_layout=seed_layout,
+                seed_timesteps=seed_timesteps
+            ).run()
+            layout = result['layout']
+            self.__layout_cache.put(key, layout)
+        return layout
+
+    def __create_empty_layout(self) -> 'LayoutArray':
+        """Returns layout without computed timesteps, memory-mapped if there is a frame store."""
+        if self.__frame_store is None:
+            return LayoutArray.empty(self.__temp_graph)
+        return self.__frame_store.create_layout(self.__temp_graph)
+
+    def __get_edge_index(self) -> typ.Optional['EdgeIndex']:
+        """Returns index of the edges of the graph in its current state, if there is a frame store."""
+        if self.__frame_store is None:
+            return None
+        if self.__cumulative not in self.__edge_indexes:
+            self.__edge_indexes[self.__cumulative] = self.__frame_store.index_edges(self.__temp_graph)
+        return self.__edge_indexes[self.__cumulative]
+
+    def __build_layout_key(self, parameters: typ.Dict[str, typ.Any]) -> str:
+        return LayoutCache.build_key(self.__graph_fingerprint, self.__layout_function.name, parameters,
+                                     self.__temp_graph.get_granularity(), self.__cumulative)
+
+    def __get_layout_parameters(self) -> typ.Dict[str, typ.Any]:
+        """Returns hyperparameters of applied layout, read out of the widgets"""
+        if self.__layout_function in [
             vtna.layout.static_spring_layout,
             vtna.layout.flexible_spring_layout,
             vtna.layout.static_weighted_spring_layout,
             vtna.layout.flexible_weighted_spring_layout,
             vtna.layout.chained_weighted_spring_layout
         ]:
-            return self.__layout_function(
-                temp_graph=self.__temp_graph,
-                node_distance_scale=self.__layout_parameter_nodedistance_slider.value,
-                n_iterations=self.__layout_parameter_iterations_slider.value
-            )
-        elif self.__layout_select.value in [
+            return {
+                'node_distance_scale': self.__layout_parameter_nodedistance_slider.value,
+                'n_iterations': self.__layout_parameter_iterations_slider.value
+            }
+        elif self.__layout_function in [
             vtna.layout.random_walk_pca_layout
         ]:
-            return self.__layout_function(
-                temp_graph=self.__temp_graph,
-                n=self.__layout_parameter_PCA_n_slider.value,
-                repel=self.__layout_parameter_PCA_repel_slider.value
-            )
+            return {
+                'n': self.__layout_parameter_PCA_n_slider.value,
+                'repel': self.__layout_parameter_PCA_repel_slider.value
+            }
 
     def __set_current_layout_widgets(self):
         """Generates list of widgets for layout_vbox.children"""
@@ -964,10 +1977,13 @@ class UIGraphDisplayManager(object):
                 self.__layout_parameter_PCA_n_slider,
                 self.__layout_parameter_PCA_repel_slider
             ])
-        widget_list.extend([self.__layout_description_output, self.__apply_layout_button])
+        widget_list.extend([self.__layout_description_output,
+                            widgets.HBox([self.__apply_layout_button, self.__cancel_layout_button]),
+                            self.__layout_progress_label])
         self.__layout_vbox.children = widget_list
 
     def __build_export_video(self) -> typ.Callable:
+        # Export callbacks are called from the background thread of the export job
         def initialize_progressbar(steps):
             """Callback for setting max amount of progress steps and showing the progress bar"""
             self.__export_progressbar.description = 'Exporting:'
@@ -980,52 +1996,77 @@ class UIGraphDisplayManager(object):
             self.__export_progressbar.value += 1
 
         def progress_finished():
-            """Callback after progress is done. Shows text and hides the progress bar"""
+            """Callback after progress is done. Shows text, a link to the file and hides the progress bar"""
             self.__export_progressbar.description = 'Finished!'
-            # Unlock buttons
-            self.__apply_layout_button.disabled = False
-            self.__queries_manager.get_apply_button().disabled = False
-            self.__style_manager.get_apply_button().disabled = False
-            self.__download_button.disabled = False
-            # Open file in browser
-            js_output = widgets.Output()
-            ipydisplay.display(js_output)
-            with js_output:
-                output_path = self.__video_export_manager.get_output_path()
-                ipydisplay.display(ipydisplay.Javascript(f"""
-                var to = window.location.href.lastIndexOf('/') +1;
-                window.open(window.location.href.substring(0,to)+'{output_path}', '_blank');
-                """))
+            self.__set_export_running(False)
+            output_path = self.__video_export_manager.get_output_path()
+            self.__export_status_html.value = f'<a href="{output_path}" target="_blank">Open {output_path}</a>'
             # Hide progress bar after 5 seconds
             threading.Timer(5.0, __hide_progressbar).start()
 
+        def progress_stopped(export: VideoExport):
+            """Callback after export has been cancelled or failed. Offers to resume it."""
+            self.__set_export_running(False)
+            if export.get_state() == VideoExport.State.FAILED:
+                self.__export_progressbar.description = 'Failed:'
+                self.__export_status_html.value = \
+                    f'<span style="color:#FF3A19">Export failed: {html.escape(str(export.get_error()))}</span>'
+            else:
+                self.__export_progressbar.description = 'Cancelled:'
+            self.__resume_export_button.layout.display = 'inline-flex'
+
         def __hide_progressbar():
             self.__export_progressbar.layout.display = 'none'
 
         def export_video(_):
-            # Lock buttons
-            self.__apply_layout_button.disabled = True
-            self.__queries_manager.get_apply_button().disabled = True
-            self.__style_manager.get_apply_button().disabled = True
-            self.__download_button.disabled = True
+            # Output file of a stopped export keeps the frames written so far
+            if self.__video_export_manager is not None and \
+                    self.__video_export_manager.get_state() != VideoExport.State.FINISHED:
+                self.__video_export_manager.close()
+            self.__export_status_html.value = ''
             # Start export
-            self.__video_export_manager = VideoExport(
-                figure=self.__figure.get_figure(),
-                video_format=self.__export_format_dropdown.value,
-                video_resolution=self.__export_resolution.value,
-                frame_length=self.__export_frame_length_text.value,
-                time_range=self.__export_range_slider.index,
-                speedup_empty_frames=self.__export_speedup_empty_frames_checkbox.value,
-                initialize_progressbar=initialize_progressbar,
-                increment_progress=increment_progress,
-                progress_finished=progress_finished)
+            with self.__figure_lock:
+                self.__video_export_manager = VideoExport(
+                    figure=self.__figure,
+                    video_format=self.__export_format_dropdown.value,
+                    video_resolution=self.__export_resolution.value,
+                    frame_length=self.__export_frame_length_text.value,
+                    time_range=self.__export_range_slider.index,
+                    speedup_empty_frames=self.__export_speedup_empty_frames_checkbox.value,
+                    initialize_progressbar=initialize_progressbar,
+                    increment_progress=increment_progress,
+                    progress_finished=progress_finished,
+                    progress_stopped=progress_stopped,
+                    workers=self.__workers)
+            self.__set_export_running(True)
+            self.__video_export_manager.start()
 
         return export_video
 
-    # This is just a propagation method so the JS code/the notebook can access
-    # the non-static export manager.
-    def write_export_frame(self, img):
-        return self.__video_export_manager.write_frame(img)
+    def __build_cancel_export(self) -> typ.Callable:
+        def cancel_export(_):
+            self.__cancel_export_button.disabled = True
+            self.__video_export_manager.cancel()
+
+        return cancel_export
+
+    def __build_resume_export(self) -> typ.Callable:
+        def resume_export(_):
+            self.__export_status_html.value = ''
+            self.__export_progressbar.description = 'Exporting:'
+            self.__set_export_running(True)
+            self.__video_export_manager.resume()
+
+        return resume_export
+
+    def __set_export_running(self, running: bool):
+        """Shows export controls for a running or a stopped export."""
+        self.__download_button.disabled = running
+        self.__cancel_export_button.disabled = False
+        self.__cancel_export_button.layout.display = 'inline-flex' if running else 'none'
+        self.__resume_export_button.layout.display = 'none'
+        # Exported frames are read from the temporal graph, which changes when toggling cumulative graphs
+        self.__cumulative_checkbox.disabled = running
 
     def __start_graph_loading(self):
         self.__loading_indicator.start()
@@ -1037,15 +2078,16 @@ class UIGraphDisplayManager(object):
 
     def __build_change_cumulative(self) -> typ.Callable:
         def on_change(change):
-            if change['type'] == 'change' and change['name'] == 'value':
-                self.__start_graph_loading()
-                self.__cumulative_checkbox.disabled = True
-                self.__temp_graph.set_cumulative(self.__cumulative_checkbox.value)
-                layout = self.__compute_layout()
-                self.__figure.update_layout(layout)
-                self.display_graph()
-                self.__cumulative_checkbox.disabled = False
-                self.__stop_graph_loading()
+            if change['type'] == 'change' and change['name'] == 'value' and change['new'] != self.__cumulative:
+                self.__remember_layout()
+                with self.__figure_lock:
+                    # The running computation reads the graph, which is changed now
+                    self.__stop_layout_computation()
+                    # Edges of timesteps change incrementally, so the layout starts from the displayed positions
+                    seed_layout = self.__figure.get_layout().snapshot()
+                    self.__cumulative = self.__cumulative_checkbox.value
+                    self.__temp_graph.set_cumulative(self.__cumulative)
+                self.__apply_layout(seed_layout, np.arange(len(self.__temp_graph)))
         return on_change
 
 
@@ -1067,6 +2109,9 @@ class UIAttributeQueriesManager(object):
             'scope': 'global',
             'ids': [node.get_id() for node in temp_graph.get_nodes()]
         }
+        self.__attribute_columns = NodeAttributeColumns(temp_graph, self.__attribute_info)
+        self.__attribute_index = NodeAttributeIndex(self.__attribute_columns)
+        self.__query_memo = QueryResultMemo()
 
         with open(query_html_template_path, mode='rt') as f:
             self.__query_template = f.read()
@@ -1113,8 +2158,10 @@ class UIAttributeQueriesManager(object):
         self.__delete_all_queries_button.on_click(self.__build_delete_all_queries())
 
     def __build_queries_menu(self):
-        attributes = list(filter(lambda a: self.__attribute_info[a]['scope'] == 'global', self.__attribute_info.keys()))
+        # Global attributes first, queries of local attributes match different nodes in each timestep
+        attributes = sorted(self.__attribute_info.keys(), key=lambda a: self.__attribute_info[a]['scope'] == 'local')
         initial_attribute = self.__attribute_info[attributes[0]]
+        initial_range = self.__get_range(attributes[0]) if initial_attribute['measurement_type'] == 'I' else None
         # Attribute drop down
         self.__attributes_dropdown = widgets.Dropdown(
             options=attributes,
@@ -1140,9 +2187,9 @@ class UIAttributeQueriesManager(object):
         self.__interval_value_float_slider = widgets.FloatRangeSlider(
             description='Value:',
             disabled=True if initial_attribute['measurement_type'] != 'I' else False,
-            value=initial_attribute['range'] if initial_attribute['measurement_type'] == 'I' else (0, 0),
-            min=initial_attribute['range'][0] if initial_attribute['measurement_type'] == 'I' else 0,
-            max=initial_attribute['range'][1] if initial_attribute['measurement_type'] == 'I' else 1,
+            value=initial_range if initial_attribute['measurement_type'] == 'I' else (0, 0),
+            min=initial_range[0] if initial_attribute['measurement_type'] == 'I' else 0,
+            max=initial_range[1] if initial_attribute['measurement_type'] == 'I' else 1,
             step=0.1,
             orientation='horizontal',
             readout=False if initial_attribute['measurement_type'] != 'I' else True,
@@ -1266,6 +2313,16 @@ class UIAttributeQueriesManager(object):
         self.__queries_main_vbox.children = [queries_toolbar_hbox, queries_form_vbox, self.__queries_output_box,
                                              self.__relevant_nodes_accordion]
 
+    def __get_range(self, name: str) -> typ.Tuple[float, float]:
+        """
+        Returns range of an interval attribute. Ranges of local attributes and measures are missing from the
+        attribute info, they cover all timesteps and are computed when the attribute is first selected.
+        """
+        info = self.__attribute_info[name]
+        if 'range' not in info:
+            info['range'] = self.__attribute_columns.get_range(name)
+        return info['range']
+
     def __build_on_attribute_change(self) -> typ.Callable:
         def on_change(change):
             if change['type'] == 'change' and change['name'] == 'value':
@@ -1287,9 +2344,10 @@ class UIAttributeQueriesManager(object):
                     self.__interval_value_float_slider.readout = True
                     # ipywidgets won't let us assign min > max, so we have to do this:
                     self.__interval_value_float_slider.max = sys.maxsize
-                    self.__interval_value_float_slider.min = selected_attribute['range'][0]
-                    self.__interval_value_float_slider.max = selected_attribute['range'][1]
-                    self.__interval_value_float_slider.value = selected_attribute['range']
+                    selected_range = self.__get_range(self.__attributes_dropdown.value)
+                    self.__interval_value_float_slider.min = selected_range[0]
+                    self.__interval_value_float_slider.max = selected_range[1]
+                    self.__interval_value_float_slider.value = selected_range
                     self.__interval_value_float_slider.layout.display = 'inline-flex'
                     # Hide nominal dropdown and ordinal slider and node id input
                     self.__nominal_value_dropdown.layout.display = 'none'
@@ -1379,12 +2437,15 @@ class UIAttributeQueriesManager(object):
         active_queries = dict((idx, query) for idx, query in self.__get_queries_reference().items()
                               if idx in self.__get_active_queries_reference())
         for i, query in enumerate(active_queries.values()):
-            node_filter = build_clause(query['clauses'], self.__attribute_info)
-            relevant_nodes = list(node_filter(self.__temp_graph.get_nodes()))
-            context['queries'][i]['node_count'] = len(relevant_nodes)
-            context['queries'][i]['first_nodes'] = ', '.join(str(node.get_id())
-                                                             for node in relevant_nodes[:nodes_displayed])
-            context['queries'][i]['are_all_nodes'] = len(relevant_nodes) <= nodes_displayed
+            key = ('relevant_nodes', QueryResultMemo.build_clause_key(query['clauses']), nodes_displayed)
+            relevant_nodes = self.__query_memo.get(key)
+            if relevant_nodes is None:
+                relevant_nodes = self.__attribute_index.find_clause_nodes(query['clauses'], nodes_displayed)
+                self.__query_memo.put(key, relevant_nodes, [relevant_nodes[1]])
+            node_count, first_node_ids = relevant_nodes
+            context['queries'][i]['node_count'] = node_count
+            context['queries'][i]['first_nodes'] = ', '.join(map(str, first_node_ids.tolist()))
+            context['queries'][i]['are_all_nodes'] = node_count <= nodes_displayed
         html_string = pystache.render(self.__relevant_node_template, context)
         return html_string
 
@@ -1555,17 +2616,17 @@ class UIAttributeQueriesManager(object):
         else:
             self.__highlight_query_counter = 1
 
-    def get_node_filter(self) -> vtna.filter.NodeFilter:
+    def get_node_mask(self) -> np.ndarray:
+        """Returns mask over nodes sorted by ID, True for nodes passing the active filter queries."""
         active_queries = dict((idx, query) for idx, query in self.__filter_queries.items()
                               if idx in self.__active_filter_queries)
-        node_filter = transform_queries_to_filter(active_queries, self.__attribute_info)
-        return node_filter
+        return transform_queries_to_mask(active_queries, self.__attribute_columns, self.__query_memo)
 
-    def get_node_colors(self, temp_graph: vtna.graph.TemporalGraph, default_color: str) -> typ.Dict[int, str]:
+    def get_node_colors(self, default_color: str) -> 'NodeColors':
         active_queries = dict((idx, query) for idx, query in self.__highlight_queries.items()
                               if idx in self.__active_highlight_queries)
-        node_colors = transform_queries_to_color_mapping(active_queries, self.__attribute_info, temp_graph,
-                                                         default_color)
+        node_colors = transform_queries_to_color_mapping(active_queries, self.__attribute_columns, default_color,
+                                                         self.__query_memo)
         return node_colors
 
     # Observer pattern for updating observing UI managers
@@ -1581,86 +2642,432 @@ class UIAttributeQueriesManager(object):
         return self.__apply_to_graph_button
 
 
-def transform_queries_to_filter(queries: typ.Dict, attribute_info: typ.Dict) -> vtna.filter.NodeFilter:
-    clauses = list()  # type: typ.List[vtna.filter.NodeFilter]
-    for raw_clause in map(lambda t: t[1]['clauses'], sorted(queries.items(), key=lambda t: int(t[0]))):
-        clause = build_clause(raw_clause, attribute_info)
-        clauses.append(clause)
-    result_filter = None
-    for i, clause in enumerate(clauses):
-        if i == 0:
-            result_filter = clause
+class NodeAttributeColumns(object):
+    def __init__(self, temp_graph: vtna.graph.TemporalGraph, attribute_info: typ.Dict):
+        """
+        Attributes of all nodes as arrays, ordered by node ID like the node columns of TemporalGraphFigure,
+        so queries are evaluated as boolean masks over all nodes at once instead of node by node. Nominal and
+        ordinal values are stored as int codes, their index in the attribute's categories, and interval values
+        as floats. Global attributes are (nodes,) arrays, local attributes and measures (timesteps, nodes) arrays,
+        so masks of queries with local attributes differ per timestep. Arrays are built on first use.
+
+        Args:
+            temp_graph: Graph of the nodes.
+            attribute_info: Attribute info of temp_graph, as returned by get_attributes_info().
+        """
+        self.__attribute_info = attribute_info
+        self.__nodes = sorted(temp_graph.get_nodes(), key=lambda n: n.get_id())
+        self.__node_ids = np.array([node.get_id() for node in self.__nodes], dtype=np.int64)
+        self.__timestep_count = len(temp_graph)
+        self.__columns = dict()  # type: typ.Dict[str, np.ndarray]
+
+    def __len__(self):
+        return len(self.__nodes)
+
+    def get_node_ids(self) -> np.ndarray:
+        return self.__node_ids
+
+    def get_timestep_count(self) -> int:
+        return self.__timestep_count
+
+    def is_local(self, name: str) -> bool:
+        return self.__attribute_info[name]['scope'] == 'local'
+
+    def has_local_attributes(self, raw_clause: typ.Dict) -> bool:
+        """Returns whether a predicate of the clause refers to a local attribute, so its mask differs per timestep."""
+        return any(self.is_local(raw_predicate['value'][0]) for raw_predicate in raw_clause.values())
+
+    def get_column(self, name: str) -> np.ndarray:
+        """
+        Returns array of the attribute's values, (timesteps, nodes) for local attributes.
+        Codes of unknown categories are -1, missing intervals NaN.
+        """
+        if name not in self.__columns:
+            measurement_type = self.__attribute_info[name]['measurement_type']
+            if measurement_type == 'ID':
+                column = self.__node_ids[np.newaxis]
+            elif measurement_type in ['N', 'O']:
+                codes = dict((category, code) for code, category in
+                             enumerate(self.__attribute_info[name]['categories']))
+                column = np.array([[codes.get(value, -1) for value in values] for values in self.__iter_values(name)],
+                                  dtype=np.int32)
+            elif measurement_type == 'I':
+                column = np.array([[np.nan if value is None else value for value in values]
+                                   for values in self.__iter_values(name)], dtype=np.float64)
+            else:
+                raise Exception(f'Abnormal Behaviour: Unexpected measurement type: {measurement_type}')
+            # Global attributes have a single row
+            self.__columns[name] = column if self.is_local(name) else column[0]
+        return self.__columns[name]
+
+    def get_range(self, name: str) -> typ.Tuple[float, float]:
+        """Returns minimum and maximum of an interval attribute, (0, 0) if all values are missing."""
+        column = self.get_column(name)
+        column = column[~np.isnan(column)]
+        if len(column) == 0:
+            return 0., 0.
+        return float(column.min()), float(column.max())
+
+    def __iter_values(self, name: str) -> typ.Iterator[typ.List[typ.Any]]:
+        """Yields values of all nodes in each timestep of local attributes, once for global attributes."""
+        if self.is_local(name):
+            for timestep in range(self.__timestep_count):
+                yield [node.get_local_attribute(name, timestep) for node in self.__nodes]
+        else:
+            yield [node.get_global_attribute(name) for node in self.__nodes]
+
+    def get_code(self, name: str, category: str) -> int:
+        """Returns code of a nominal or ordinal category, -1 if it is unknown."""
+        categories = self.__attribute_info[name]['categories']
+        return categories.index(category) if category in categories else -1
+
+    def get_measurement_type(self, name: str) -> str:
+        return self.__attribute_info[name]['measurement_type']
+
+
+class NodeAttributeIndex(object):
+    def __init__(self, attribute_columns: NodeAttributeColumns):
+        """
+        Sorted indexes of node attributes, which answer how many and which nodes match a clause with set operations
+        on the matching nodes only, instead of evaluating the clause over all nodes. The nodes of a category, a node
+        ID or a range of values are a slice of the attribute's index. Nodes are referred to by their position in
+        attribute_columns, so the positions of the lowest node IDs are the lowest positions. Indexes are built on
+        first use of an attribute.
+
+        Args:
+            attribute_columns: Attribute columns of the nodes.
+        """
+        self.__attribute_columns = attribute_columns
+        # Attribute names to sorted values and node positions in that order
+        self.__indexes = dict()  # type: typ.Dict[str, typ.Tuple[np.ndarray, np.ndarray]]
+
+    def find_clause_nodes(self, raw_clause: typ.Dict, limit: int) -> typ.Tuple[int, np.ndarray]:
+        """
+        Returns number of nodes matching the clause and the lowest IDs of at most limit of them in order.
+        Clauses with local attributes count nodes matching in any timestep.
+        """
+        node_ids = self.__attribute_columns.get_node_ids()
+        if self.__attribute_columns.has_local_attributes(raw_clause):
+            # Values of local attributes are not indexed, their masks are evaluated instead
+            mask = np.atleast_2d(build_clause_mask(raw_clause, self.__attribute_columns)).any(axis=0)
+            matching_node_ids = node_ids[mask]
+            return len(matching_node_ids), matching_node_ids[:limit]
+        positions, complemented = self.__find_clause(raw_clause)
+        if not complemented:
+            return len(positions), node_ids[positions[:limit]]
+        # Lowest positions not in positions, there are at least limit among the first limit + len(positions)
+        candidates = np.arange(min(len(node_ids), limit + len(positions)))
+        return len(node_ids) - len(positions), node_ids[np.setdiff1d(candidates, positions, assume_unique=True)[:limit]]
+
+    def __find_clause(self, raw_clause: typ.Dict) -> typ.Tuple[np.ndarray, bool]:
+        """
+        Returns sorted positions of nodes and whether the clause matches the nodes at these positions or all other
+        nodes. Complements are not materialized, so the cost depends on the number of matching nodes only.
+        """
+        result = None  # type: typ.Tuple[np.ndarray, bool]
+        for raw_predicate in map(lambda t: t[1], sorted(raw_clause.items(), key=lambda t: int(t[0]))):
+            positions = self.__find_predicate(raw_predicate)
+            op = raw_predicate['operator']
+            if op == 'NEW':
+                result = positions, False
+            elif op == 'NOT':
+                result = positions, True
+            elif op == 'AND':
+                result = self.__intersect(result, (positions, False))
+            elif op == 'OR':
+                result = self.__unite(result, (positions, False))
+            elif op == 'AND NOT':
+                result = self.__intersect(result, (positions, True))
+            elif op == 'OR NOT':
+                result = self.__unite(result, (positions, True))
+            else:
+                # Either the front end provided a bad queries dict, or the matching is not correct.
+                raise Exception(f'Abnormal Behaviour: Unknown queries combinator: {op}')
+        return result
+
+    def __find_predicate(self, raw_predicate: typ.Dict) -> np.ndarray:
+        """Returns sorted positions of nodes matching the predicate, see build_predicate_mask()."""
+        name, value = raw_predicate['value']
+        values, positions = self.__get_index(name)
+        measurement_type = self.__attribute_columns.get_measurement_type(name)
+        if measurement_type == 'O':
+            # Nodes of unknown categories are never in range
+            lower_bound = max(self.__attribute_columns.get_code(name, value[0]), 0)
+            upper_bound = self.__attribute_columns.get_code(name, value[1])
+        elif measurement_type == 'I':
+            # NaN values are sorted last and never in range
+            lower_bound, upper_bound = value
+        elif measurement_type == 'N':
+            lower_bound = upper_bound = self.__attribute_columns.get_code(name, value)
+            if lower_bound == -1:
+                return np.zeros(0, dtype=positions.dtype)
+        elif measurement_type == 'ID':
+            lower_bound = upper_bound = value
+        else:
+            raise Exception(f'Abnormal Behaviour: Unexpected measurement type: {measurement_type}')
+        start = np.searchsorted(values, lower_bound, side='left')
+        stop = np.searchsorted(values, upper_bound, side='right')
+        return np.sort(positions[start:stop])
+
+    def __get_index(self, name: str) -> typ.Tuple[np.ndarray, np.ndarray]:
+        if name not in self.__indexes:
+            column = self.__attribute_columns.get_column(name)
+            positions = np.argsort(column, kind='mergesort')
+            self.__indexes[name] = column[positions], positions
+        return self.__indexes[name]
+
+    @staticmethod
+    def __intersect(a: typ.Tuple[np.ndarray, bool], b: typ.Tuple[np.ndarray, bool]) -> typ.Tuple[np.ndarray, bool]:
+        (a_positions, a_complemented), (b_positions, b_complemented) = a, b
+        if not a_complemented and not b_complemented:
+            return np.intersect1d(a_positions, b_positions, assume_unique=True), False
+        elif not a_complemented:
+            return np.setdiff1d(a_positions, b_positions, assume_unique=True), False
+        elif not b_complemented:
+            return np.setdiff1d(b_positions, a_positions, assume_unique=True), False
+        # De Morgan: Nodes in neither a nor b
+        return np.union1d(a_positions, b_positions), True
+
+    @staticmethod
+    def __unite(a: typ.Tuple[np.ndarray, bool], b: typ.Tuple[np.ndarray, bool]) -> typ.Tuple[np.ndarray, bool]:
+        # De Morgan: a | b = ~(~a & ~b)
+        positions, complemented = NodeAttributeIndex.__intersect((a[0], not a[1]), (b[0], not b[1]))
+        return positions, not complemented
+
+
+class QueryResultMemo(object):
+    def __init__(self, max_bytes: int = 1 << 28):
+        """
+        Least recently used memo of query results, e.g. masks of clauses and of sets of queries, keyed by their
+        canonical form, see build_clause_key(). Toggling queries or switching between filter and highlight mode
+        then looks up previous results instead of evaluating the queries again. Results are shared, so arrays
+        are made read-only.
+
+        Args:
+            max_bytes: Maximal number of bytes of the arrays of kept results.
+        """
+        self.__max_bytes = max_bytes
+        self.__size = 0
+        # Keys to results and their size in bytes
+        self.__results = collections.OrderedDict()  # type: typ.Dict[typ.Hashable, typ.Tuple[typ.Any, int]]
+
+    @staticmethod
+    def build_clause_key(raw_clause: typ.Dict) -> typ.Tuple:
+        """
+        Returns canonical hashable form of a clause, the operators, attribute names and values of its predicates
+        in order. It is equal for equal clauses, independent of predicate IDs and of ranges as lists or tuples.
+        """
+        predicates = map(lambda t: t[1], sorted(raw_clause.items(), key=lambda t: int(t[0])))
+        return tuple((raw_predicate['operator'], raw_predicate['value'][0],
+                      tuple(raw_predicate['value'][1]) if isinstance(raw_predicate['value'][1], (list, tuple))
+                      else raw_predicate['value'][1])
+                     for raw_predicate in predicates)
+
+    def get(self, key: typ.Hashable) -> typ.Optional[typ.Any]:
+        """Returns memorized result or None."""
+        if key not in self.__results:
+            return None
+        self.__results.move_to_end(key)
+        return self.__results[key][0]
+
+    def put(self, key: typ.Hashable, result: typ.Any, arrays: typ.List[np.ndarray]):
+        """Memorizes result, which consists of arrays besides small objects."""
+        for array in arrays:
+            array.flags.writeable = False
+        if key in self.__results:
+            self.__size -= self.__results.pop(key)[1]
+        size = sum(array.nbytes for array in arrays)
+        self.__results[key] = result, size
+        self.__size += size
+        while self.__size > self.__max_bytes:
+            self.__size -= self.__results.popitem(last=False)[1][1]
+
+
+def transform_queries_to_mask(queries: typ.Dict, attribute_columns: NodeAttributeColumns,
+                              memo: QueryResultMemo = None) -> np.ndarray:
+    """
+    Returns mask over nodes sorted by ID, True for nodes matching any query. All nodes match no queries.
+    With local attributes, the mask is a (timesteps, nodes) array, see build_clause_mask().
+    With memo, masks of previously seen sets of queries and clauses are looked up.
+    """
+    if len(queries) == 0:
+        return np.ones(len(attribute_columns), dtype=bool)
+    raw_clauses = [query['clauses'] for _, query in sorted(queries.items(), key=lambda t: int(t[0]))]
+    # Nodes matching any query are kept, so the order of queries does not matter
+    key = ('queries_mask', frozenset(map(QueryResultMemo.build_clause_key, raw_clauses)))
+    mask = memo.get(key) if memo is not None else None
+    if mask is None:
+        mask = np.zeros(len(attribute_columns), dtype=bool)
+        for raw_clause in raw_clauses:
+            mask = mask | get_clause_mask(raw_clause, attribute_columns, memo)
+        if memo is not None:
+            memo.put(key, mask, [mask])
+    return mask
+
+
+def transform_queries_to_color_mapping(queries: typ.Dict, attribute_columns: NodeAttributeColumns,
+                                       default_color: str, memo: QueryResultMemo = None) -> 'NodeColors':
+    """
+    Returns colors of the first matching query of each node in order of query IDs, default_color otherwise.
+    With local attributes, colors are resolved per timestep.
+    With memo, colors of previously seen sequences of queries and masks of clauses are looked up.
+    """
+    ordered_queries = [query for _, query in sorted(queries.items(), key=lambda t: int(t[0]))]
+    key = ('queries_colors', default_color,
+           tuple((QueryResultMemo.build_clause_key(query['clauses']), query['color']) for query in ordered_queries))
+    node_colors = memo.get(key) if memo is not None else None
+    if node_colors is not None:
+        return node_colors
+    is_local = any(attribute_columns.has_local_attributes(query['clauses']) for query in ordered_queries)
+    shape = (attribute_columns.get_timestep_count(), len(attribute_columns)) if is_local \
+        else (len(attribute_columns),)
+    palette = [default_color]
+    indices = np.zeros(shape, dtype=np.int32)
+    # Queries are only evaluated for nodes without color yet, per timestep with local attributes.
+    # Masks memorized before, e.g. by filters, cover all nodes and are used instead. Masks of clauses with local
+    # attributes are evaluated for all nodes anyway, so only they are memorized here.
+    uncolored = np.arange(indices.size)
+    for query in ordered_queries:
+        if len(uncolored) == 0:
+            break
+        if is_local:
+            clause_mask = get_clause_mask(query['clauses'], attribute_columns, memo)
+        else:
+            clause_mask = memo.get(build_clause_mask_key(query['clauses'])) if memo is not None else None
+        if clause_mask is not None:
+            matches = np.broadcast_to(clause_mask, shape).ravel()[uncolored]
         else:
-            result_filter += clause
-    if result_filter is None:
-        result_filter = vtna.filter.NodeFilter(lambda _: True)
-    return result_filter
-
-
-def transform_queries_to_color_mapping(queries: typ.Dict, attribute_info: typ.Dict,
-                                       temp_graph: vtna.graph.TemporalGraph, default_color: str) \
-        -> typ.Dict[int, str]:
-    # Init all nodes with the default color
-    colors = dict((node.get_id(), default_color) for node in temp_graph.get_nodes())
-    for raw_clauses in map(lambda t: t[1], sorted(queries.items(), key=lambda t: int(t[0]), reverse=True)):
-        raw_clause = raw_clauses['clauses']
-        color = raw_clauses['color']
-        clause = build_clause(raw_clause, attribute_info)
-        nodes_to_color = clause(temp_graph.get_nodes())
-        for node_id in map(lambda n: n.get_id(), nodes_to_color):
-            colors[node_id] = color
-    return colors
-
-
-def build_clause(raw_clause: typ.Dict, attribute_info: typ.Dict) \
-        -> vtna.filter.NodeFilter:
-    clause = None
+            matches = build_clause_mask(query['clauses'], attribute_columns, uncolored)
+        if query['color'] not in palette:
+            palette.append(query['color'])
+        indices.flat[uncolored[matches]] = palette.index(query['color'])
+        uncolored = uncolored[~matches]
+    node_colors = NodeColors(palette, indices)
+    if memo is not None:
+        memo.put(key, node_colors, [indices])
+    return node_colors
+
+
+def get_clause_mask(raw_clause: typ.Dict, attribute_columns: NodeAttributeColumns,
+                    memo: QueryResultMemo = None) -> np.ndarray:
+    """Returns mask of build_clause_mask(), which is looked up in memo, if given."""
+    if memo is None:
+        return build_clause_mask(raw_clause, attribute_columns)
+    key = build_clause_mask_key(raw_clause)
+    mask = memo.get(key)
+    if mask is None:
+        mask = build_clause_mask(raw_clause, attribute_columns)
+        memo.put(key, mask, [mask])
+    return mask
+
+
+def build_clause_mask_key(raw_clause: typ.Dict) -> typ.Tuple:
+    """Returns key of the mask of a clause in QueryResultMemo."""
+    return 'clause_mask', QueryResultMemo.build_clause_key(raw_clause)
+
+
+class NodeColors(object):
+    def __init__(self, palette: typ.List[str], indices: np.ndarray):
+        """
+        Colors of nodes as palette and the index of each node's color in it, so colors are looked up per
+        array instead of per node. Nodes are ordered by ID, like the node columns of TemporalGraphFigure.
+        Indices are a (nodes,) array or, if colors differ per timestep, a (timesteps, nodes) array.
+        """
+        self.__palette = palette
+        self.__indices = indices
+        self.__palette_array = np.array(palette, dtype=object)
+
+    def __eq__(self, other):
+        if not isinstance(other, NodeColors):
+            return NotImplemented
+        return self.__palette == other.get_palette() and np.array_equal(self.__indices, other.get_indices())
+
+    def get_palette(self) -> typ.List[str]:
+        return self.__palette
+
+    def get_indices(self) -> np.ndarray:
+        return self.__indices
+
+    def is_time_dependent(self) -> bool:
+        return self.__indices.ndim == 2
+
+    def get_colors(self, node_columns: np.ndarray = None, timestep: int = None) -> typ.List[str]:
+        """
+        Returns colors of the nodes in node_columns, in the same order, or of all nodes.
+        The timestep is required if colors are time dependent.
+        """
+        indices = self.__indices[timestep] if self.is_time_dependent() else self.__indices
+        if node_columns is not None:
+            indices = indices[node_columns]
+        return self.__palette_array[indices].tolist()
+
+    def encode(self) -> typ.Dict[str, typ.Any]:
+        """
+        Returns palette and indices as JSON serializable dict, which js/figure.js decodes.
+        Colors must not be time dependent.
+        """
+        dtype = np.uint16 if len(self.__palette) <= np.iinfo(np.uint16).max + 1 else np.int32
+        return {
+            'palette': self.__palette,
+            'indices': encode_typed_array(self.__indices.astype(dtype))
+        }
+
+
+def build_clause_mask(raw_clause: typ.Dict, attribute_columns: NodeAttributeColumns,
+                      positions: np.ndarray = None) -> np.ndarray:
+    """
+    Returns mask over nodes sorted by ID, True for nodes matching the clause. If the clause refers to local
+    attributes, the mask is a (timesteps, nodes) array, masks of global attributes are broadcast over timesteps.
+    With positions, the mask only covers the nodes at these positions, in the same order.
+    """
+    mask = None
     for raw_predicate in map(lambda t: t[1], sorted(raw_clause.items(), key=lambda t: int(t[0]))):
-        predicate = build_predicate(raw_predicate, attribute_info)
-        node_filter = vtna.filter.NodeFilter(predicate)
+        predicate_mask = build_predicate_mask(raw_predicate, attribute_columns, positions)
         # Case distinction for different operators:
         op = raw_predicate['operator']
         if op == 'NEW':
-            clause = node_filter
+            mask = predicate_mask
         elif op == 'NOT':
-            clause = -node_filter
+            mask = ~predicate_mask
         elif op == 'AND':
-            clause *= node_filter
+            mask = mask & predicate_mask
         elif op == 'OR':
-            clause += node_filter
+            mask = mask | predicate_mask
         elif op == 'AND NOT':
-            clause *= -node_filter
+            mask = mask & ~predicate_mask
         elif op == 'OR NOT':
-            clause += -node_filter
+            mask = mask | ~predicate_mask
         else:
             # Either the front end provided a bad queries dict, or the matching is not correct.
             raise Exception(f'Abnormal Behaviour: Unknown queries combinator: {op}')
-    return clause
+    return mask
 
 
-def build_predicate(raw_predicate: typ.Dict, attribute_info: typ.Dict) \
-        -> typ.Callable[[vtna.graph.TemporalNode], bool]:
-    # TODO: Currently assumes only string type values. More case distinctions needed for more complex types.
-    # TODO: Can ordinal or nominal attributes be local as well?
-    # build_predicate assumes correctness of the input in regards to measure type assumptions.
+def build_predicate_mask(raw_predicate: typ.Dict, attribute_columns: NodeAttributeColumns,
+                         positions: np.ndarray = None) -> np.ndarray:
+    # build_predicate_mask assumes correctness of the input in regards to measure type assumptions.
     # e.g. range type queries will only be made for truly ordinal or interval values.
     name, value = raw_predicate['value']
-    if attribute_info[name]['measurement_type'] == 'O':
-        order = attribute_info[name]['categories']
-        lower_bound = vtna.filter.ordinal_attribute_greater_than_equal(name, value[0], order)
-        inv_upper_bound = vtna.filter.ordinal_attribute_greater_than(name, value[1], order)
-        pred = lambda n: lower_bound(n) and not inv_upper_bound(n)
-    elif attribute_info[name]['measurement_type'] == 'I':
-        lower_bound = vtna.filter.interval_attribute_greater_than_equal(name, value[0])
-        inv_upper_bound = vtna.filter.interval_attribute_greater_than(name, value[1])
-        pred = lambda n: lower_bound(n) and not inv_upper_bound(n)
-    elif attribute_info[name]['measurement_type'] == 'N':  # Equality
-        pred = vtna.filter.categorical_attribute_equal(name, value)
-    elif attribute_info[name]['measurement_type'] == 'ID':
-        pred = lambda n: n.get_id() == value
+    column = attribute_columns.get_column(name)
+    if positions is not None:
+        # Columns of local attributes have a row per timestep
+        column = column[..., positions]
+    measurement_type = attribute_columns.get_measurement_type(name)
+    if measurement_type == 'O':
+        lower_bound = attribute_columns.get_code(name, value[0])
+        upper_bound = attribute_columns.get_code(name, value[1])
+        # Nodes of unknown categories are never in range
+        return (column >= max(lower_bound, 0)) & (column <= upper_bound)
+    elif measurement_type == 'I':
+        # Comparisons with NaN are False, so nodes with missing values are never in range
+        return (column >= value[0]) & (column <= value[1])
+    elif measurement_type == 'N':  # Equality
+        code = attribute_columns.get_code(name, value)
+        return (column == code) & (code != -1)
+    elif measurement_type == 'ID':
+        return column == value
     else:
-        raise Exception(f'Abnormal Behaviour: Unexpected measurement type: {attribute_info[name]["measurement_type"]}')
-    return pred
+        raise Exception(f'Abnormal Behaviour: Unexpected measurement type: {measurement_type}')
 
 
 class NodeMeasuresManager(object):
@@ -1715,21 +3122,739 @@ class NodeMeasuresManager(object):
             self.illegal_names = names
 
 
+class LayoutArray(object):
+    def __init__(self, node_ids: np.ndarray, positions: np.ndarray, computed: np.ndarray):
+        """
+        Layout of a temporal graph as (timesteps, nodes, 2) float32 array of positions, which may be
+        memory-mapped, see FrameStore. Columns are the nodes in ascending order of their IDs, like the columns
+        of TemporalGraphFigure. Use empty() to create layouts.
+
+        Args:
+            node_ids: Sorted IDs of all nodes of the graph.
+            positions: Positions of nodes in each timestep, NaN for nodes without position.
+            computed: Boolean mask over timesteps, False for timesteps not computed yet.
+        """
+        self.__node_ids = node_ids
+        self.__positions = positions
+        self.__computed = computed
+        self.__node_columns = None  # type: typ.Dict[int, int]
+
+    @staticmethod
+    def empty(temp_graph: vtna.graph.TemporalGraph, path: str = None) -> 'LayoutArray':
+        """
+        Returns layout of a temporal graph without computed timesteps.
+        If path is set, positions are stored in this .npy file and memory-mapped.
+        """
+        node_ids = np.array(sorted(node.get_id() for node in temp_graph.get_nodes()), dtype=np.int64)
+        shape = (len(temp_graph), len(node_ids), 2)
+        if path is None:
+            positions = np.full(shape, np.nan, dtype=np.float32)
+        else:
+            positions = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=shape)
+            positions[:] = np.nan
+        return LayoutArray(node_ids=node_ids, positions=positions, computed=np.zeros(len(temp_graph), dtype=bool))
+
+    def __len__(self):
+        return len(self.__computed)
+
+    def get_node_ids(self) -> np.ndarray:
+        return self.__node_ids
+
+    def get_node_columns(self) -> typ.Dict[int, int]:
+        """Returns dict of node IDs to their columns."""
+        if self.__node_columns is None:
+            self.__node_columns = dict((node_id, column) for column, node_id in enumerate(self.__node_ids.tolist()))
+        return self.__node_columns
+
+    def is_complete(self) -> bool:
+        """Returns whether all timesteps are computed."""
+        return bool(self.__computed.all())
+
+    def get_positions(self, timestep: int) -> np.ndarray:
+        """Returns (nodes, 2) array of positions in timestep, which must not be changed."""
+        return self.__positions[timestep]
+
+    def get_steps(self, start: int, stop: int) -> np.ndarray:
+        """Returns (timesteps, nodes, 2) array of positions of timesteps in [start, stop), which must not be changed."""
+        return self.__positions[start:stop]
+
+    def is_computed(self, timestep: int) -> bool:
+        return bool(self.__computed[timestep])
+
+    def count_computed(self) -> int:
+        return int(np.count_nonzero(self.__computed))
+
+    def set_steps(self, start: int, positions: np.ndarray):
+        """Sets (timesteps, nodes, 2) array of positions of timesteps beginning at start as computed."""
+        self.__positions[start:start + len(positions)] = positions
+        self.__computed[start:start + len(positions)] = True
+
+    def build_positions(self, layout_steps: typ.List[typ.Dict[int, typ.Tuple[float, float]]]) -> np.ndarray:
+        """Returns (timesteps, nodes, 2) array of positions of dicts of node IDs to positions."""
+        return build_layout_positions(self.get_node_columns(), layout_steps)
+
+    def snapshot(self) -> 'LayoutArray':
+        """
+        Returns layout with the timesteps computed so far, which later computed timesteps do not affect.
+        Positions of computed timesteps never change, so only the mask is copied and positions are shared.
+        """
+        return LayoutArray(self.__node_ids, self.__positions, self.__computed.copy())
+
+
+def build_layout_positions(node_columns: typ.Dict[int, int],
+                           layout_steps: typ.List[typ.Dict[int, typ.Tuple[float, float]]]) -> np.ndarray:
+    """Returns (timesteps, nodes, 2) float32 array of positions of dicts of node IDs to positions."""
+    positions = np.full((len(layout_steps), len(node_columns), 2), np.nan, dtype=np.float32)
+    for timestep, layout_step in enumerate(layout_steps):
+        if len(layout_step) > 0:
+            positions[timestep, [node_columns[node_id] for node_id in layout_step.keys()]] = \
+                np.array(list(layout_step.values()), dtype=np.float32).reshape(-1, 2)
+    return positions
+
+
+class EdgeIndex(object):
+    # Number of timesteps, which edges are written at once while building an index
+    BUILD_CHUNK_SIZE = 1000
+
+    def __init__(self, offsets: np.ndarray, edges: np.ndarray):
+        """
+        Edges of all timesteps of a temporal graph as (edges, 2) int32 array of node columns, which may be
+        memory-mapped, see FrameStore. Edges of timestep t are edges[offsets[t]:offsets[t + 1]].
+        Columns are the nodes in ascending order of their IDs, like the columns of LayoutArray.
+        Use build() to create indexes.
+        """
+        self.__offsets = offsets
+        self.__edges = edges
+
+    @staticmethod
+    def build(temp_graph: vtna.graph.TemporalGraph, path: str = None) -> 'EdgeIndex':
+        """
+        Returns index of the edges of a temporal graph in its current state, e.g. cumulative.
+        If path is set, edges are written to this file while iterating the graph and memory-mapped,
+        so the index is never held in memory.
+        """
+        node_ids = sorted(node.get_id() for node in temp_graph.get_nodes())
+        node_columns = dict((node_id, column) for column, node_id in enumerate(node_ids))
+        offsets = [0]
+        chunks = list()  # type: typ.List[np.ndarray]
+        edges_file = open(path, 'wb') if path is not None else None
+        try:
+            for timestep, graph in enumerate(temp_graph, 1):
+                columns = [node_columns[node_id] for edge in graph.get_edges() for node_id in edge.get_incident_nodes()]
+                chunks.append(np.array(columns, dtype=np.int32).reshape(-1, 2))
+                offsets.append(offsets[-1] + len(chunks[-1]))
+                if edges_file is not None and (timestep % EdgeIndex.BUILD_CHUNK_SIZE == 0 or
+                                               timestep == len(temp_graph)):
+                    np.concatenate(chunks).tofile(edges_file)
+                    chunks = list()
+        finally:
+            if edges_file is not None:
+                edges_file.close()
+        if offsets[-1] == 0:
+            # Empty files cannot be memory-mapped
+            edges = np.zeros((0, 2), dtype=np.int32)
+        elif edges_file is None:
+            edges = np.concatenate(chunks)
+        else:
+            edges = np.memmap(path, dtype=np.int32, mode='r', shape=(offsets[-1], 2))
+        return EdgeIndex(np.array(offsets, dtype=np.int64), edges)
+
+    def __len__(self):
+        return len(self.__offsets) - 1
+
+    def get_edges(self, timestep: int) -> np.ndarray:
+        """Returns (m, 2) array of node columns of the edges in timestep, which must not be changed."""
+        return self.__edges[self.__offsets[timestep]:self.__offsets[timestep + 1]]
+
+
+class FrameStore(object):
+    def __init__(self, store_dir: str):
+        """
+        Directory of memory-mapped layouts and edge indexes, so their size is limited by the disk, not
+        by memory. Files are removed once mapped, so they are deleted with their arrays. This requires
+        a file system, which allows to remove open files, as on Linux and macOS.
+
+        Args:
+            store_dir: Directory of the files, which is created if necessary.
+        """
+        self.__store_dir = store_dir
+        if not os.path.isdir(self.__store_dir):
+            os.makedirs(self.__store_dir)
+
+    def create_layout(self, temp_graph: vtna.graph.TemporalGraph) -> LayoutArray:
+        """Returns memory-mapped layout of a temporal graph without computed timesteps, see LayoutArray.empty()."""
+        path = self.__new_path('layout', 'npy')
+        try:
+            return LayoutArray.empty(temp_graph, path=path)
+        finally:
+            os.remove(path)
+
+    def index_edges(self, temp_graph: vtna.graph.TemporalGraph) -> EdgeIndex:
+        """Returns memory-mapped index of the edges of a temporal graph, see EdgeIndex.build()."""
+        path = self.__new_path('edges', 'bin')
+        try:
+            return EdgeIndex.build(temp_graph, path=path)
+        finally:
+            os.remove(path)
+
+    def __new_path(self, name: str, extension: str) -> str:
+        return os.path.join(self.__store_dir, f'{name}-{uuid.uuid4().hex}.{extension}')
+
+
+class LayoutCache(object):
+    def __init__(self, max_size: int = 8, cache_dir: str = None, max_disk_bytes: int = 1 << 30):
+        """
+        Least recently used cache of computed layouts, see build_key() for keys.
+
+        Args:
+            max_size: Maximal number of layouts kept in memory.
+            cache_dir: If set, layouts are also stored as .npy files in this directory, which are loaded
+                memory-mapped when a layout is not in memory, e.g. in a later session.
+            max_disk_bytes: Maximal number of bytes of the files in cache_dir. Least recently used layouts
+                are removed first.
+        """
+        self.__max_size = max_size
+        self.__cache_dir = cache_dir
+        self.__max_disk_bytes = max_disk_bytes
+        self.__layouts = collections.OrderedDict()  # type: typ.Dict[str, LayoutArray]
+        if self.__cache_dir is not None:
+            if not os.path.isdir(self.__cache_dir):
+                os.makedirs(self.__cache_dir)
+            self.__remove_pickled_layouts()
+
+    @staticmethod
+    def build_key(graph_fingerprint: str, layout_name: str, parameters: typ.Dict[str, typ.Any],
+                  granularity: int, cumulative: bool) -> str:
+        """Returns cache key of a layout of a graph with the given hyperparameters."""
+        key = json.dumps([graph_fingerprint, layout_name, sorted(parameters.items()), granularity, cumulative])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> typ.Optional[LayoutArray]:
+        """Returns cached layout or None."""
+        if key in self.__layouts:
+            self.__layouts.move_to_end(key)
+            return self.__layouts[key]
+        if self.__cache_dir is None or not os.path.isfile(self.__get_path(key, 'positions')):
+            return None
+        try:
+            node_ids = np.load(self.__get_path(key, 'ids'))
+            positions = np.load(self.__get_path(key, 'positions'), mmap_mode='r')
+        except (OSError, ValueError):
+            # Unreadable files are computed and stored again
+            return None
+        layout = LayoutArray(node_ids=node_ids, positions=positions, computed=np.ones(len(positions), dtype=bool))
+        touch_files([self.__get_path(key, 'ids'), self.__get_path(key, 'positions')])
+        self.__put_in_memory(key, layout)
+        return layout
+
+    def put(self, key: str, layout: LayoutArray):
+        """Caches a layout with all timesteps computed."""
+        self.__put_in_memory(key, layout)
+        if self.__cache_dir is not None:
+            # Positions are written last, since their file marks a layout as stored
+            self.__save_array(self.__get_path(key, 'ids'), layout.get_node_ids())
+            self.__save_array(self.__get_path(key, 'positions'), layout.get_steps(0, len(layout)))
+            # The stored layout is kept, even if it exceeds the limit alone. Removing files of other
+            # memory-mapped layouts does not affect their arrays.
+            prune_cache_dir(self.__cache_dir, self.__max_disk_bytes, keep={key})
+
+    def __put_in_memory(self, key: str, layout: LayoutArray):
+        self.__layouts[key] = layout
+        self.__layouts.move_to_end(key)
+        while len(self.__layouts) > self.__max_size:
+            self.__layouts.popitem(last=False)
+
+    def __remove_pickled_layouts(self):
+        """Removes layouts pickled by earlier versions, which are never read."""
+        for name in os.listdir(self.__cache_dir):
+            if name.endswith('.pickle'):
+                try:
+                    os.remove(os.path.join(self.__cache_dir, name))
+                except OSError:
+                    # Another session may remove them at the same time
+                    pass
+
+    @staticmethod
+    def __save_array(path: str, array: np.ndarray):
+        # Write to temporary file first, so other sessions never read a partially written layout
+        temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(temp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(temp_path, path)
+
+    def __get_path(self, key: str, name: str) -> str:
+        return os.path.join(self.__cache_dir, f'{key}.{name}.npy')
+
+
+class TimestepLayoutMemo(object):
+    def __init__(self, max_bytes: int = 1 << 26):
+        """
+        Least recently used memo of positions of single timesteps, see build_keys() for keys.
+        Layouts computing every timestep independently reuse these for timesteps with the same edges,
+        e.g. after changing hyperparameters back or loading the same graph again.
+
+        Args:
+            max_bytes: Maximal number of bytes of the kept positions.
+        """
+        self.__max_bytes = max_bytes
+        self.__size = 0
+        self.__positions = collections.OrderedDict()  # type: typ.Dict[str, np.ndarray]
+        # Layouts are computed in background threads
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def build_keys(temp_graph: vtna.graph.TemporalGraph, layout_name: str, parameters: typ.Dict[str, typ.Any],
+                   weighted: bool) -> typ.List[str]:
+        """
+        Returns keys of all timesteps of a temporal graph, which are equal for timesteps with equal nodes and
+        edges. With weighted, the number of timestamps of edges must be equal as well.
+        """
+        prefix = json.dumps([layout_name, sorted(parameters.items()),
+                             sorted(node.get_id() for node in temp_graph.get_nodes())]).encode('utf-8')
+        keys = list()
+        for graph in temp_graph:
+            rows = [(node1, node2, len(edge.get_timestamps()) if weighted else 0)
+                    for edge in graph.get_edges() for (node1, node2) in [edge.get_incident_nodes()]]
+            rows = np.array(rows, dtype=np.int64).reshape(-1, 3)
+            # Edges are undirected and sorted, so neither the order of nodes nor of edges changes the key
+            rows[:, :2].sort(axis=1)
+            rows = rows[np.lexsort(rows.T[::-1])]
+            keys.append(hashlib.sha1(prefix + rows.tobytes()).hexdigest())
+        return keys
+
+    def get(self, key: str) -> typ.Optional[np.ndarray]:
+        """Returns memorized (nodes, 2) array of positions or None."""
+        with self.__lock:
+            if key not in self.__positions:
+                return None
+            self.__positions.move_to_end(key)
+            return self.__positions[key]
+
+    def put(self, key: str, positions: np.ndarray):
+        with self.__lock:
+            if key in self.__positions:
+                self.__size -= self.__positions.pop(key).nbytes
+            self.__positions[key] = positions
+            self.__size += positions.nbytes
+            while self.__size > self.__max_bytes:
+                self.__size -= self.__positions.popitem(last=False)[1].nbytes
+
+
+class TemporalGraphWindow(object):
+    def __init__(self, temp_graph: vtna.graph.TemporalGraph, start: int, stop: int):
+        """
+        Temporal graph restricted to the timesteps in [start, stop), so layouts can be computed for these only.
+        All other attributes, e.g. get_nodes(), are the ones of the whole graph.
+        """
+        self.__temp_graph = temp_graph
+        self.__start = start
+        self.__stop = stop
+
+    def __iter__(self):
+        # Timesteps are accessed directly, so windows late in the graph do not iterate it from its start
+        return (self.__temp_graph[timestep] for timestep in range(self.__start, self.__stop))
+
+    def __len__(self):
+        return self.__stop - self.__start
+
+    def __getitem__(self, timestep: int):
+        if not 0 <= timestep < len(self):
+            raise IndexError(f'Timestep {timestep} out of window of {len(self)} timesteps')
+        return self.__temp_graph[self.__start + timestep]
+
+    def __getattr__(self, name: str):
+        # Only called for attributes the window does not have
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.__temp_graph, name)
+
+
+class LayoutComputation(object):
+    # Layouts computing every timestep independently, which are computed in chunks of timesteps
+    CHUNKED_LAYOUT_FUNCTIONS = [
+        vtna.layout.flexible_spring_layout,
+        vtna.layout.flexible_weighted_spring_layout
+    ]
+    # Spring layouts, which can start from the positions of a previous layout, see seed_layout
+    SEEDED_LAYOUT_FUNCTIONS = [
+        vtna.layout.static_spring_layout,
+        vtna.layout.flexible_spring_layout,
+        vtna.layout.static_weighted_spring_layout,
+        vtna.layout.flexible_weighted_spring_layout,
+        vtna.layout.chained_weighted_spring_layout
+    ]
+    # Layouts weighting edges by their number of timestamps
+    WEIGHTED_LAYOUT_FUNCTIONS = [
+        vtna.layout.static_weighted_spring_layout,
+        vtna.layout.flexible_weighted_spring_layout,
+        vtna.layout.chained_weighted_spring_layout
+    ]
+    # Maximal number of iterations of spring layouts starting from the positions of a previous layout
+    SEEDED_ITERATIONS = 10
+    # Seconds between checks for cancel() while waiting for workers
+    CANCEL_POLL_INTERVAL = 0.1
+
+    def __init__(self,
+                 layout_function: typ.Callable,
+                 temp_graph: vtna.graph.TemporalGraph,
+                 parameters: typ.Dict[str, typ.Any],
+                 chunk_size: int,
+                 chunk_computed: typ.Callable[['LayoutComputation', int, np.ndarray], None],
+                 computation_finished: typ.Callable[['LayoutComputation', LayoutArray], None],
+                 computation_failed: typ.Callable[['LayoutComputation', Exception], None],
+                 workers: int = None,
+                 timestep_memo: TimestepLayoutMemo = None,
+                 frame_store: FrameStore = None,
+                 seed_layout: LayoutArray = None,
+                 seed_timesteps: np.ndarray = None):
+        """
+        Computes a layout in a background thread. Layouts in CHUNKED_LAYOUT_FUNCTIONS are computed in chunks
+        of timesteps, which are passed to chunk_computed as soon as they are done, other layouts in one chunk.
+        Chunks are computed in parallel by worker processes, so they may finish out of order.
+        Other layouts are computed in one chunk by a single process, since vtna computes them for the whole
+        graph at once: Static layouts and the PCA layout combine all timesteps, chained layouts start each
+        timestep from the positions of the previous one. They neither use further workers nor are shown before
+        all timesteps are computed.
+        Callbacks are called from the background thread, none after cancel().
+
+        Args:
+            parameters: Hyperparameters passed to the layout function.
+            chunk_computed: Called with the computation, the first timestep and the (timesteps, nodes, 2) array
+                of positions of the chunk, see LayoutArray.
+            computation_finished: Called with the computation and the layout of all timesteps.
+            computation_failed: Called with the computation and the raised exception.
+            workers: Number of processes computing chunks, see get_default_worker_count() for the default.
+                With 1, chunks are computed in the background thread.
+            timestep_memo: If set, layouts in CHUNKED_LAYOUT_FUNCTIONS take positions of timesteps from it,
+                and of earlier timesteps with the same edges, instead of computing them. Computed positions
+                are added to it.
+            frame_store: If set, the layout is memory-mapped in this store.
+            seed_layout: Previous layout of the same nodes, e.g. before toggling cumulative graphs or changing the
+                granularity. Layouts in SEEDED_LAYOUT_FUNCTIONS start from its positions and only take up to
+                SEEDED_ITERATIONS iterations of a spring layout, instead of computing the layout with vtna.
+                Nodes without previous position start at their position in the previous timestep, or at random.
+                Only timesteps without any previous position of their nodes are computed with vtna.
+            seed_timesteps: Timestep of seed_layout for each timestep, whose positions seed it.
+        """
+        self.__layout_function = layout_function
+        self.__temp_graph = temp_graph
+        self.__parameters = parameters
+        self.__chunk_size = chunk_size
+        self.__chunk_computed = chunk_computed
+        self.__computation_finished = computation_finished
+        self.__computation_failed = computation_failed
+        self.__workers = workers if workers is not None else get_default_worker_count()
+        self.__timestep_memo = timestep_memo
+        self.__frame_store = frame_store
+        self.__seed_layout = seed_layout
+        self.__seed_timesteps = seed_timesteps
+        self.__computed_timesteps = 0
+        self.__cancel_event = threading.Event()
+        self.__thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        """Runs the computation in the background thread."""
+        self.__thread.start()
+
+    def run(self):
+        """Runs the computation in the calling thread."""
+        try:
+            layout = self.__compute()
+        except Exception as e:
+            if not self.is_cancelled():
+                self.__computation_failed(self, e)
+            return
+        if layout is not None:
+            self.__computation_finished(self, layout)
+
+    def cancel(self):
+        """Stops the computation after the current chunk, or right away if chunks are computed by workers."""
+        self.__cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self.__cancel_event.is_set()
+
+    def get_computed_timesteps(self) -> int:
+        """Returns number of timesteps with positions, computed or reused."""
+        return self.__computed_timesteps
+
+    def __compute(self) -> typ.Optional[LayoutArray]:
+        """Returns layout of all timesteps, or None if cancelled."""
+        timesteps = len(self.__temp_graph)
+        layout = LayoutArray.empty(self.__temp_graph) if self.__frame_store is None \
+            else self.__frame_store.create_layout(self.__temp_graph)
+        if self.__seed_layout is not None and self.__layout_function in LayoutComputation.SEEDED_LAYOUT_FUNCTIONS \
+                and np.array_equal(self.__seed_layout.get_node_ids(), layout.get_node_ids()):
+            computed_chunks = self.__compute_seeded(layout)
+            keys = None
+        elif self.__layout_function not in LayoutComputation.CHUNKED_LAYOUT_FUNCTIONS:
+            computed_chunks = self.__compute_chunks(layout, [(0, timesteps)])
+            keys = None
+        elif self.__timestep_memo is None:
+            computed_chunks = self.__compute_chunks(layout, [(start, min(start + self.__chunk_size, timesteps))
+                                                             for start in range(0, timesteps, self.__chunk_size)])
+            keys = None
+        else:
+            keys = TimestepLayoutMemo.build_keys(
+                self.__temp_graph, self.__layout_function.name, self.__parameters,
+                weighted=self.__layout_function is vtna.layout.flexible_weighted_spring_layout)
+            first_timesteps = dict()  # type: typ.Dict[str, int]
+            for timestep, key in enumerate(keys):
+                positions = self.__timestep_memo.get(key)
+                if positions is not None:
+                    layout.set_steps(timestep, positions[np.newaxis])
+                first_timesteps.setdefault(key, timestep)
+            # Only the first timestep of equal timesteps without positions is computed
+            missing_timesteps = [timestep for timestep, key in enumerate(keys)
+                                 if not layout.is_computed(timestep) and first_timesteps[key] == timestep]
+            self.__deliver(layout, [timestep for timestep in range(timesteps) if layout.is_computed(timestep)])
+            computed_chunks = self.__compute_chunks(layout, self.__split_chunks(missing_timesteps))
+        try:
+            for start, positions in computed_chunks:
+                if self.is_cancelled():
+                    return None
+                layout.set_steps(start, positions)
+                delivered_timesteps = list(range(start, start + len(positions)))
+                if keys is not None:
+                    for timestep in delivered_timesteps:
+                        # Copied, so the memo does not keep the whole layout
+                        self.__timestep_memo.put(keys[timestep], layout.get_positions(timestep).copy())
+                    # Timesteps equal to the computed ones
+                    computed_timesteps = set(delivered_timesteps)
+                    equal_timesteps = [timestep for timestep, key in enumerate(keys)
+                                       if not layout.is_computed(timestep) and first_timesteps[key] in computed_timesteps]
+                    for timestep in equal_timesteps:
+                        layout.set_steps(timestep, layout.get_positions(first_timesteps[keys[timestep]])[np.newaxis])
+                    delivered_timesteps += equal_timesteps
+                self.__deliver(layout, sorted(delivered_timesteps))
+        finally:
+            # Stops workers, if the computation ended early
+            computed_chunks.close()
+        return None if self.is_cancelled() else layout
+
+    def __deliver(self, layout: LayoutArray, timesteps: typ.List[int]):
+        """Passes positions of sorted timesteps to chunk_computed, one call per run of consecutive timesteps."""
+        for _, run in itertools.groupby(enumerate(timesteps), key=lambda item: item[1] - item[0]):
+            run = [timestep for _, timestep in run]
+            if self.is_cancelled():
+                return
+            self.__computed_timesteps += len(run)
+            self.__chunk_computed(self, run[0], layout.get_steps(run[0], run[-1] + 1))
+
+    def __split_chunks(self, timesteps: typ.List[int]) -> typ.List[typ.Tuple[int, int]]:
+        """Returns chunks [start, stop) of at most chunk_size consecutive timesteps, covering sorted timesteps."""
+        chunks = list()
+        for _, run in itertools.groupby(enumerate(timesteps), key=lambda item: item[1] - item[0]):
+            run = [timestep for _, timestep in run]
+            chunks.extend((start, min(start + self.__chunk_size, run[-1] + 1))
+                          for start in range(run[0], run[-1] + 1, self.__chunk_size))
+        return chunks
+
+    def __compute_chunks(self, layout: LayoutArray, chunks: typ.List[typ.Tuple[int, int]]) \
+            -> typ.Iterator[typ.Tuple[int, np.ndarray]]:
+        """
+        Yields first timestep and (timesteps, nodes, 2) array of positions of chunks,
+        in parallel in order of completion if there are workers.
+        """
+        if self.__workers > 1 and len(chunks) > 1:
+            yield from self.__compute_parallel(layout.get_node_columns(), chunks)
+        else:
+            for start, stop in chunks:
+                layout_steps = self.__layout_function(
+                    temp_graph=TemporalGraphWindow(self.__temp_graph, start, stop), **self.__parameters)
+                yield start, layout.build_positions(layout_steps)
+
+    def __compute_seeded(self, layout: LayoutArray) -> typ.Iterator[typ.Tuple[int, np.ndarray]]:
+        """
+        Yields first timestep and (timesteps, nodes, 2) array of positions of runs of timesteps, which start from
+        the positions of seed_layout. Timesteps without any seeded node are computed with vtna at last.
+        """
+        timesteps = len(self.__temp_graph)
+        node_columns = layout.get_node_columns()
+        weighted = self.__layout_function in LayoutComputation.WEIGHTED_LAYOUT_FUNCTIONS
+        iterations = min(self.__parameters['n_iterations'], LayoutComputation.SEEDED_ITERATIONS)
+        node_distance_scale = self.__parameters['node_distance_scale']
+        if self.__layout_function.is_static:
+            # Positions of static layouts are equal in all timesteps, so all edges are laid out at once
+            edges = [edge for timestep in range(timesteps)
+                     for edge in get_weighted_edges(self.__temp_graph[timestep], weighted)]
+            seed_positions = self.__get_seed_positions(0)
+            positions = None if seed_positions is None else compute_seeded_spring_layout(
+                edges, seed_positions, node_columns, node_distance_scale, iterations)
+            if positions is not None:
+                yield 0, np.broadcast_to(positions, (timesteps,) + positions.shape)
+            else:
+                yield from self.__compute_chunks(layout, [(0, timesteps)])
+            return
+        unseeded_timesteps = list()
+        previous_positions = None  # type: np.ndarray
+        for start in range(0, timesteps, self.__chunk_size):
+            stop = min(start + self.__chunk_size, timesteps)
+            positions = np.full((stop - start, len(node_columns), 2), np.nan, dtype=np.float32)
+            seeded = np.zeros(stop - start, dtype=bool)
+            for timestep in range(start, stop):
+                if self.is_cancelled():
+                    return
+                seed_positions = self.__get_seed_positions(timestep)
+                if seed_positions is not None and previous_positions is not None:
+                    # Nodes without position in the seed start where they were in the previous timestep
+                    seed_positions = np.where(np.isnan(seed_positions), previous_positions, seed_positions)
+                step_positions = None if seed_positions is None else compute_seeded_spring_layout(
+                    get_weighted_edges(self.__temp_graph[timestep], weighted), seed_positions, node_columns,
+                    node_distance_scale, iterations)
+                if step_positions is None:
+                    unseeded_timesteps.append(timestep)
+                    continue
+                positions[timestep - start] = step_positions
+                seeded[timestep - start] = True
+                previous_positions = step_positions
+            # Runs of consecutive seeded timesteps
+            seeded_rows = np.flatnonzero(seeded).tolist()
+            for _, run in itertools.groupby(enumerate(seeded_rows), key=lambda item: item[1] - item[0]):
+                run = [row for _, row in run]
+                yield start + run[0], positions[run[0]:run[-1] + 1]
+        yield from self.__compute_chunks(layout, self.__split_chunks(unseeded_timesteps))
+
+    def __get_seed_positions(self, timestep: int) -> typ.Optional[np.ndarray]:
+        """Returns (nodes, 2) array of positions of seed_layout, which seed the timestep, or None."""
+        seed_timestep = int(self.__seed_timesteps[timestep])
+        if not self.__seed_layout.is_computed(seed_timestep):
+            return None
+        return self.__seed_layout.get_positions(seed_timestep)
+
+    def __compute_parallel(self, node_columns: typ.Dict[int, int], chunks: typ.List[typ.Tuple[int, int]]) \
+            -> typ.Iterator[typ.Tuple[int, np.ndarray]]:
+        """Yields first timestep and positions of chunks in order of completion, computed by worker processes."""
+        function_index = LayoutComputation.CHUNKED_LAYOUT_FUNCTIONS.index(self.__layout_function)
+        # The graph is pickled once and passed to each worker when it starts, not with every chunk
+        pickled_temp_graph = pickle.dumps(self.__temp_graph, protocol=pickle.HIGHEST_PROTOCOL)
+        pool = create_worker_pool(min(self.__workers, len(chunks)), initializer=init_layout_worker,
+                                  initargs=(pickled_temp_graph,))
+        try:
+            results = pool.imap_unordered(
+                functools.partial(compute_layout_chunk, function_index, self.__parameters, node_columns), chunks)
+            for _ in range(len(chunks)):
+                chunk = None
+                while chunk is None:
+                    try:
+                        chunk = results.next(timeout=LayoutComputation.CANCEL_POLL_INTERVAL)
+                    except multiprocessing.TimeoutError:
+                        if self.is_cancelled():
+                            return
+                yield chunk
+        finally:
+            # Stops workers of chunks still being computed, e.g. after cancel()
+            pool.terminate()
+
+
+# Temporal graph of a layout worker process, see init_layout_worker()
+_worker_temp_graph = None  # type: vtna.graph.TemporalGraph
+
+
+def init_layout_worker(pickled_temp_graph: bytes):
+    """Sets the temporal graph of a layout worker process, see LayoutComputation."""
+    global _worker_temp_graph
+    _worker_temp_graph = pickle.loads(pickled_temp_graph)
+
+
+def compute_layout_chunk(function_index: int, parameters: typ.Dict[str, typ.Any], node_columns: typ.Dict[int, int],
+                         chunk: typ.Tuple[int, int]) -> typ.Tuple[int, np.ndarray]:
+    """
+    Computes first timestep and (timesteps, nodes, 2) array of positions of a chunk [start, stop) of timesteps
+    in a layout worker process, see LayoutComputation.
+    """
+    start, stop = chunk
+    layout_function = LayoutComputation.CHUNKED_LAYOUT_FUNCTIONS[function_index]
+    layout_steps = layout_function(temp_graph=TemporalGraphWindow(_worker_temp_graph, start, stop), **parameters)
+    return start, build_layout_positions(node_columns, layout_steps)
+
+
+def get_weighted_edges(graph: 'vtna.graph.Graph', weighted: bool) -> typ.List[typ.Tuple[int, int, int]]:
+    """Returns edges of a graph as node IDs and their weight, the number of timestamps if weighted, else 1."""
+    return [(*edge.get_incident_nodes(), len(edge.get_timestamps()) if weighted else 1) for edge in graph.get_edges()]
+
+
+def compute_seeded_spring_layout(edges: typ.List[typ.Tuple[int, int, int]], seed_positions: np.ndarray,
+                                 node_columns: typ.Dict[int, int], node_distance_scale: float,
+                                 iterations: int) -> typ.Optional[np.ndarray]:
+    """
+    Returns (nodes, 2) array of positions of the nodes of weighted edges, NaN for other nodes, after iterations
+    of a spring layout starting at seed_positions. Weights of repeated edges are summed. Nodes with NaN seed
+    positions start at random. Returns None if no node has a seed position.
+
+    Args:
+        seed_positions: (nodes, 2) array of positions, see LayoutArray.
+        node_columns: Node IDs to their columns.
+        node_distance_scale: Factor of the optimal distance between nodes, as in vtna's spring layouts.
+    """
+    graph = networkx.Graph()
+    for node1, node2, weight in edges:
+        if graph.has_edge(node1, node2):
+            weight += graph[node1][node2]['weight']
+        graph.add_edge(node1, node2, weight=weight)
+    positions = np.full(seed_positions.shape, np.nan, dtype=np.float32)
+    if graph.number_of_nodes() == 0:
+        return positions
+    nodes = list(graph.nodes())
+    columns = np.array([node_columns[node] for node in nodes], dtype=np.int64)
+    node_seed_positions = seed_positions[columns].astype(np.float64)
+    seeded = ~np.isnan(node_seed_positions).any(axis=1)
+    if not seeded.any():
+        return None
+    # Positions keep the center and extent of the seed, so they do not jump, e.g. when toggling cumulative graphs
+    center = node_seed_positions[seeded].mean(axis=0)
+    scale = float(np.abs(node_seed_positions[seeded] - center).max()) or 1.
+    layout = networkx.spring_layout(graph, k=node_distance_scale * scale / np.sqrt(len(nodes)),
+                                    pos=dict((node, node_seed_positions[row]) for row, node in enumerate(nodes)
+                                             if seeded[row]),
+                                    iterations=iterations, weight='weight', scale=scale, center=center)
+    positions[columns] = [layout[node] for node in nodes]
+    return positions
+
+
 class TemporalGraphFigure(object):
     DEFAULT_ANIMATION_FRAME_LENGTH = 700
+    # Number of frame windows, which indexed edges are kept of in windowed mode
+    MAX_INDEXED_WINDOWS = 4
 
     def __init__(self,
                  temp_graph: vtna.graph.TemporalGraph,
-                 layout: typ.List[typ.Dict[int, typ.Tuple[float, float]]],
+                 layout: LayoutArray,
                  display_size: typ.Tuple[int, int],
                  animate_transitions: bool,
-                 color_map: typ.Union[str, typ.Dict[int, str]],
+                 color_map: typ.Union[str, NodeColors],
                  edge_color: str,
                  node_size: float,
-                 edge_width: float):
+                 edge_width: float,
+                 frame_window: int = None,
+                 edge_index: EdgeIndex = None):
+        """
+        Builds plotly figure frames of a temporal graph.
+
+        Args:
+            frame_window: If set, frames are built in windows of this many timesteps. The figure only contains
+                the first window, following windows are built on request, see get_frames().
+                If None, frames of all timesteps are built at once.
+            edge_index: If set, edges of frames are read from this index instead of the graph, see update_layout().
+        """
         self.__temp_graph = temp_graph
-        # Retrieve nodes once to ensure same order
-        self.__nodes = self.__temp_graph.get_nodes()
+        # Retrieve nodes once to ensure same order. Sorting by ID gives every node a stable column,
+        # which is used to index node visibility and the edge arrays of each frame.
+        self.__nodes = sorted(self.__temp_graph.get_nodes(), key=lambda n: n.get_id())
+        self.__node_ids = np.array([node.get_id() for node in self.__nodes], dtype=np.int64)
+        self.__node_columns = dict((node_id, column) for column, node_id in enumerate(self.__node_ids.tolist()))
+        # Per timestep: sorted columns of all nodes with edges, edges as (m, 2) arrays of rows into these
+        # node columns, positions of these nodes as (k, 2) array and their hover texts.
+        # Filter changes only mask these arrays, see __assemble_data_frames.
+        # Timesteps are indexed when their frames are built first, see __index_frames.
+        self.__frame_nodes = dict()  # type: typ.Dict[int, np.ndarray]
+        self.__frame_edge_rows = dict()  # type: typ.Dict[int, np.ndarray]
+        self.__frame_node_positions = dict()  # type: typ.Dict[int, np.ndarray]
+        self.__frame_node_texts = dict()  # type: typ.Dict[int, np.ndarray]
+        self.__frame_window = frame_window
+        # Windows with indexed timesteps in windowed mode, least recently used first
+        self.__indexed_windows = collections.OrderedDict()  # type: typ.Dict[int, None]
+        self.__edge_index = edge_index
         self.__layout = layout
         self.__display_size = display_size
         self.__color_map = color_map
@@ -1737,43 +3862,47 @@ class TemporalGraphFigure(object):
         self.__node_size = node_size
         self.__edge_width = edge_width
 
-        self.__node_filter = vtna.filter.NodeFilter(lambda _: True)
+        # Mask over node columns, set by the node filter
+        self.__node_mask = np.ones(len(self.__nodes), dtype=bool)
+        self.__hover_texts = NodeHoverTextCache(self.__temp_graph)
         self.__figure_data = None  # type: typ.Dict
-        self.__sliders_data = None  # type: typ.Dict
+        # Mask over node columns, True for nodes passing the node filter
+        self.__visible = None  # type: np.ndarray
         self.__figure_plot = None  # type: plt.Figure
         self.__transition_time = 300
         self.__frame_length = TemporalGraphFigure.DEFAULT_ANIMATION_FRAME_LENGTH
         self.toggle_animate_transitions(animate_transitions)
         self.__build_data_frames()
 
-    def __init_figure_data(self):
-        self.__figure_data = {
+    def __init_figure_data(self) -> typ.Tuple[typ.Dict, typ.Dict]:
+        """Returns figure dict without frames and the slider dict, which steps are added per frame"""
+        figure_data = {
             'data': [],
             'layout': {},
             'frames': []
         }
-        self.__figure_data['layout']['showlegend'] = False
-        self.__figure_data['layout']['autosize'] = False
+        figure_data['layout']['showlegend'] = False
+        figure_data['layout']['autosize'] = False
         # Substract approximate height of control widgets to fit in the box
-        self.__figure_data['layout']['width'] = self.__display_size[0] - 20
-        self.__figure_data['layout']['height'] = self.__display_size[1] - 20
+        figure_data['layout']['width'] = self.__display_size[0] - 20
+        figure_data['layout']['height'] = self.__display_size[1] - 20
         # Make plot more compact
-        self.__figure_data['layout']['margin'] = plotly.graph_objs.Margin(
+        figure_data['layout']['margin'] = plotly.graph_objs.Margin(
             t=20,
             pad=0
         )
-        self.__figure_data['layout']['hovermode'] = 'closest'
-        self.__figure_data['layout']['yaxis'] = {
+        figure_data['layout']['hovermode'] = 'closest'
+        figure_data['layout']['yaxis'] = {
             'range': [-1.1, 1.1],
             'ticks': '',
             'showticklabels': False
         }
-        self.__figure_data['layout']['xaxis'] = {
+        figure_data['layout']['xaxis'] = {
             'range': [-1.1, 1.1],
             'ticks': '',
             'showticklabels': False
         }
-        self.__figure_data['layout']['sliders'] = {
+        figure_data['layout']['sliders'] = {
             'args': [
                 'transition', {
                     'duration': self.__transition_time,
@@ -1785,7 +3914,7 @@ class TemporalGraphFigure(object):
             'values': len(self.__temp_graph),
             'visible': True
         }
-        self.__figure_data['layout']['updatemenus'] = [
+        figure_data['layout']['updatemenus'] = [
             {
                 'buttons': [
                     {
@@ -1812,7 +3941,7 @@ class TemporalGraphFigure(object):
                 'yanchor': 'top'
             }
         ]
-        self.__sliders_data = {
+        sliders_data = {
             'active': 0,
             'yanchor': 'top',
             'xanchor': 'left',
@@ -1830,9 +3959,62 @@ class TemporalGraphFigure(object):
             'y': 0,
             'steps': []
         }
+        return figure_data, sliders_data
+
+    def get_figure(self, visible_only: bool = True) -> typ.Dict:
+        """
+        Returns the plotly figure dict.
+
+        Args:
+            visible_only: If False, nodes removed by the node filter are kept in the frames,
+                so they can be hidden and shown again in the browser, see get_client_state().
+        """
+        if visible_only:
+            return self.__figure_data
+        return self.__assemble_figure(np.ones(len(self.__nodes), dtype=bool))
+
+    def get_frame_window(self) -> typ.Optional[int]:
+        """Returns number of timesteps per frame window, None if all frames are built at once."""
+        return self.__frame_window
+
+    def get_frame_count(self) -> int:
+        return len(self.__temp_graph)
+
+    def get_window_range(self, window: int) -> typ.Tuple[int, int]:
+        """
+        Returns first and last + 1 timestep of a frame window, which covers timesteps
+        [window * frame_window, (window + 1) * frame_window). Without frame window, all timesteps are in window 0.
+        """
+        if self.__frame_window is None:
+            return 0, len(self.__temp_graph)
+        start = window * self.__frame_window
+        return start, min(start + self.__frame_window, len(self.__temp_graph))
+
+    def get_frames(self, start: int, stop: int, visible_only: bool = True) -> typ.List[typ.Dict]:
+        """
+        Returns plotly frames of the timesteps in [start, stop).
 
-    def get_figure(self) -> typ.Dict:
-        return self.__figure_data
+        Args:
+            visible_only: See get_figure().
+        """
+        visible = self.__visible if visible_only else np.ones(len(self.__nodes), dtype=bool)
+        return self.__assemble_data_frames(start, stop, visible)
+
+    def get_client_state(self) -> typ.Dict[str, typ.Any]:
+        """
+        Returns filter and style state as JSON serializable dict, which js/figure.js applies
+        to every frame of a figure displayed with get_figure(visible_only=False).
+        The state must not be time dependent, see is_time_dependent().
+        """
+        return {
+            'hidden_nodes': self.__node_ids[~self.__visible].tolist(),
+            'node_colors': self.__color_map if isinstance(self.__color_map, str)
+            else dict(self.__color_map.encode(), node_ids=self.__node_ids.tolist()),
+            'node_size': self.__node_size,
+            'edge_color': self.__edge_color,
+            'edge_width': self.__edge_width,
+            'frame_length': self.__frame_length
+        }
 
     def toggle_animate_transitions(self, animate_transitions: bool):
         """Toggles transition animation. Must be called before frames are built."""
@@ -1841,20 +4023,53 @@ class TemporalGraphFigure(object):
         else:
             self.__transition_time = 0
 
-    def update_colors(self, color_map: typ.Union[str, typ.Dict[int, str]]):
+    def update_colors(self, color_map: typ.Union[str, NodeColors]):
         if self.__color_map != color_map:
             self.__color_map = color_map
             self.__recolor_displayed_nodes()
             self.__set_figure_data_as_initial_frame()
 
-    def update_filter(self, node_filter: vtna.filter.NodeFilter):
-        self.__node_filter = node_filter
-        self.__build_data_frames()
+    def is_time_dependent(self) -> bool:
+        """Returns whether the node filter or node colors differ per timestep, as with queries of local attributes."""
+        return self.__visible.ndim == 2 or \
+            (isinstance(self.__color_map, NodeColors) and self.__color_map.is_time_dependent())
 
-    def update_layout(self, layout: typ.List[typ.Dict[int, typ.Tuple[float, float]]]):
+    def update_filter(self, node_mask: np.ndarray):
+        """
+        Sets mask over nodes sorted by ID, True for nodes to display.
+        A (timesteps, nodes) mask sets the displayed nodes of each timestep.
+        """
+        self.__node_mask = node_mask
+        # Nodes, edges and their positions are unaffected by filters, so only the visible subset is rebuilt
+        self.__visible = self.__compute_visible_nodes()
+        self.__figure_data = self.__assemble_figure(self.__visible)
+
+    def update_layout(self, layout: LayoutArray, edge_index: EdgeIndex = None):
+        """
+        Sets layout and rebuilds all frames. Timesteps not computed yet are displayed without nodes.
+        With an edge index, an index of the graph's current state must be passed, e.g. after toggling
+        cumulative graphs.
+        """
         self.__layout = layout
+        self.__edge_index = edge_index
         self.__build_data_frames()
 
+    def update_layout_steps(self, start: int, positions: np.ndarray):
+        """
+        Sets (timesteps, nodes, 2) array of positions of timesteps beginning at start, e.g. of newly computed
+        timesteps. The layout of update_layout() is changed in place.
+        """
+        self.__layout.set_steps(start, positions)
+        stop = start + len(positions)
+        for timestep in range(start, stop):
+            self.__drop_indexed_timestep(timestep)
+        first_start, first_stop = self.get_window_range(0)
+        if start < first_stop and stop > first_start:
+            self.__figure_data = self.__assemble_figure(self.__visible)
+
+    def get_layout(self) -> LayoutArray:
+        return self.__layout
+
     def update_edge_color(self, color: str):
         if self.__edge_color != color:
             self.__edge_color = color
@@ -1880,16 +4095,100 @@ class TemporalGraphFigure(object):
             # Update play animation speed with a beautiful 9-layer-deep container access
             self.__figure_data['layout']['updatemenus'][0]['buttons'][0]['args'][1]['frame']['duration'] = frame_length
 
-    def __build_data_frames(self):
-        self.__init_figure_data()
+    def __index_frames(self, start: int, stop: int):
+        """Translates the edges of timesteps in [start, stop) into node columns and rows of these columns."""
+        unindexed = [timestep for timestep in range(start, stop) if timestep not in self.__frame_nodes]
+        for timestep in unindexed:
+            if self.__edge_index is not None:
+                self.__index_frame(timestep, *index_edge_columns(self.__edge_index.get_edges(timestep)))
+            else:
+                # Timesteps are accessed directly, so late windows do not iterate the graph from its start
+                self.__index_frame(timestep, *index_graph_edges(self.__temp_graph[timestep], self.__node_columns))
+        if self.__frame_window is not None:
+            # Only the most recently used windows stay indexed, so memory does not grow with the graph length
+            for window in range(start // self.__frame_window, (stop - 1) // self.__frame_window + 1):
+                self.__indexed_windows[window] = None
+                self.__indexed_windows.move_to_end(window)
+            while len(self.__indexed_windows) > TemporalGraphFigure.MAX_INDEXED_WINDOWS:
+                window, _ = self.__indexed_windows.popitem(last=False)
+                for timestep in range(*self.get_window_range(window)):
+                    self.__drop_indexed_timestep(timestep)
+
+    def __drop_indexed_timestep(self, timestep: int):
+        self.__frame_nodes.pop(timestep, None)
+        self.__frame_edge_rows.pop(timestep, None)
+        self.__frame_node_positions.pop(timestep, None)
+        self.__frame_node_texts.pop(timestep, None)
+
+    def __index_frame(self, timestep: int, node_columns: np.ndarray, edge_rows: np.ndarray):
+        if not self.__layout.is_computed(timestep):
+            # Layout of timestep is not computed yet
+            node_columns, edge_rows = np.zeros(0, dtype=np.int32), np.zeros((0, 2), dtype=np.int64)
+        node_ids = self.__node_ids[node_columns].tolist()
+        self.__frame_nodes[timestep] = node_columns
+        self.__frame_edge_rows[timestep] = edge_rows
+        self.__frame_node_texts[timestep] = np.array(
+            [self.__hover_texts.get_text(node_id, timestep) for node_id in node_ids], dtype=object)
+        self.__frame_node_positions[timestep] = self.__layout.get_positions(timestep)[node_columns].astype(float)
+
+    def __iter_indexed_timesteps(self, start: int, stop: int) -> typ.Iterator[int]:
+        """Yields timesteps in [start, stop), which are indexed window by window."""
+        chunk_size = self.__frame_window if self.__frame_window is not None else max(stop - start, 1)
+        for chunk_start in range(start, stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, stop)
+            self.__index_frames(chunk_start, chunk_stop)
+            yield from range(chunk_start, chunk_stop)
+
+    def __compute_visible_nodes(self) -> np.ndarray:
+        """Returns boolean mask over node columns, True for nodes passing the node filter."""
+        # Node columns are sorted by node ID as well
+        return self.__node_mask.copy()
 
-        node_ids = [node.get_id() for node in self.__node_filter(self.__temp_graph.get_nodes())]
+    def __build_data_frames(self):
+        self.__hover_texts.validate()
+        # Rebuilding happens after layout changes, which includes toggling cumulative graphs,
+        # so the edges of each timestep are indexed again.
+        self.__frame_nodes = dict()
+        self.__frame_edge_rows = dict()
+        self.__frame_node_positions = dict()
+        self.__frame_node_texts = dict()
+        self.__indexed_windows = collections.OrderedDict()
+        self.__visible = self.__compute_visible_nodes()
+        self.__figure_data = self.__assemble_figure(self.__visible)
+
+    def __assemble_figure(self, visible: np.ndarray) -> typ.Dict:
+        """Returns plotly figure dict with frames of the first window, which are all frames if not windowed."""
+        figure_data, sliders_data = self.__init_figure_data()
+        figure_data['frames'] = self.__assemble_data_frames(*self.get_window_range(0), visible)
+        # Slider steps of frames, which are not built yet, are handled by js/figure.js
+        sliders_data['steps'] = [self.__build_slider_step(timestep) for timestep in range(len(self.__temp_graph))]
+        figure_data['layout']['sliders'] = [sliders_data]
+
+        # Set figure data as initial frame
+        figure_data['data'] = figure_data['frames'][0]['data'].copy()
+        return figure_data
+
+    def __assemble_data_frames(self, start: int, stop: int, visible: np.ndarray) -> typ.List[typ.Dict]:
+        """Returns plotly frames of timesteps in [start, stop), showing only nodes in the visible mask."""
+        frames = list()
+        for timestep in self.__iter_indexed_timesteps(start, stop):
+            node_columns = self.__frame_nodes[timestep]
+            edge_rows, node_rows = self.__get_displayed_rows(timestep, visible)
+            node_ids = self.__node_ids[node_columns[node_rows]]
+            node_xy = self.__frame_node_positions[timestep][node_rows]
+            edge_xy = self.__frame_node_positions[timestep][edge_rows]
+            # Each line segment is x1, x2, NaN; the NaN separators are serialized as null by plotly
+            edge_x = np.full((len(edge_rows), 3), np.nan)
+            edge_x[:, :2] = edge_xy[:, :, 0]
+            edge_y = np.full((len(edge_rows), 3), np.nan)
+            edge_y[:, :2] = edge_xy[:, :, 1]
+            edge_ids = np.zeros((len(edge_rows), 3), dtype=np.int64)
+            edge_ids[:, :2] = self.__node_ids[node_columns[edge_rows]]
 
-        for timestep, graph in enumerate(self.__temp_graph):
             edge_trace = plotly.graph_objs.Scatter(
-                x=[],
-                y=[],
-                ids=[],
+                x=edge_x.ravel(),
+                y=edge_y.ravel(),
+                ids=edge_ids.ravel(),
                 mode='lines',
                 line={
                     'width': self.__edge_width,
@@ -1897,96 +4196,155 @@ class TemporalGraphFigure(object):
                 }
             )
             node_trace = plotly.graph_objs.Scatter(
-                x=[],
-                y=[],
-                ids=[],
-                text=[],
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
+                ids=node_ids,
+                text=self.__frame_node_texts[timestep][node_rows].tolist(),
                 mode='markers',
                 hoverinfo='text',
                 marker={
                     'size': self.__node_size,
-                    'color': self.__color_map
+                    'color': self.__get_node_colors(node_columns[node_rows], timestep)
                 }
             )
 
-            used_node_ids = set()
-            # Add edges to data
-            for edge in graph.get_edges():
-                node1, node2 = edge.get_incident_nodes()
-                # Only display edges of visible nodes
-                if node1 in node_ids and node2 in node_ids:
-                    x1, y1 = self.__layout[timestep][node1]
-                    x2, y2 = self.__layout[timestep][node2]
-                    edge_trace['x'].extend([x1, x2, None])
-                    edge_trace['y'].extend([y1, y2, None])
-                    edge_trace['ids'].extend([node1, node2, 0])
-                    # Only nodes with VISIBLE edges are displayed.
-                    used_node_ids.add(node1)
-                    used_node_ids.add(node2)
-
-            if isinstance(self.__color_map, dict):
-                colors = [self.__color_map[node_id] for node_id in used_node_ids]
-            else:
-                colors = self.__color_map
-            node_trace['marker']['color'] = colors
-
-            # Add nodes to data
-            for node_id in used_node_ids:
-                x, y = self.__layout[timestep][node_id]
-                node_trace['x'].append(x)
-                node_trace['y'].append(y)
-                node_trace['ids'].append(node_id)
-
-                # Add attribute info for hovering
-                info_text = f'<b style="color:#4caf50">ID:</b> {node_id}<br>'
-                # Add global attributes info
-                global_attribute_names = [n for (n, info) in self.__temp_graph.get_attributes_info().items() if
-                                          info['scope'] == 'global']
-                if len(global_attribute_names) > 0:
-                    info_text += '<b style="color:#91dfff">Global:</b><br>'
-                for attribute_name in global_attribute_names:
-                    attribute_value = self.__temp_graph.get_node(node_id).get_global_attribute(attribute_name)
-                    info_text += f"{attribute_name}: {attribute_value}<br>"
-                # Add local attributes info
-                local_attribute_names = [n for (n, info) in self.__temp_graph.get_attributes_info().items() if
-                                         info['scope'] == 'local']
-                if len(local_attribute_names) > 0:
-                    info_text += '<b style="color:#91dfff">Local:</b><br>'
-                for attribute_name in local_attribute_names:
-                    attribute_value = self.__temp_graph.get_node(node_id).get_local_attribute(attribute_name, timestep)
-                    info_text += f"{attribute_name}: {attribute_value}<br>"
-                node_trace['text'].append(info_text)
-
-            frame = {'data': [edge_trace, node_trace], 'name': str(timestep)}
-            self.__figure_data['frames'].append(frame)
-
-            slider_step = {
-                'args': [
-                    [timestep],
-                    {
-                        'frame': {'duration': 0, 'redraw': False},
-                        'mode': 'immediate',
-                        'transition': {'duration': self.__transition_time}
-                    }
-                ],
-                'label': str(datetime.timedelta(seconds=timestep * self.__temp_graph.get_granularity())),
-                'method': 'animate'
-            }
-            self.__sliders_data['steps'].append(slider_step)
-        self.__figure_data['layout']['sliders'] = [self.__sliders_data]
+            frames.append({'data': [edge_trace, node_trace], 'name': str(timestep)})
+        return frames
+
+    def __get_displayed_rows(self, timestep: int, visible: np.ndarray) -> typ.Tuple[np.ndarray, np.ndarray]:
+        """Returns edge rows and node rows of an indexed timestep, which are displayed with the visible mask."""
+        node_columns = self.__frame_nodes[timestep]
+        edge_rows = self.__frame_edge_rows[timestep]
+        if visible.ndim == 2:
+            visible = visible[timestep]
+        # Only display edges of visible nodes
+        edge_rows = edge_rows[visible[node_columns][edge_rows].all(axis=1)]
+        # Only nodes with VISIBLE edges are displayed.
+        node_rows = np.unique(edge_rows)
+        return edge_rows, node_rows
+
+    def snapshot_frame_arrays(self) -> 'FrameArraysSnapshot':
+        """Returns frames with the current layout, filter and style, which later changes do not affect."""
+        return FrameArraysSnapshot(temp_graph=self.__temp_graph,
+                                   layout=self.__layout.snapshot(),
+                                   edge_index=self.__edge_index,
+                                   node_columns=self.__node_columns,
+                                   visible=self.__visible,
+                                   node_colors=self.__color_map,
+                                   node_size=self.__node_size,
+                                   edge_color=self.__edge_color,
+                                   edge_width=self.__edge_width)
+
+    def __build_slider_step(self, timestep: int) -> typ.Dict:
+        return {
+            'args': [
+                [timestep],
+                {
+                    'frame': {'duration': 0, 'redraw': False},
+                    'mode': 'immediate',
+                    'transition': {'duration': self.__transition_time}
+                }
+            ],
+            'label': self.__get_timestep_label(timestep),
+            'method': 'animate'
+        }
+
+    def __get_timestep_label(self, timestep: int) -> str:
+        return str(datetime.timedelta(seconds=timestep * self.__temp_graph.get_granularity()))
+
+    def get_compact_figure(self, visible_only: bool = True) -> typ.Dict:
+        """
+        Returns the figure in a compact columnar encoding, which js/figure.js expands into plotly frames.
+        Node positions are stored once per layout step and shared by consecutive frames with equal positions.
+        Edges of each frame are pairs of node columns. Arrays are base64 encoded typed arrays.
+        In windowed mode, only frames of the first window are included, see get_compact_frames().
 
-        self.__set_figure_data_as_initial_frame()
+        Args:
+            visible_only: If False, nodes removed by the node filter are kept, see get_figure().
+        """
+        figure_data, sliders_data = self.__init_figure_data()
+        sliders_data['steps'] = [self.__build_slider_step(timestep) for timestep in range(len(self.__temp_graph))]
+        figure_data['layout']['sliders'] = [sliders_data]
+
+        compact_figure = {
+            'layout': figure_data['layout'],
+            'node_ids': self.__node_ids.tolist(),
+            'node_colors': self.__encode_node_colors(),
+            'node_size': self.__node_size,
+            'edge_color': self.__edge_color,
+            'edge_width': self.__edge_width
+        }
+        compact_figure.update(self.get_compact_frames(*self.get_window_range(0), visible_only))
+        if not self.__hover_texts.has_local_attributes():
+            compact_figure['node_texts'] = [self.__hover_texts.get_text(node_id, 0)
+                                            for node_id in self.__node_ids.tolist()]
+        return compact_figure
+
+    def get_compact_frames(self, start: int, stop: int, visible_only: bool = True) -> typ.Dict:
+        """
+        Returns the layout steps and frames of timesteps in [start, stop) in the encoding of get_compact_figure().
+        Layout steps are indexed per call.
+        """
+        visible = self.__visible if visible_only else np.ones(len(self.__nodes), dtype=bool)
+        column_dtype = np.uint16 if len(self.__nodes) <= np.iinfo(np.uint16).max else np.int32
+        has_local_texts = self.__hover_texts.has_local_attributes()
+        has_timestep_colors = isinstance(self.__color_map, NodeColors) and self.__color_map.is_time_dependent()
+
+        layout_steps = list()  # type: typ.List[np.ndarray]
+        frames = list()
+        for timestep in self.__iter_indexed_timesteps(start, stop):
+            positions = self.__layout.get_positions(timestep)
+            # Consecutive frames with equal positions, e.g. of static layouts, share one layout step.
+            # NaN never equals NaN, so missing positions are compared separately.
+            if len(layout_steps) == 0 or not np.array_equal(np.isnan(positions), np.isnan(layout_steps[-1])) or \
+                    not np.array_equal(np.nan_to_num(positions), np.nan_to_num(layout_steps[-1])):
+                layout_steps.append(positions)
+            node_columns = self.__frame_nodes[timestep]
+            edge_rows, node_rows = self.__get_displayed_rows(timestep, visible)
+            frame = {
+                'name': str(timestep),
+                'layout_step': len(layout_steps) - 1,
+                'edges': encode_typed_array(node_columns[edge_rows].astype(column_dtype))
+            }
+            if has_local_texts:
+                # Texts of displayed nodes, which are in ascending column order
+                frame['texts'] = self.__frame_node_texts[timestep][node_rows].tolist()
+            if has_timestep_colors:
+                # Colors of displayed nodes, like texts
+                frame['colors'] = self.__get_node_colors(node_columns[node_rows], timestep)
+            frames.append(frame)
+        return {
+            'layout_steps': [encode_typed_array(positions) for positions in layout_steps],
+            'frames': frames
+        }
 
     def __recolor_displayed_nodes(self):
-        node_ids = [node.get_id() for node in self.__node_filter(self.__nodes)]
         for i in range(len(self.__figure_data['frames'])):
-            used_node_ids = set(node for edge in self.__temp_graph[i].get_edges() for node in edge.get_incident_nodes())
-            used_node_ids = list(filter(lambda n: n in used_node_ids, node_ids))
-            if isinstance(self.__color_map, dict):
-                colors = [self.__color_map[node_id] for node_id in used_node_ids]
-            else:
-                colors = self.__color_map
-            self.__figure_data['frames'][i]['data'][1]['marker']['color'] = colors
+            node_trace = self.__figure_data['frames'][i]['data'][1]
+            # Node IDs are sorted like node columns
+            node_columns = np.searchsorted(self.__node_ids, np.asarray(node_trace['ids'], dtype=np.int64))
+            timestep = int(self.__figure_data['frames'][i]['name'])
+            node_trace['marker']['color'] = self.__get_node_colors(node_columns, timestep)
+
+    def __get_node_colors(self, node_columns: np.ndarray = None, timestep: int = None) \
+            -> typ.Union[str, typ.List[str]]:
+        """
+        Returns the marker colors of the nodes in node_columns, in the same order, or of all nodes.
+        The timestep is required if colors are time dependent.
+        """
+        if isinstance(self.__color_map, NodeColors):
+            return self.__color_map.get_colors(node_columns, timestep)
+        else:
+            return self.__color_map
+
+    def __encode_node_colors(self) -> typ.Union[str, typ.Dict[str, typ.Any]]:
+        """Returns node colors for get_compact_figure(). Time dependent colors are part of the frames instead."""
+        if isinstance(self.__color_map, str):
+            return self.__color_map
+        elif self.__color_map.is_time_dependent():
+            # Default color, which frames override
+            return self.__color_map.get_palette()[0]
+        return self.__color_map.encode()
 
     def __recolor_displayed_edges(self):
         for i in range(len(self.__figure_data['frames'])):
@@ -2005,11 +4363,255 @@ class TemporalGraphFigure(object):
         self.__figure_data['data'] = self.__figure_data['frames'][0]['data'].copy()
 
 
+def index_graph_edges(graph, node_columns: typ.Dict[int, int]) -> typ.Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns sorted columns of all nodes with edges in graph and the edges as (m, 2) array of rows into these columns.
+    """
+    columns = [node_columns[node_id] for edge in graph.get_edges() for node_id in edge.get_incident_nodes()]
+    return index_edge_columns(np.array(columns, dtype=np.int32))
+
+
+def index_edge_columns(edge_columns: np.ndarray) -> typ.Tuple[np.ndarray, np.ndarray]:
+    """Returns sorted columns of all nodes of edges, given as node columns, and the edges as (m, 2) array of rows."""
+    frame_nodes, edge_rows = np.unique(edge_columns, return_inverse=True)
+    return frame_nodes, edge_rows.reshape(-1, 2)
+
+
+class FrameArraysSnapshot(object):
+    def __init__(self,
+                 temp_graph: vtna.graph.TemporalGraph,
+                 layout: LayoutArray,
+                 edge_index: typ.Optional[EdgeIndex],
+                 node_columns: typ.Dict[int, int],
+                 visible: np.ndarray,
+                 node_colors: typ.Union[str, NodeColors],
+                 node_size: float,
+                 edge_color: str,
+                 edge_width: float):
+        """
+        Frames of a TemporalGraphFigure as plain arrays, which FrameRasterizer renders without plotly.
+        Edges are indexed while iterating, independent of the figure, so the figure can be changed meanwhile.
+        Without an edge index, the temporal graph must not change, e.g. by toggling cumulative graphs.
+
+        Args:
+            edge_index: If set, edges are read from this index instead of the graph.
+            node_columns: Dict of node IDs to their columns.
+            visible: Boolean mask over node columns, True for nodes passing the node filter,
+                or (timesteps, nodes) mask of the nodes in each timestep.
+            node_colors: Either one color for all nodes or colors of the node columns.
+        """
+        self.__temp_graph = temp_graph
+        self.__layout = layout
+        self.__edge_index = edge_index
+        self.__node_columns = node_columns
+        self.__visible = visible
+        self.__node_colors = node_colors
+        self.__node_size = node_size
+        self.__edge_color = edge_color
+        self.__edge_width = edge_width
+
+    def iter_frames(self, start: int, stop: int) -> typ.Iterator[typ.Dict[str, typ.Any]]:
+        """
+        Yields frames of timesteps in [start, stop). Each frame contains its slider label,
+        edges as (m, 2, 2) array of line segments, node positions as (k, 2) array and the style.
+        """
+        for timestep, node_columns, edge_rows, node_rows in self.__iter_displayed_rows(start, stop):
+            positions = self.__layout.get_positions(timestep)[node_columns]
+            node_colors = self.__node_colors
+            if isinstance(node_colors, NodeColors):
+                node_colors = node_colors.get_colors(node_columns[node_rows], timestep)
+            yield {
+                'label': str(datetime.timedelta(seconds=timestep * self.__temp_graph.get_granularity())),
+                'edges': positions[edge_rows],
+                'nodes': positions[node_rows],
+                'node_colors': node_colors,
+                'node_size': self.__node_size,
+                'edge_color': self.__edge_color,
+                'edge_width': self.__edge_width
+            }
+
+    def count_displayed_edges(self, start: int, stop: int) -> np.ndarray:
+        """Returns number of displayed edges in each timestep of [start, stop)."""
+        return np.array([len(edge_rows) for _, _, edge_rows, _ in self.__iter_displayed_rows(start, stop)],
+                        dtype=np.int64)
+
+    def __iter_displayed_rows(self, start: int, stop: int) \
+            -> typ.Iterator[typ.Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        for timestep in range(start, stop):
+            if not self.__layout.is_computed(timestep):
+                # Layout of timestep is not computed yet, so nothing is displayed
+                no_edges = np.zeros((0, 2), dtype=np.int64)
+                yield timestep, np.zeros(0, dtype=np.int32), no_edges, np.zeros(0, dtype=np.int64)
+                continue
+            if self.__edge_index is not None:
+                node_columns, edge_rows = index_edge_columns(self.__edge_index.get_edges(timestep))
+            else:
+                # Timesteps are accessed directly, so exports of late ranges do not iterate the graph from its start
+                node_columns, edge_rows = index_graph_edges(self.__temp_graph[timestep], self.__node_columns)
+            visible = self.__visible if self.__visible.ndim == 1 else self.__visible[timestep]
+            # Only edges of visible nodes and nodes with visible edges are displayed
+            edge_rows = edge_rows[visible[node_columns][edge_rows].all(axis=1)]
+            yield timestep, node_columns, edge_rows, np.unique(edge_rows)
+
+
+class NodeHoverTextCache(object):
+    def __init__(self, temp_graph: vtna.graph.TemporalGraph):
+        """
+        Caches the HTML hover texts of the nodes of a temporal graph.
+        Texts with global attributes only are built once per node, texts with local attributes
+        once per node and timestep. Cached texts are dropped when attributes or measures of the
+        graph change, see validate().
+
+        Args:
+            temp_graph: Graph, which nodes are described by the texts.
+        """
+        self.__temp_graph = temp_graph
+        self.__global_attribute_names = list()  # type: typ.List[str]
+        self.__local_attribute_names = list()  # type: typ.List[str]
+        self.__global_texts = dict()  # type: typ.Dict[int, str]
+        self.__local_texts = dict()  # type: typ.Dict[typ.Tuple[int, int], str]
+        self.validate()
+
+    def validate(self):
+        """Drops all cached texts, if the attributes of the graph changed since the last call."""
+        attributes_info = self.__temp_graph.get_attributes_info()
+        global_attribute_names = [n for (n, info) in attributes_info.items() if info['scope'] == 'global']
+        local_attribute_names = [n for (n, info) in attributes_info.items() if info['scope'] == 'local']
+        if global_attribute_names != self.__global_attribute_names or \
+                local_attribute_names != self.__local_attribute_names:
+            self.__global_attribute_names = global_attribute_names
+            self.__local_attribute_names = local_attribute_names
+            self.invalidate()
+
+    def has_local_attributes(self) -> bool:
+        """Returns whether texts depend on the timestep."""
+        return len(self.__local_attribute_names) > 0
+
+    def invalidate(self):
+        """Drops all cached texts, e.g. after attribute values have been changed."""
+        self.__global_texts = dict()
+        self.__local_texts = dict()
+
+    def get_text(self, node_id: int, timestep: int) -> str:
+        """Returns hover text of node at timestep."""
+        if len(self.__local_attribute_names) == 0:
+            if node_id not in self.__global_texts:
+                self.__global_texts[node_id] = self.__build_global_text(node_id)
+            return self.__global_texts[node_id]
+        if (node_id, timestep) not in self.__local_texts:
+            if node_id not in self.__global_texts:
+                self.__global_texts[node_id] = self.__build_global_text(node_id)
+            self.__local_texts[(node_id, timestep)] = \
+                self.__global_texts[node_id] + self.__build_local_text(node_id, timestep)
+        return self.__local_texts[(node_id, timestep)]
+
+    def __build_global_text(self, node_id: int) -> str:
+        info_text = f'<b style="color:#4caf50">ID:</b> {node_id}<br>'
+        # Add global attributes info
+        if len(self.__global_attribute_names) > 0:
+            info_text += '<b style="color:#91dfff">Global:</b><br>'
+        for attribute_name in self.__global_attribute_names:
+            attribute_value = self.__temp_graph.get_node(node_id).get_global_attribute(attribute_name)
+            info_text += f"{attribute_name}: {attribute_value}<br>"
+        return info_text
+
+    def __build_local_text(self, node_id: int, timestep: int) -> str:
+        info_text = '<b style="color:#91dfff">Local:</b><br>'
+        for attribute_name in self.__local_attribute_names:
+            attribute_value = self.__temp_graph.get_node(node_id).get_local_attribute(attribute_name, timestep)
+            info_text += f"{attribute_name}: {attribute_value}<br>"
+        return info_text
+
+
+def encode_typed_array(array: np.ndarray) -> typ.Dict[str, str]:
+    """Encodes array as little endian bytes in base64, which js/figure.js decodes into a typed array."""
+    return {
+        'dtype': array.dtype.name,
+        'data': base64.b64encode(array.astype(array.dtype.newbyteorder('<')).tobytes()).decode('ascii')
+    }
+
+
+class FigureChannel(object):
+    TARGET_NAME = 'vtna_figure'
+
+    def __init__(self):
+        """
+        Sends filter and style state of a TemporalGraphFigure to its displayed plot div, where
+        js/figure.js applies it to all frames, instead of rendering and uploading the whole figure again.
+        Only state entries that changed since the last update are sent.
+        Requests of the plot div, e.g. for frames, are answered by the handler set with on_request().
+        The comm is opened on the first message, so the notebook has registered the target by then.
+        """
+        self.__comm = None  # type: ipykernel.comm.Comm
+        self.__div_id = None  # type: str
+        # State applied in the attached plot div, None if it does not receive updates
+        self.__state = None  # type: typ.Optional[typ.Dict[str, typ.Any]]
+        self.__request_handler = None  # type: typ.Callable[[typ.Dict[str, typ.Any]], typ.Optional[typ.Dict]]
+
+    def attach(self, div_id: str, state: typ.Dict[str, typ.Any] = None) -> str:
+        """
+        Makes the newly rendered plot div the receiver of updates and sender of requests.
+        Returns HTML script that applies the initial state, must be displayed after the plot div.
+        Without state, the script is empty and no updates are sent.
+        """
+        self.__div_id = div_id
+        if state is None:
+            self.__state = None
+            return ''
+        self.__state = dict(state)
+        return f'<script>vtnaFigures.update({json.dumps(div_id)}, {json.dumps(state)});</script>'
+
+    def on_request(self, handler: typ.Callable[[typ.Dict[str, typ.Any]], typ.Optional[typ.Dict]]):
+        """
+        Sets handler of requests sent by js/figure.js. The handler gets the request and returns the response,
+        which is sent back to the plot div, or None.
+        """
+        self.__request_handler = handler
+
+    def is_attached(self) -> bool:
+        return self.__state is not None
+
+    def update(self, state: typ.Dict[str, typ.Any]):
+        """Sends changed entries of state to the attached plot div."""
+        changes = dict((key, value) for key, value in state.items() if self.__state.get(key) != value)
+        if len(changes) == 0:
+            return
+        self.__state.update(changes)
+        self.send({'action': 'update', 'state': changes})
+
+    def send(self, msg: typ.Dict[str, typ.Any]):
+        """Sends message to the attached plot div."""
+        self.open()
+        self.__comm.send(dict(msg, div_id=self.__div_id))
+
+    def open(self):
+        """Opens the comm, if not done yet. Must be called before the plot div sends requests."""
+        if self.__comm is None:
+            self.__comm = ipykernel.comm.Comm(target_name=FigureChannel.TARGET_NAME)
+            self.__comm.on_msg(self.__handle_msg)
+
+    def __handle_msg(self, msg: typ.Dict[str, typ.Any]):
+        request = msg['content']['data']
+        # Requests of replaced plot divs are outdated
+        if self.__request_handler is None or request.get('div_id') != self.__div_id:
+            return
+        response = self.__request_handler(request)
+        if response is not None:
+            self.send(response)
+
+
 class VideoExport(object):
     ffmpeg_formats = ['mp4', 'mov', 'avi']
 
+    class State(enum.Enum):
+        RUNNING = 'running'
+        CANCELLED = 'cancelled'
+        FAILED = 'failed'
+        FINISHED = 'finished'
+        CLOSED = 'closed'
+
     def __init__(self,
-                 figure: typ.Dict,
+                 figure: TemporalGraphFigure,
                  video_format: str,
                  video_resolution: int,
                  frame_length: int,
@@ -2017,17 +4619,41 @@ class VideoExport(object):
                  speedup_empty_frames: bool,
                  initialize_progressbar: typ.Callable,
                  increment_progress: typ.Callable,
-                 progress_finished: typ.Callable):
-        # We need the amount of frames and the counter for syncing the asynchron js writing
-        # with the closing of the writer and the progress bar
-        self.__frames = figure['frames']
-        self.__frame_count = time_range[1] - time_range[0]
+                 progress_finished: typ.Callable,
+                 progress_stopped: typ.Callable[['VideoExport'], None],
+                 workers: int = None):
+        """
+        Export job, which writes frames of a figure as GIF or video in a background thread. Frames are rendered
+        by FrameRasterizer and streamed into the writer one by one, so neither a browser nor all frames in memory
+        are needed. Start with start(). A cancelled or failed export can be resumed from the last written frame,
+        or from the first one after errors of the writer. Callbacks are called from the background thread.
+
+        Args:
+            figure: Figure, which frames are exported with its filter and style at construction.
+            time_range: First and last timestep of the exported frames.
+            progress_stopped: Called with the job after it has been cancelled or has failed.
+            workers: Number of processes rendering frames in parallel, see get_default_worker_count() for the
+                default. With 1, frames are rendered in the background thread.
+        """
+        self.__frames = figure.snapshot_frame_arrays()
+        self.__video_resolution = video_resolution
+        self.__workers = workers if workers is not None else get_default_worker_count()
+        self.__time_range = time_range
+        self.__frame_count = time_range[1] - time_range[0] + 1
+        self.__written_frames = 0
+        # Set after errors of the writer, e.g. of a terminated ffmpeg process, which is opened again on resume
+        self.__writer_failed = False
+        self.__state = None  # type: VideoExport.State
+        self.__error = None  # type: Exception
+        self.__cancel_event = threading.Event()
+        self.__thread = None  # type: threading.Thread
         # Milliseconds are converted to seconds
         frame_length /= 1000
-        # There are two steps for every frame: Extracting via js and writing to gif
-        initialize_progressbar(self.__frame_count * 2)
+        initialize_progressbar(self.__frame_count)
+        self.__initialize_progressbar = initialize_progressbar  # type: typ.Callable
         self.__increment_progress = increment_progress  # type: typ.Callable
         self.__progress_finished = progress_finished  # type: typ.Callable
+        self.__progress_stopped = progress_stopped  # type: typ.Callable[['VideoExport'], None]
         self.__export_filename = time.strftime('%Y%m%d-%H%M', time.localtime()) + '_export'
         self.__video_format = video_format
         if video_format == 'gif':
@@ -2037,115 +4663,216 @@ class VideoExport(object):
             if speedup_empty_frames:
                 # GIF cant have more than 100 FPS
                 speedup_length = frame_length / 10 if frame_length / 10 >= 0.01 else 0.01
-                duration = [frame_length if len(frame['data'][1]['x']) > 0 else speedup_length
-                            for frame in self.__frames[time_range[0]:time_range[1] + 1]]
-            # Create the writer object for creating the gif.
+                edge_counts = self.__frames.count_displayed_edges(time_range[0], time_range[1] + 1)
+                duration = [frame_length if edge_count > 0 else speedup_length for edge_count in edge_counts.tolist()]
             # Mode I tells the writer to prepare for multiple images.
-            self.__writer = imageio.get_writer(self.__export_filename + '.gif', mode='I', duration=duration)
+            self.__writer_options = dict(mode='I', duration=duration)
         elif video_format in VideoExport.ffmpeg_formats:
-            self.__writer = imageio.get_writer(self.__export_filename + '.' + video_format, format='ffmpeg', mode='I',
-                                               fps=1/frame_length)
+            self.__writer_options = dict(format='ffmpeg', mode='I', fps=1/frame_length)
         else:
             raise ValueError('Unknown format: ' + video_format)
-
-        self.__init_figure(figure['layout']['sliders'][0]['steps'], video_resolution)
-
-        self.__build_index = 0
-        self.__written_frames = 0
-        self.__output = widgets.Output(layout=widgets.Layout(display='none'))
-        ipydisplay.display(self.__output)
-        # Start building the frames
-        self.__build_frame()
+        self.__writer = imageio.get_writer(self.get_output_path(), **self.__writer_options)
 
     def get_output_path(self):
         return self.__export_filename + '.' + self.__video_format
 
-    def __init_figure(self, steps, size: int):
-        self.__figure = {'layout': {}}
-        # First we build the layout of the plot that will be exported
-        # TODO: Layout should be at least partially dependent/copied from original plotly layout
-        self.__figure['layout']['width'] = size
-        self.__figure['layout']['height'] = size
-        self.__figure['layout']['showlegend'] = False
-        # Make plot more compact
-        self.__figure['layout']['margin'] = plotly.graph_objs.Margin(
-            t=30,
-            r=30,
-            b=30,
-            l=30,
-            pad=0
-        )
-        self.__figure['layout']['yaxis'] = {
-            'range': [-1.1, 1.1],
-            'ticks': '',
-            'showticklabels': False
-        }
-        self.__figure['layout']['xaxis'] = {
-            'range': [-1.1, 1.1],
-            'ticks': '',
-            'showticklabels': False
-        }
-        self.__figure['layout']['sliders'] = [{
-            'currentvalue': {
-                'font': {'size': 20},
-                'prefix': 'Timestep: +',
-                'suffix': ' hours',
-                'visible': True,
-                'xanchor': 'right'
-            },
-            'pad': {'b': 10, 't': 20},
-            'steps': steps
-        }]
-
-    def __build_frame(self):
-        # Add current plot data (of this frame)
-        self.__figure['data'] = self.__frames[self.__build_index]['data']
-        # Position dummy slider on current timestep
-        self.__figure['layout']['sliders'][0]['active'] = self.__build_index
-        with self.__output:
-            # noinspection PyTypeChecker
-            ipydisplay.display(ipydisplay.HTML(
-                # plot() returns the html div with the plot itself.
-                # Not including plotlyjs improves performance, and its already
-                # loaded in the notebook anyways.
-                plotly.offline.plot(self.__figure, output_type='div', include_plotlyjs=False)
-                # Execute the javascript that extracts the image.
-                # See export.js for function implementations.
-                + f'''
-                <script>
-                    extractPlotlyImage(); 
-                </script>'''
-            ))
-            # Remove plot again to save memory
-            ipydisplay.clear_output()
-        self.__build_index += 1
-        self.__increment_progress()
+    def get_state(self) -> typ.Optional['VideoExport.State']:
+        """Returns state of the job, None if not started yet."""
+        return self.__state
 
-    # This has to be public, so the GraphDisplayManager/the Notebook/above JS code
-    # can access this non-static method.
-    def write_frame(self, img_base64):
+    def get_error(self) -> typ.Optional[Exception]:
+        """Returns error of a failed job."""
+        return self.__error
+
+    def get_progress(self) -> typ.Tuple[int, int]:
+        """Returns number of written frames and number of all frames."""
+        return self.__written_frames, self.__frame_count
+
+    def start(self):
+        """
+        Starts writing frames in the background, beginning after the last written frame.
+        If the writer failed, it is opened again and all frames are written anew, since its output may be broken.
+        """
+        if self.__state in [VideoExport.State.RUNNING, VideoExport.State.FINISHED, VideoExport.State.CLOSED]:
+            raise ValueError(f'Export is {self.__state.value}')
+        if self.__writer_failed:
+            self.__writer = imageio.get_writer(self.get_output_path(), **self.__writer_options)
+            self.__writer_failed = False
+            self.__written_frames = 0
+            self.__initialize_progressbar(self.__frame_count)
+        self.__state = VideoExport.State.RUNNING
+        self.__error = None
+        self.__cancel_event.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def resume(self):
+        """Resumes a cancelled or failed job."""
+        self.start()
+
+    def cancel(self):
+        """Stops the running job after the frame being written. Written frames are kept for resume()."""
+        self.__cancel_event.set()
+
+    def close(self):
+        """
+        Closes the writer of an unfinished job, the output file contains the frames written so far.
+        Closed jobs cannot be resumed.
+        """
+        if self.__state == VideoExport.State.RUNNING:
+            raise ValueError('Export is running')
+        if self.__state not in [VideoExport.State.FINISHED, VideoExport.State.CLOSED]:
+            if not self.__writer_failed:
+                self.__writer.close()
+            self.__state = VideoExport.State.CLOSED
+
+    def __run(self):
         try:
-            # Decode base64 string to binary
-            img_binary = base64.decodebytes(img_base64)
-            # Append binary png image to gif writer
-            self.__writer.append_data(imageio.imread(img_binary))
-            self.__written_frames += 1
-            self.__increment_progress()
-            if self.__written_frames == self.__frame_count:
-                self.__finish()
-            else:
-                # The next frame is built after this method/the js code is done
-                # This prevents memory leaks caused by asynchronous execution
-                self.__build_frame()
+            self.__write_frames()
         except Exception as e:
+            self.__error = e
+            if self.__writer_failed:
+                self.__close_failed_writer()
+            self.__state = VideoExport.State.FAILED
+            self.__progress_stopped(self)
+            return
+        if self.__cancel_event.is_set():
+            self.__state = VideoExport.State.CANCELLED
+            self.__progress_stopped(self)
+        else:
+            # Flushes and closes the writer
             self.__writer.close()
-            # TODO: Show as user-friendly error message
-            print(e)
+            self.__state = VideoExport.State.FINISHED
+            self.__progress_finished()
 
-    def __finish(self):
-        # Flushes and closes the writer
-        self.__writer.close()
-        self.__progress_finished()
+    def __close_failed_writer(self):
+        try:
+            self.__writer.close()
+        except Exception:
+            # The writer is opened again on resume, so errors of the broken one are ignored
+            pass
+
+    def __write_frames(self):
+        """Renders and writes frames after the last written one, until all are written or the job is cancelled."""
+        frames = self.__frames.iter_frames(self.__time_range[0] + self.__written_frames, self.__time_range[1] + 1)
+        if self.__workers > 1:
+            images = self.__render_parallel(frames)
+        else:
+            images = map(FrameRasterizer(self.__video_resolution).render, frames)
+        try:
+            for image in images:
+                if self.__cancel_event.is_set():
+                    break
+                try:
+                    self.__writer.append_data(image)
+                except Exception:
+                    self.__writer_failed = True
+                    raise
+                self.__written_frames += 1
+                self.__increment_progress()
+        finally:
+            if self.__workers > 1:
+                # Cancels frames, which are not rendered yet
+                images.close()
+
+    def __render_parallel(self, frames: typ.Iterator[typ.Dict[str, typ.Any]]) -> typ.Iterator[np.ndarray]:
+        """Yields images of frames in order, which are rendered by a pool of worker processes."""
+        # Leaving the pool terminates its workers, so frames are not rendered after cancel() or errors
+        with create_worker_pool(self.__workers) as pool:
+            pending = collections.deque()  # type: typ.Deque[multiprocessing.pool.AsyncResult]
+            for frame in frames:
+                pending.append(pool.apply_async(render_export_frame, (self.__video_resolution, frame)))
+                # Only a few frames per worker are queued, so images do not pile up in memory
+                # when writing is slower than rendering.
+                if len(pending) >= 2 * self.__workers:
+                    yield pending.popleft().get()
+            while len(pending) > 0:
+                yield pending.popleft().get()
+
+
+class FrameRasterizer(object):
+    DPI = 100
+
+    def __init__(self, size: int):
+        """
+        Renders frames of FrameArraysSnapshot.iter_frames() into RGB images with matplotlib's Agg backend.
+        Figure and artists are created once and only their data is replaced per frame.
+
+        Args:
+            size: Width and height of the images in pixels.
+        """
+        self.__size = size
+        self.__figure = matplotlib.figure.Figure(figsize=(size / FrameRasterizer.DPI, size / FrameRasterizer.DPI),
+                                                 dpi=FrameRasterizer.DPI)
+        self.__canvas = matplotlib.backends.backend_agg.FigureCanvasAgg(self.__figure)
+        # Margins of 30 pixels, like the plotly figure of the display, and the time label below the graph
+        margin = 30 / size
+        axes = self.__figure.add_axes([margin, 2 * margin, 1 - 2 * margin, 1 - 3 * margin])
+        axes.set_xlim(-1.1, 1.1)
+        axes.set_ylim(-1.1, 1.1)
+        axes.axis('off')
+        self.__edges = matplotlib.collections.LineCollection([], zorder=1)
+        axes.add_collection(self.__edges)
+        self.__nodes = axes.scatter([], [], edgecolors='none', zorder=2)
+        self.__label = self.__figure.text(1 - margin, margin, '', fontsize=self.__to_points(20),
+                                          horizontalalignment='right', verticalalignment='center')
+
+    def get_size(self) -> int:
+        return self.__size
+
+    def render(self, frame: typ.Dict[str, typ.Any]) -> np.ndarray:
+        """Returns image of frame as (size, size, 3) uint8 array."""
+        self.__edges.set_segments(frame['edges'])
+        self.__edges.set_color(frame['edge_color'])
+        self.__edges.set_linewidth(self.__to_points(frame['edge_width']))
+        self.__nodes.set_offsets(frame['nodes'])
+        self.__nodes.set_facecolors(frame['node_colors'])
+        # Scatter sizes are marker areas, plotly sizes are marker diameters
+        self.__nodes.set_sizes([self.__to_points(frame['node_size']) ** 2])
+        self.__label.set_text(f'Timestep: +{frame["label"]} hours')
+        self.__canvas.draw()
+        width, height = self.__canvas.get_width_height()
+        image = np.frombuffer(self.__canvas.buffer_rgba(), dtype=np.uint8).reshape(height, width, 4)
+        # Copy, the buffer is reused by the next frame
+        return image[:, :, :3].copy()
+
+    @staticmethod
+    def __to_points(pixels: float) -> float:
+        return pixels * 72 / FrameRasterizer.DPI
+
+
+# Rasterizer of an export worker process, which is reused for all frames the process renders
+_worker_rasterizer = None  # type: FrameRasterizer
+
+
+def render_export_frame(size: int, frame: typ.Dict[str, typ.Any]) -> np.ndarray:
+    """Renders frame in an export worker process, see VideoExport."""
+    global _worker_rasterizer
+    if _worker_rasterizer is None or _worker_rasterizer.get_size() != size:
+        _worker_rasterizer = FrameRasterizer(size)
+    return _worker_rasterizer.render(frame)
+
+
+def get_default_worker_count() -> int:
+    """Returns default number of worker processes, the number of CPUs."""
+    return os.cpu_count() or 1
+
+
+def create_worker_pool(processes: int, initializer: typ.Callable = None,
+                       initargs: typ.Tuple = ()) -> multiprocessing.pool.Pool:
+    """
+    Returns pool of worker processes, which are started by a fork server, or spawned where there is none.
+    Workers are never forked from the kernel, because it runs threads, e.g. of layout computations and exports,
+    whose locks a forked process would inherit in any state. Functions and arguments passed to workers
+    are pickled, functions must be defined on module level.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # The fork server imports this module once, instead of every worker importing it
+        context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context('spawn')
+    return context.Pool(processes, initializer, initargs)
 
 
 class LoadingIndicator(object):
@@ -2169,6 +4896,8 @@ class LoadingIndicator(object):
             raise ValueError(f"'{size}' is not a valid size. Must be one of {LoadingIndicator.loading_images.keys()}")
         self.__size = size
         self.__output = widgets.Output()
+        # Progress of the loading task, see set_message()
+        self.__message = widgets.Label()
         # Copy size parameters and center the content/loading indicator itself
         layout = widgets.Layout(
             width=outer_layout.width,
@@ -2176,7 +4905,7 @@ class LoadingIndicator(object):
             align_items='center',
             justify_content='center'
         )
-        self.__box = widgets.VBox(children=[self.__output], layout=layout)
+        self.__box = widgets.VBox(children=[self.__output, self.__message], layout=layout)
         self.stop()
 
     def get_box(self):
@@ -2189,10 +4918,15 @@ class LoadingIndicator(object):
             ipydisplay.display(ipydisplay.SVG(filename=LoadingIndicator.loading_images[self.__size]))
         self.__box.layout.display = 'flex'
 
+    def set_message(self, message: str):
+        """Shows message below the loading indicator, e.g. the progress, until stop() is called."""
+        self.__message.value = message
+
     def stop(self):
         """Hides the loading indicator."""
         with self.__output:
             ipydisplay.clear_output()
+        self.__message.value = ''
         self.__box.layout.display = 'none'
 
 
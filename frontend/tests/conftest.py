@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import vtna.data_import  # noqa: E402
+import vtna.graph  # noqa: E402
+
+
+class NonIterableGraph(object):
+    """Temporal graph, which fails when iterated, so only access by timestep is allowed."""
+    def __init__(self, temp_graph: vtna.graph.TemporalGraph):
+        self.__temp_graph = temp_graph
+
+    def __iter__(self):
+        raise AssertionError('temporal graph iterated')
+
+    def __len__(self):
+        return len(self.__temp_graph)
+
+    def __getitem__(self, timestep: int):
+        return self.__temp_graph[timestep]
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.__temp_graph, name)
+
+
+@pytest.fixture
+def temp_graph() -> vtna.graph.TemporalGraph:
+    random = np.random.RandomState(1)
+    edges = [vtna.data_import.TemporalEdge(int(timestamp), int(node), int(node + 1 + offset))
+             for timestamp, node, offset in zip(random.randint(0, 400, 600), random.randint(0, 40, 600),
+                                                random.randint(0, 5, 600))]
+    return vtna.graph.TemporalGraph(edges, None, 20)
+
+
+@pytest.fixture
+def non_iterable_graph(temp_graph: vtna.graph.TemporalGraph) -> NonIterableGraph:
+    return NonIterableGraph(temp_graph)
+
+
+@pytest.fixture
+def layout(temp_graph: vtna.graph.TemporalGraph) -> main.LayoutArray:
+    layout = main.LayoutArray.empty(temp_graph)
+    random = np.random.RandomState(2)
+    layout.set_steps(0, random.uniform(-1, 1, (len(layout), len(layout.get_node_ids()), 2)).astype(np.float32))
+    return layout
@@ -0,0 +1,168 @@
+import http.server
+import os
+import re
+import socketserver
+import threading
+import urllib.error
+
+import pytest
+
+import main
+
+
+class FileServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """Serves one file with an ETag and range requests, and fails requests on demand."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FileRequestHandler)
+        self.content = b''
+        self.etag = None
+        # Headers of all requests
+        self.requests = list()
+        # Status codes of the next responses, which fail
+        self.errors = list()
+        # Number of the next responses, which are dropped after drop_after bytes of the body
+        self.drops = 0
+        self.drop_after = 0
+
+    def set_content(self, content: bytes, etag: str):
+        self.content = content
+        self.etag = f'"{etag}"'
+
+    def get_url(self, name: str = 'edges.txt') -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/{name}'
+
+
+class FileRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server  # type: FileServer
+        server.requests.append(dict(self.headers))
+        if len(server.errors) > 0:
+            self.send_error(server.errors.pop(0))
+            return
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        content = server.content
+        start = 0
+        range_match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if range_match is not None and self.headers.get('If-Range') in [None, server.etag]:
+            start = int(range_match.group(1))
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(content)}')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(content) - 1}/{len(content)}')
+        else:
+            self.send_response(200)
+        body = content[start:]
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if server.drops > 0:
+            # The connection is closed after a part of the body
+            server.drops -= 1
+            body = body[:server.drop_after]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server() -> FileServer:
+    server = FileServer()
+    server.set_content(os.urandom(300000), 'v1')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(main.DownloadManager, 'RETRY_DELAY', 0.01)
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_downloaded_file_is_revalidated(server, tmp_path):
+    progress = list()
+    path = main.DownloadManager(str(tmp_path)).download(server.get_url(), lambda *args: progress.append(args))
+    assert read(path) == server.content
+    assert progress[-1] == (len(server.content), len(server.content))
+    # A later session finds the file in the index and only revalidates it
+    assert main.DownloadManager(str(tmp_path)).download(server.get_url()) == path
+    assert server.requests[-1]['If-None-Match'] == server.etag
+    assert read(path) == server.content
+    # Changed files are downloaded again
+    server.set_content(os.urandom(1000), 'v2')
+    assert read(main.DownloadManager(str(tmp_path)).download(server.get_url())) == server.content
+
+
+def test_dropped_download_is_resumed(server, tmp_path):
+    server.drops, server.drop_after = 1, 100000
+    path = main.DownloadManager(str(tmp_path)).download(server.get_url())
+    assert read(path) == server.content
+    assert len(server.requests) == 2
+    assert server.requests[1]['Range'] == 'bytes=100000-'
+    assert server.requests[1]['If-Range'] == server.etag
+    assert not os.path.exists(f'{path}.part')
+
+
+def test_partial_file_of_changed_file_is_replaced(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(main.DownloadManager, 'ATTEMPTS', 1)
+    server.drops, server.drop_after = 1, 100000
+    with pytest.raises(OSError):
+        main.DownloadManager(str(tmp_path)).download(server.get_url())
+    # If-Range does not match anymore, so the server sends the whole file, which replaces the partial one
+    server.set_content(os.urandom(200000), 'v2')
+    path = main.DownloadManager(str(tmp_path)).download(server.get_url())
+    assert server.requests[-1]['Range'] == 'bytes=100000-'
+    assert read(path) == server.content
+
+
+def test_partial_file_beyond_file_end_is_downloaded_again(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(main.DownloadManager, 'ATTEMPTS', 1)
+    server.drops, server.drop_after = 1, 100000
+    with pytest.raises(OSError):
+        main.DownloadManager(str(tmp_path)).download(server.get_url())
+    part_name = next(name for name in os.listdir(str(tmp_path)) if name.endswith('.part'))
+    with open(os.path.join(str(tmp_path), part_name), 'ab') as f:
+        f.write(b'0' * 300000)
+    path = main.DownloadManager(str(tmp_path)).download(server.get_url())
+    assert read(path) == server.content
+    assert 'Range' not in server.requests[-1]
+
+
+def test_server_errors_are_retried(server, tmp_path):
+    server.errors = [503, 502]
+    path = main.DownloadManager(str(tmp_path)).download(server.get_url())
+    assert read(path) == server.content
+    assert len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried(server, tmp_path):
+    server.errors = [404]
+    with pytest.raises(urllib.error.HTTPError):
+        main.DownloadManager(str(tmp_path)).download(server.get_url())
+    assert len(server.requests) == 1
+
+
+def test_least_recently_used_downloads_are_removed(server, tmp_path):
+    download_manager = main.DownloadManager(str(tmp_path), max_disk_bytes=int(3.5 * len(server.content)))
+    paths = [download_manager.download(server.get_url(f'{name}.txt')) for name in 'abc']
+    for mtime, path in enumerate(paths, 1000):
+        os.utime(path, (mtime, mtime))
+    # Revalidating the first file marks it as recently used
+    download_manager.download(server.get_url('a.txt'))
+    download_manager.download(server.get_url('d.txt'))
+    assert [os.path.exists(path) for path in paths] == [True, False, True]
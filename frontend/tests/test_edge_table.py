@@ -0,0 +1,56 @@
+import warnings
+
+import numpy as np
+import pytest
+import vtna.data_import
+
+import main
+
+
+@pytest.mark.parametrize('chunk, expected', [
+    (b'', []),
+    (b'10 1 2\n20 2 3\n', [[10, 1, 2], [20, 2, 3]]),
+    # Tabs, carriage returns, empty lines and a missing final newline
+    (b'10\t1\t2\r\n\n  20 2 3', [[10, 1, 2], [20, 2, 3]]),
+    # Further columns are ignored, even if lines have differing numbers of columns
+    (b'10 1 2 5 6\n20 2 3 7 8\n', [[10, 1, 2], [20, 2, 3]]),
+    (b'10 1 2\n20 2 3 7\n', [[10, 1, 2], [20, 2, 3]]),
+    (b'-5 1 2\n9223372036854775807 2 3\n', [[-5, 1, 2], [9223372036854775807, 2, 3]]),
+])
+def test_edge_rows_are_parsed(chunk: bytes, expected: list):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        rows = main.parse_edge_rows(chunk)
+    assert rows.dtype == np.int64 and rows.shape == (len(expected), 3)
+    assert rows.tolist() == expected
+
+
+@pytest.mark.parametrize('chunk', [b'10 1 2\n20 2 x\n', b'10 1 2\n20 2 3.5\n', b'10 1\n20 2\n', b'10 1 2\n20 2\n'])
+def test_invalid_edge_rows_raise_error(chunk: bytes):
+    with pytest.raises(ValueError):
+        main.parse_edge_rows(chunk)
+
+
+def test_edge_table_is_read_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.EdgeTable, 'READ_CHUNK_SIZE', 7)
+    path = str(tmp_path / 'edges.txt')
+    with open(path, 'w') as f:
+        f.write('100 1 2\n120 2 3 x\n\n140 1 3000000000\n')
+    edge_table = main.EdgeTable.read(path)
+    assert edge_table.get_timestamps().tolist() == [100, 120, 140]
+    assert edge_table.get_nodes1().tolist() == [1, 2, 1]
+    assert edge_table.get_nodes2().tolist() == [2, 3, 3000000000]
+
+
+def test_update_delta_equals_vtna_update_delta():
+    random = np.random.RandomState(6)
+    # Irregular gaps between timestamps, several edges share each timestamp
+    timestamps = np.cumsum(random.choice([20, 40, 60, 140], 200)).repeat(random.randint(1, 4, 200))
+    random.shuffle(timestamps)
+    edge_table = main.EdgeTable(timestamps, random.randint(0, 30, len(timestamps)),
+                                random.randint(0, 30, len(timestamps)))
+    update_delta = vtna.data_import.infer_update_delta(edge_table.to_temporal_edges())
+    assert edge_table.infer_update_delta() == update_delta
+    for granularity in [update_delta, 3 * update_delta, 50]:
+        expected = np.bincount((timestamps - timestamps.min()) // granularity)
+        assert np.array_equal(edge_table.histogram(granularity), expected)
@@ -0,0 +1,80 @@
+import numpy as np
+
+import main
+
+
+def build_figure(temp_graph, layout, **kwargs) -> main.TemporalGraphFigure:
+    return main.TemporalGraphFigure(temp_graph=temp_graph, layout=layout, display_size=(500, 500),
+                                    animate_transitions=False, color_map='#000', edge_color='#111', node_size=3,
+                                    edge_width=1, **kwargs)
+
+
+def get_frame_segments(frame) -> set:
+    """Returns set of edges of a frame as pairs of (node ID, x, y)."""
+    edge_trace = frame['data'][0]
+    x, y, ids = [np.asarray(edge_trace[key], dtype=float).reshape(-1, 3)[:, :2] for key in ['x', 'y', 'ids']]
+    return set(((int(ids[i, 0]), x[i, 0], y[i, 0]), (int(ids[i, 1]), x[i, 1], y[i, 1])) for i in range(len(ids)))
+
+
+def build_expected_segments(temp_graph, layout, timestep: int, visible_ids: set) -> set:
+    columns = layout.get_node_columns()
+    positions = layout.get_positions(timestep).astype(float)
+    segments = set()
+    for edge in temp_graph[timestep].get_edges():
+        node1, node2 = edge.get_incident_nodes()
+        if node1 in visible_ids and node2 in visible_ids:
+            segments.add(((node1, *positions[columns[node1]]), (node2, *positions[columns[node2]])))
+    return segments
+
+
+def test_frames_show_edges_of_visible_nodes(temp_graph, layout):
+    figure = build_figure(temp_graph, layout)
+    node_ids = layout.get_node_ids()
+    mask = np.random.RandomState(3).rand(len(node_ids)) < 0.6
+    for visible_ids in [set(node_ids.tolist()), set(node_ids[mask].tolist())]:
+        if len(visible_ids) < len(node_ids):
+            figure.update_filter(mask)
+        frames = figure.get_figure()['frames']
+        assert len(frames) == len(temp_graph)
+        for timestep, frame in enumerate(frames):
+            assert get_frame_segments(frame) == build_expected_segments(temp_graph, layout, timestep, visible_ids)
+            # Only nodes with visible edges are displayed
+            expected_nodes = set(node for segment in get_frame_segments(frame) for node, _, _ in segment)
+            assert set(np.asarray(frame['data'][1]['ids']).tolist()) == expected_nodes
+
+
+def test_windowed_frames_equal_frames_built_at_once(temp_graph, non_iterable_graph, layout):
+    frames = build_figure(temp_graph, layout).get_figure()['frames']
+    windowed = build_figure(non_iterable_graph, layout, frame_window=3)
+    assert len(windowed.get_figure()['frames']) == 3
+    # Windows are requested out of order, like when scrubbing the slider
+    for window in [5, 0, 6, 2, 5]:
+        start, stop = windowed.get_window_range(window)
+        for frame, expected in zip(windowed.get_frames(start, stop), frames[start:stop]):
+            assert frame['name'] == expected['name']
+            assert get_frame_segments(frame) == get_frame_segments(expected)
+
+
+def test_snapshot_frames_equal_figure_frames(temp_graph, non_iterable_graph, layout):
+    figure = build_figure(non_iterable_graph, layout, frame_window=3)
+    figure.update_filter(np.random.RandomState(4).rand(len(layout.get_node_ids())) < 0.7)
+    start, stop = 10, len(temp_graph)
+    snapshot = figure.snapshot_frame_arrays()
+    for frame, expected in zip(snapshot.iter_frames(start, stop), figure.get_frames(start, stop)):
+        segments = set(tuple(map(tuple, segment.astype(float).tolist())) for segment in frame['edges'])
+        assert segments == set(((x1, y1), (x2, y2)) for (_, x1, y1), (_, x2, y2) in get_frame_segments(expected))
+        assert len(frame['nodes']) == len(expected['data'][1]['ids'])
+
+
+def test_snapshot_of_computing_layout_keeps_its_timesteps(temp_graph, tmp_path):
+    layout = main.FrameStore(str(tmp_path)).create_layout(temp_graph)
+    positions = np.random.RandomState(5).uniform(-1, 1, (len(temp_graph), len(layout.get_node_ids()), 2))
+    layout.set_steps(0, positions[:8].astype(np.float32))
+    figure = build_figure(temp_graph, layout)
+    snapshot = figure.snapshot_frame_arrays()
+    layout.set_steps(8, positions[8:].astype(np.float32))
+    # Timesteps computed after the snapshot are not displayed by it
+    edge_counts = snapshot.count_displayed_edges(0, len(temp_graph))
+    assert edge_counts[:8].sum() > 0 and edge_counts[8:].sum() == 0
+    later_counts = figure.snapshot_frame_arrays().count_displayed_edges(0, len(temp_graph))
+    assert np.array_equal(later_counts[:8], edge_counts[:8]) and later_counts[8:].sum() > 0
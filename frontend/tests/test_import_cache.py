@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+import main
+
+
+def write_table(path: str, seed: int) -> main.EdgeTable:
+    random = np.random.RandomState(seed)
+    columns = [np.sort(random.randint(0, 10000, 500)).astype(np.int64), random.randint(0, 50, 500).astype(np.int32),
+               random.randint(50, 100, 500).astype(np.int32)]
+    np.savetxt(path, np.column_stack(columns), fmt='%d')
+    return main.EdgeTable(*columns)
+
+
+def assert_tables_equal(table: main.EdgeTable, expected: main.EdgeTable):
+    assert np.array_equal(table.get_timestamps(), expected.get_timestamps())
+    assert np.array_equal(table.get_nodes1(), expected.get_nodes1())
+    assert np.array_equal(table.get_nodes2(), expected.get_nodes2())
+
+
+def test_cached_tables_are_loaded_and_least_recently_used_removed(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    paths = [str(tmp_path / f'{name}.txt') for name in 'abc']
+    tables = [write_table(path, seed) for seed, path in enumerate(paths)]
+    main.ImportCache(cache_dir).put_edge_table(paths[0], tables[0])
+    entry_size = max(os.path.getsize(os.path.join(cache_dir, file_name)) for file_name in os.listdir(cache_dir))
+    cache = main.ImportCache(cache_dir, max_disk_bytes=int(2.5 * entry_size))
+    assert cache.get_edge_table(paths[1]) is None
+    cache.put_edge_table(paths[1], tables[1])
+    for file_name in os.listdir(cache_dir):
+        os.utime(os.path.join(cache_dir, file_name), (1000, 1000))
+    # Loading the first table marks it as recently used
+    assert_tables_equal(cache.get_edge_table(paths[0]), tables[0])
+    cache.put_edge_table(paths[2], tables[2])
+    assert cache.get_edge_table(paths[1]) is None
+    assert_tables_equal(cache.get_edge_table(paths[0]), tables[0])
+    assert_tables_equal(cache.get_edge_table(paths[2]), tables[2])
+    # Changed files are hashed again, so their outdated table is not used
+    write_table(paths[0], 3)
+    os.utime(paths[0], (2000, 2000))
+    assert cache.get_edge_table(paths[0]) is None
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+import main
+
+
+def build_layout(seed: int) -> main.LayoutArray:
+    positions = np.random.RandomState(seed).uniform(-1, 1, (20, 10, 2)).astype(np.float32)
+    return main.LayoutArray(np.arange(10, dtype=np.int64), positions, np.ones(20, dtype=bool))
+
+
+def get_keys(cache_dir) -> set:
+    return set(file_name.split('.', 1)[0] for file_name in os.listdir(cache_dir))
+
+
+def set_mtime(cache_dir, key: str, mtime: float):
+    for file_name in os.listdir(cache_dir):
+        if file_name.startswith(key + '.'):
+            os.utime(os.path.join(cache_dir, file_name), (mtime, mtime))
+
+
+def test_disk_cache_removes_least_recently_used_layouts(tmp_path):
+    cache_dir = str(tmp_path)
+    main.LayoutCache(cache_dir=cache_dir).put('a', build_layout(0))
+    entry_size = sum(os.path.getsize(os.path.join(cache_dir, file_name)) for file_name in os.listdir(cache_dir))
+    cache = main.LayoutCache(max_size=1, cache_dir=cache_dir, max_disk_bytes=int(2.5 * entry_size))
+    cache.put('b', build_layout(1))
+    set_mtime(cache_dir, 'a', 1000)
+    set_mtime(cache_dir, 'b', 2000)
+    # Loading a from disk marks it as recently used
+    layout = cache.get('a')
+    assert np.array_equal(layout.get_steps(0, 20), build_layout(0).get_steps(0, 20))
+    cache.put('c', build_layout(2))
+    assert get_keys(cache_dir) == {'a', 'c'}
+    assert cache.get('b') is None
+    # Layouts exceeding the limit alone are stored anyway
+    main.LayoutCache(cache_dir=cache_dir, max_disk_bytes=0).put('d', build_layout(3))
+    assert get_keys(cache_dir) == {'d'}
+
+
+def test_prune_cache_dir_keeps_entries_and_temporary_files(tmp_path):
+    for index, file_name in enumerate(['index.json', 'x.part', 'x', 'y.npz', 'z.npz', 'w.npz.1234.tmp']):
+        with open(os.path.join(str(tmp_path), file_name), 'wb') as f:
+            f.write(b'0' * 100)
+        os.utime(os.path.join(str(tmp_path), file_name), (index, index))
+    assert main.prune_cache_dir(str(tmp_path), 250, keep={'index'}) == ['x', 'y']
+    assert sorted(os.listdir(str(tmp_path))) == ['index.json', 'w.npz.1234.tmp', 'z.npz']
+
+
+def test_pickled_layouts_are_removed(tmp_path):
+    for file_name in ['a.pickle', 'b.ids.npy']:
+        with open(os.path.join(str(tmp_path), file_name), 'wb') as f:
+            f.write(b'0')
+    main.LayoutCache(cache_dir=str(tmp_path))
+    assert os.listdir(str(tmp_path)) == ['b.ids.npy']
@@ -0,0 +1,175 @@
+import multiprocessing
+
+import networkx
+import numpy as np
+import pytest
+
+import main
+import vtna.layout
+
+
+def get_edge_set(graph) -> set:
+    return set(tuple(edge.get_incident_nodes()) for edge in graph.get_edges())
+
+
+def test_window_yields_graphs_of_its_timesteps(temp_graph, non_iterable_graph):
+    window = main.TemporalGraphWindow(non_iterable_graph, 7, 12)
+    assert len(window) == 5
+    assert [get_edge_set(graph) for graph in window] == [get_edge_set(temp_graph[t]) for t in range(7, 12)]
+    assert get_edge_set(window[1]) == get_edge_set(temp_graph[8])
+    assert window.get_nodes() == temp_graph.get_nodes()
+
+
+def compute_layout(temp_graph, workers: int, chunk_computed=None, layout_function=vtna.layout.flexible_spring_layout,
+                   parameters=None, **kwargs):
+    delivered = list()
+    results = list()
+
+    def on_chunk_computed(computation, start, positions):
+        delivered.extend(range(start, start + len(positions)))
+        if chunk_computed is not None:
+            chunk_computed(computation, start, positions)
+
+    computation = main.LayoutComputation(
+        layout_function=layout_function, temp_graph=temp_graph, parameters=parameters or {}, chunk_size=4,
+        chunk_computed=on_chunk_computed,
+        computation_finished=lambda computation, layout: results.append(layout),
+        computation_failed=lambda computation, error: results.append(error), workers=workers, **kwargs)
+    computation.run()
+    return computation, delivered, results
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_chunks_cover_all_timesteps(temp_graph, workers):
+    _, delivered, results = compute_layout(temp_graph, workers)
+    assert len(results) == 1 and isinstance(results[0], main.LayoutArray), results
+    assert sorted(delivered) == list(range(len(temp_graph)))
+    assert results[0].is_complete()
+
+
+def test_cancel_terminates_workers(temp_graph):
+    computation, delivered, results = compute_layout(
+        temp_graph, workers=2, chunk_computed=lambda computation, start, positions: computation.cancel())
+    assert computation.is_cancelled()
+    assert results == []
+    assert len(delivered) == 4
+    assert multiprocessing.active_children() == []
+
+
+class CumulativeEdge(object):
+    def __init__(self, nodes: tuple, timestamps: list):
+        self.__nodes = nodes
+        self.__timestamps = timestamps
+
+    def get_incident_nodes(self) -> tuple:
+        return self.__nodes
+
+    def get_timestamps(self) -> list:
+        return self.__timestamps
+
+
+class CumulativeGraph(object):
+    """Edges of all timesteps up to one of a temporal graph, like vtna's cumulative graphs."""
+    def __init__(self, temp_graph, timestep: int):
+        edges = dict()
+        for graph in (temp_graph[t] for t in range(timestep + 1)):
+            for edge in graph.get_edges():
+                edges.setdefault(edge.get_incident_nodes(), []).extend(edge.get_timestamps())
+        self.__edges = [CumulativeEdge(nodes, timestamps) for nodes, timestamps in edges.items()]
+
+    def get_edges(self) -> list:
+        return self.__edges
+
+
+class CumulativeTemporalGraph(object):
+    def __init__(self, temp_graph):
+        self.__temp_graph = temp_graph
+
+    def __len__(self):
+        return len(self.__temp_graph)
+
+    def __iter__(self):
+        return (self[timestep] for timestep in range(len(self)))
+
+    def __getitem__(self, timestep: int) -> CumulativeGraph:
+        return CumulativeGraph(self.__temp_graph, timestep)
+
+    def get_nodes(self):
+        return self.__temp_graph.get_nodes()
+
+
+@pytest.fixture
+def vtna_windows(monkeypatch) -> list:
+    """Records timesteps [start, stop) laid out by vtna."""
+    windows = list()
+
+    class RecordedWindow(main.TemporalGraphWindow):
+        def __init__(self, temp_graph, start: int, stop: int):
+            super().__init__(temp_graph, start, stop)
+            windows.append((start, stop))
+
+    monkeypatch.setattr(main, 'TemporalGraphWindow', RecordedWindow)
+    return windows
+
+
+SPRING_PARAMETERS = {'node_distance_scale': 1., 'n_iterations': 50}
+
+
+@pytest.mark.parametrize('layout_function', [vtna.layout.flexible_weighted_spring_layout,
+                                             vtna.layout.chained_weighted_spring_layout])
+def test_cumulative_toggle_starts_from_previous_positions(temp_graph, vtna_windows, layout_function):
+    cumulative_graph = CumulativeTemporalGraph(temp_graph)
+    # Settled spring layout of each timestep, as computed before toggling back and forth
+    seed_layout = main.LayoutArray.empty(temp_graph)
+    node_columns = seed_layout.get_node_columns()
+    for timestep in range(len(temp_graph)):
+        graph = networkx.Graph([edge.get_incident_nodes() for edge in cumulative_graph[timestep].get_edges()])
+        random = np.random.RandomState(timestep)
+        positions = networkx.spring_layout(graph, pos=dict((node, random.rand(2)) for node in graph.nodes()),
+                                           iterations=200)
+        seed_layout.set_steps(timestep, seed_layout.build_positions([positions]))
+    _, delivered, results = compute_layout(cumulative_graph, workers=1, layout_function=layout_function,
+                                           parameters=SPRING_PARAMETERS, seed_layout=seed_layout,
+                                           seed_timesteps=np.arange(len(temp_graph)))
+    assert vtna_windows == []
+    assert sorted(delivered) == list(range(len(temp_graph)))
+    for timestep in range(len(temp_graph)):
+        columns = sorted(set(node_columns[node] for edge in cumulative_graph[timestep].get_edges()
+                             for node in edge.get_incident_nodes()))
+        positions = results[0].get_positions(timestep)
+        assert not np.isnan(positions[columns]).any()
+        assert np.isnan(np.delete(positions, columns, axis=0)).all()
+        # Nodes stay close to their settled positions in the layout of extent 2, instead of starting at random
+        distances = np.linalg.norm(positions[columns] - seed_layout.get_positions(timestep)[columns], axis=1)
+        assert np.median(distances) < 0.25
+
+
+def test_static_layout_starts_from_previous_positions(temp_graph, layout, vtna_windows):
+    static_layout = main.LayoutArray.empty(temp_graph)
+    static_layout.set_steps(0, layout.get_steps(0, 1).repeat(len(temp_graph), axis=0))
+    _, _, results = compute_layout(CumulativeTemporalGraph(temp_graph), workers=1,
+                                   layout_function=vtna.layout.static_spring_layout, parameters=SPRING_PARAMETERS,
+                                   seed_layout=static_layout, seed_timesteps=np.zeros(len(temp_graph), dtype=int))
+    assert vtna_windows == []
+    positions = results[0].get_steps(0, len(temp_graph))
+    np.testing.assert_array_equal(positions, np.broadcast_to(positions[:1], positions.shape))
+    assert not np.isnan(positions).all()
+
+
+def test_timesteps_without_previous_positions_are_computed_by_vtna(temp_graph, layout, vtna_windows):
+    partial_layout = main.LayoutArray.empty(temp_graph)
+    partial_layout.set_steps(0, layout.get_steps(0, 9))
+    _, delivered, results = compute_layout(temp_graph, workers=1, parameters=SPRING_PARAMETERS,
+                                           seed_layout=partial_layout, seed_timesteps=np.arange(len(temp_graph)))
+    assert vtna_windows == [(9, 13), (13, 17), (17, 20)]
+    assert sorted(delivered) == list(range(len(temp_graph)))
+    assert results[0].is_complete()
+
+
+def test_timestep_memo_is_bounded_by_bytes():
+    memo = main.TimestepLayoutMemo(max_bytes=3 * 800)
+    for key in 'abcd':
+        memo.put(key, np.zeros((100, 2), dtype=np.float32))
+    memo.get('b')
+    memo.put('e', np.zeros((100, 2), dtype=np.float32))
+    assert [key for key in 'abcde' if memo.get(key) is not None] == ['b', 'd', 'e']
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+import main
+
+CATEGORIES = ['a', 'b', 'c', 'd']
+ATTRIBUTE_INFO = {
+    'Node ID': {'measurement_type': 'ID', 'scope': 'global'},
+    'group': {'measurement_type': 'N', 'scope': 'global', 'categories': CATEGORIES},
+    'level': {'measurement_type': 'O', 'scope': 'global', 'categories': CATEGORIES},
+    'weight': {'measurement_type': 'I', 'scope': 'global'},
+    'activity': {'measurement_type': 'I', 'scope': 'local'}
+}
+OPERATORS = ['AND', 'OR', 'AND NOT', 'OR NOT']
+
+
+class AttributeNode(object):
+    def __init__(self, node_id: int, global_attributes: dict, local_attributes: dict):
+        self.__id = node_id
+        self.__global_attributes = global_attributes
+        self.__local_attributes = local_attributes
+
+    def get_id(self) -> int:
+        return self.__id
+
+    def get_global_attribute(self, name: str):
+        return self.__global_attributes[name]
+
+    def get_local_attribute(self, name: str, timestep: int):
+        return self.__local_attributes[name][timestep]
+
+
+class AttributeGraph(object):
+    """Nodes with random attributes, as much of a temporal graph as NodeAttributeColumns uses."""
+    def __init__(self, node_count: int, timestep_count: int, seed: int):
+        random = np.random.RandomState(seed)
+        # Unknown categories and missing values do not match any range
+        categories = CATEGORIES + ['unknown']
+        weights = random.randint(0, 10, node_count).astype(float).tolist()
+        self.__nodes = [AttributeNode(node_id, {'Node ID': node_id, 'group': random.choice(categories),
+                                                'level': random.choice(categories),
+                                                'weight': None if random.rand() < 0.1 else weight},
+                                      {'activity': random.randint(0, 5, timestep_count).astype(float).tolist()})
+                        for node_id, weight in zip(random.permutation(node_count * 3)[:node_count].tolist(), weights)]
+        self.__timestep_count = timestep_count
+
+    def __len__(self):
+        return self.__timestep_count
+
+    def get_nodes(self) -> list:
+        return self.__nodes
+
+
+def build_random_predicate(random: np.random.RandomState, node_ids: np.ndarray, local: bool) -> tuple:
+    name = random.choice(['Node ID', 'group', 'level', 'weight'] + (['activity'] if local else []))
+    categories = CATEGORIES + ['unknown']
+    if name == 'Node ID':
+        value = int(random.choice(node_ids)) if random.rand() < 0.8 else -1
+    elif name == 'group':
+        value = random.choice(categories)
+    elif name == 'level':
+        value = tuple(sorted(random.choice(categories, 2).tolist()))
+    else:
+        value = tuple(sorted(random.randint(0, 10, 2).astype(float).tolist()))
+    return name, value
+
+
+def build_random_clause(random: np.random.RandomState, node_ids: np.ndarray, local: bool) -> dict:
+    predicate_ids = random.choice(100, random.randint(1, 5), replace=False)
+    clause = dict()
+    for index, predicate_id in enumerate(sorted(predicate_ids)):
+        operator = random.choice(['NEW', 'NOT'] if index == 0 else OPERATORS)
+        clause[str(predicate_id)] = {'operator': operator, 'value': build_random_predicate(random, node_ids, local)}
+    return clause
+
+
+@pytest.mark.parametrize('local', [False, True])
+def test_index_finds_nodes_of_clause_mask(local: bool):
+    attribute_columns = main.NodeAttributeColumns(AttributeGraph(60, 5, seed=7), ATTRIBUTE_INFO)
+    node_ids = attribute_columns.get_node_ids()
+    index = main.NodeAttributeIndex(attribute_columns)
+    random = np.random.RandomState(8)
+    for _ in range(300):
+        raw_clause = build_random_clause(random, node_ids, local)
+        limit = random.randint(1, 80)
+        mask = np.atleast_2d(main.build_clause_mask(raw_clause, attribute_columns)).any(axis=0)
+        count, found_ids = index.find_clause_nodes(raw_clause, limit)
+        assert count == np.count_nonzero(mask), raw_clause
+        assert found_ids.tolist() == node_ids[mask][:limit].tolist(), raw_clause
+
+
+def test_local_attributes_are_queried_per_timestep():
+    temp_graph = AttributeGraph(40, 5, seed=9)
+    attribute_columns = main.NodeAttributeColumns(temp_graph, ATTRIBUTE_INFO)
+    nodes = sorted(temp_graph.get_nodes(), key=lambda node: node.get_id())
+    raw_clause = {'0': {'operator': 'NEW', 'value': ('activity', (1., 2.))},
+                  '1': {'operator': 'AND NOT', 'value': ('group', 'a')}}
+    mask = main.build_clause_mask(raw_clause, attribute_columns)
+    expected = [[1 <= node.get_local_attribute('activity', timestep) <= 2 and node.get_global_attribute('group') != 'a'
+                 for node in nodes] for timestep in range(len(temp_graph))]
+    assert mask.tolist() == expected
+    # Ranges of local attributes cover all timesteps
+    values = [node.get_local_attribute('activity', timestep) for node in nodes for timestep in range(len(temp_graph))]
+    assert attribute_columns.get_range('activity') == (min(values), max(values))
+
+
+def test_memo_reuses_masks_of_clauses(monkeypatch):
+    attribute_columns = main.NodeAttributeColumns(AttributeGraph(40, 5, seed=10), ATTRIBUTE_INFO)
+    global_clause = {'0': {'operator': 'NEW', 'value': ('weight', (2., 6.))}}
+    local_clause = {'0': {'operator': 'NOT', 'value': ('activity', (0., 1.))}}
+    queries = {'2': {'clauses': global_clause, 'color': '#f00'}, '10': {'clauses': local_clause, 'color': '#0f0'}}
+    evaluated = list()
+    build_clause_mask = main.build_clause_mask
+
+    def build_recorded_clause_mask(raw_clause, attribute_columns, positions=None):
+        evaluated.append((raw_clause, positions is None))
+        return build_clause_mask(raw_clause, attribute_columns, positions)
+
+    monkeypatch.setattr(main, 'build_clause_mask', build_recorded_clause_mask)
+    memo = main.QueryResultMemo()
+    for query_ids in [['2'], ['2', '10']]:
+        selected_queries = dict((query_id, queries[query_id]) for query_id in query_ids)
+        expected = main.transform_queries_to_color_mapping(selected_queries, attribute_columns, '#000')
+        evaluated.clear()
+        assert main.transform_queries_to_color_mapping(selected_queries, attribute_columns, '#000', memo) == expected
+        # Without local clauses, clauses are only evaluated for uncolored nodes on a miss
+        assert evaluated == [(queries[query_id]['clauses'], '10' in query_ids) for query_id in query_ids]
+    # Masks of filters are used for colors
+    mask = main.transform_queries_to_mask({'1': {'clauses': global_clause}}, attribute_columns, memo)
+    evaluated.clear()
+    node_colors = main.transform_queries_to_color_mapping({'1': {'clauses': global_clause, 'color': '#00f'}},
+                                                          attribute_columns, '#000', memo)
+    assert evaluated == []
+    assert node_colors.get_colors() == ['#00f' if visible else '#000' for visible in mask.tolist()]
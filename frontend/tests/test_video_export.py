@@ -0,0 +1,110 @@
+import time
+
+import imageio
+import numpy as np
+import pytest
+
+import main
+from test_figure_frames import build_figure
+
+
+def export(figure, workers: int, time_range=(2, 9), video_format='gif',
+           increment_progress=lambda: None) -> main.VideoExport:
+    video_export = main.VideoExport(figure, video_format, video_resolution=120, frame_length=100,
+                                    time_range=time_range, speedup_empty_frames=False,
+                                    initialize_progressbar=lambda frame_count: None,
+                                    increment_progress=increment_progress,
+                                    progress_finished=lambda: None, progress_stopped=lambda job: None,
+                                    workers=workers)
+    return video_export
+
+
+def wait(video_export: main.VideoExport, timeout: float = 60):
+    deadline = time.time() + timeout
+    while video_export.get_state() == main.VideoExport.State.RUNNING:
+        assert time.time() < deadline, 'export did not stop'
+        time.sleep(0.05)
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    # Exports are written to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_export_writes_frames_in_order(temp_graph, layout, workers):
+    figure = build_figure(temp_graph, layout)
+    video_export = export(figure, workers)
+    video_export.start()
+    wait(video_export)
+    assert video_export.get_state() == main.VideoExport.State.FINISHED, video_export.get_error()
+    assert video_export.get_progress() == (8, 8)
+    images = imageio.mimread(video_export.get_output_path())
+    rasterizer = main.FrameRasterizer(120)
+    expected = [rasterizer.render(frame) for frame in figure.snapshot_frame_arrays().iter_frames(2, 10)]
+    assert len(images) == len(expected)
+    for image, expected_image in zip(images, expected):
+        # GIF colors are quantized
+        assert np.abs(np.asarray(image)[:, :, :3].astype(int) - expected_image).mean() < 1
+
+
+def test_closed_export_cannot_be_resumed(temp_graph, layout):
+    # Cancelled after the first written frame
+    video_export = export(build_figure(temp_graph, layout), workers=1,
+                          increment_progress=lambda: video_export.cancel())
+    video_export.start()
+    wait(video_export)
+    assert video_export.get_state() == main.VideoExport.State.CANCELLED
+    assert video_export.get_progress() == (1, 8)
+    video_export.close()
+    assert video_export.get_state() == main.VideoExport.State.CLOSED
+    with pytest.raises(ValueError):
+        video_export.resume()
+    # Closing again does nothing
+    video_export.close()
+
+
+class FailingWriter(object):
+    """Writer, which fails after a number of frames, like a terminated ffmpeg process."""
+    def __init__(self, writer, failing_frame: int):
+        self.__writer = writer
+        self.__failing_frame = failing_frame
+        self.__frames = 0
+
+    def append_data(self, image):
+        if self.__frames == self.__failing_frame:
+            raise IOError('Broken pipe')
+        self.__frames += 1
+        self.__writer.append_data(image)
+
+    def close(self):
+        self.__writer.close()
+
+
+def test_export_is_written_anew_after_writer_errors(temp_graph, layout, monkeypatch):
+    get_writer = imageio.get_writer
+    writers = list()
+
+    def get_failing_writer(*args, **kwargs):
+        # Only the first writer fails
+        writers.append(FailingWriter(get_writer(*args, **kwargs), 3 if len(writers) == 0 else -1))
+        return writers[-1]
+    monkeypatch.setattr(main.imageio, 'get_writer', get_failing_writer)
+    video_export = export(build_figure(temp_graph, layout), workers=1)
+    video_export.start()
+    wait(video_export)
+    assert video_export.get_state() == main.VideoExport.State.FAILED
+    assert video_export.get_progress() == (3, 8)
+    video_export.resume()
+    wait(video_export)
+    assert video_export.get_state() == main.VideoExport.State.FINISHED, video_export.get_error()
+    assert len(writers) == 2
+    assert len(imageio.mimread(video_export.get_output_path())) == 8
+
+
+def test_default_workers_use_all_cpus(monkeypatch):
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: 32)
+    assert main.get_default_worker_count() == 32
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: None)
+    assert main.get_default_worker_count() == 1